@@ -1,63 +1,143 @@
 import numpy as np
-from visualize_terrain import load_terrain_npz
+from typing import Optional, Union
+from terrain import TerrainGrid, as_terrain_grid
+
+
+# LOS evaluation modes
+LOS_MODES = ("sample", "dda")
+
+# Blocker cache tolerance (m) against the exact "dda" LOS: a neighbour's
+# blocker rejects a target only if the terrain there is clearly above the
+# line (los_blocked_at samples the terrain, the exact LOS works per cell)
+BLOCKER_TOLERANCE_M = 1e-3
+
+# Version of the LOS / coverage engines, part of every on-disk cache key
+# (horizon_cache, result_cache): bump it whenever a change alters computed
+# maps, so stale cached results are recomputed instead of loaded
+ENGINE_VERSION = 1
+
+# Mean earth radius (m) and the effective earth radius factor of the
+# standard atmosphere (4/3 earth: refraction bends rays towards the ground)
+EARTH_RADIUS_M = 6371000.0
+STANDARD_K_FACTOR = 4.0 / 3.0
 
 
 # Terrain interpolation
+def z_terrain_batch(lat: np.ndarray, lon: np.ndarray,
+                    lats: Union[np.ndarray, TerrainGrid],
+                    lons: np.ndarray = None, Z: np.ndarray = None):
+    """
+    Terrain altitude (m) at arrays of points (lat, lon) via bilinear interpolation.
+    `lats` may be a TerrainGrid, in which case lons and Z are omitted.
+
+    Returns (z, nodata):
+    - z      : float array of altitudes (NaN where nodata)
+    - nodata : boolean array, True if out of bounds or no-data (values < 0)
+    """
+    return as_terrain_grid(lats, lons, Z).sample(lat, lon)
+
+
 def z_terrain(lat: float, lon: float,
-              lats: np.ndarray, lons: np.ndarray, Z: np.ndarray):
+              lats: Union[np.ndarray, TerrainGrid],
+              lons: np.ndarray = None, Z: np.ndarray = None):
     """
     Terrain altitude (m) at point (lat, lon) via bilinear interpolation.
     Returns None if out of bounds or no-data (values < 0).
     """
+    z, nodata = z_terrain_batch(lat, lon, lats, lons, Z)
+    if nodata:
+        return None
+    return float(z)
 
-    # Check if axes are increasing or decreasing
-    lats_inc = lats[0] < lats[-1]
-    lons_inc = lons[0] < lons[-1]
 
-    lat_min, lat_max = (lats[0], lats[-1]) if lats_inc else (lats[-1], lats[0])
-    lon_min, lon_max = (lons[0], lons[-1]) if lons_inc else (lons[-1], lons[0])
+def los_profile(radar_lat: float, radar_lon: float,
+                target_lat: float, target_lon: float,
+                lats: Union[np.ndarray, TerrainGrid],
+                lons: np.ndarray = None, Z: np.ndarray = None,
+                n_samples: int = 400):
+    """
+    Terrain profile along the radar->target path, fetched as whole arrays.
 
-    if not (lat_min <= lat <= lat_max and lon_min <= lon <= lon_max):
-        return None
+    Returns (s, z_ground, nodata) for the samples s = k / n_samples, k = 1..n_samples-1.
+    With 1D arrays of targets, z_ground and nodata are 2D (targets x samples).
+    """
+    s = np.arange(1, n_samples) / n_samples
+    if np.ndim(target_lat) > 0:
+        target_lat = np.asarray(target_lat, dtype=float)[:, None]
+        target_lon = np.asarray(target_lon, dtype=float)[:, None]
+    lat = radar_lat + s * (target_lat - radar_lat)
+    lon = radar_lon + s * (target_lon - radar_lon)
+    z_ground, nodata = z_terrain_batch(lat, lon, lats, lons, Z)
+    return s, z_ground, nodata
 
-    # Make increasing for searchsorted
-    lats_s = lats if lats_inc else lats[::-1]
-    lons_s = lons if lons_inc else lons[::-1]
-
-    # Reorder Z
-    if lats_inc and lons_inc:
-        Z_s = Z
-    elif (not lats_inc) and lons_inc:
-        Z_s = Z[::-1, :]
-    elif lats_inc and (not lons_inc):
-        Z_s = Z[:, ::-1]
-    else:
-        Z_s = Z[::-1, ::-1]
-
-    i1 = int(np.searchsorted(lats_s, lat))
-    j1 = int(np.searchsorted(lons_s, lon))
-    i1 = int(np.clip(i1, 1, len(lats_s) - 1))
-    j1 = int(np.clip(j1, 1, len(lons_s) - 1))
-    i0, j0 = i1 - 1, j1 - 1
 
-    lat0, lat1 = lats_s[i0], lats_s[i1]
-    lon0, lon1 = lons_s[j0], lons_s[j1]
+def los_cells(radar_lat: float, radar_lon: float,
+              target_lat: float, target_lon: float,
+              grid: TerrainGrid):
+    """
+    Grid cells crossed by the radar->target segment (DDA-style traversal).
 
-    z00 = Z_s[i0, j0]
-    z01 = Z_s[i0, j1]
-    z10 = Z_s[i1, j0]
-    z11 = Z_s[i1, j1]
+    The segment is cut at every latitude / longitude grid line it crosses, so
+    each piece lies inside exactly one terrain cell and each crossed cell is
+    visited once. Cost scales with the path length in cells.
 
-    # No-data: negative values
-    if min(z00, z01, z10, z11) < 0:
-        return None
+    Returns (s0, s1, i1, j1): the pieces [s0, s1] (fractions of the path, from
+    0 to 1) and the upper node indices of their cells (see TerrainGrid.cell_index).
+    """
+    def crossings(axis, a, b):
+        if a == b:
+            return np.empty(0)
+        lo, hi = min(a, b), max(a, b)
+        lines = axis[np.searchsorted(axis, lo, side='right'):np.searchsorted(axis, hi, side='left')]
+        return (lines - a) / (b - a)
 
-    t = (lat - lat0) / (lat1 - lat0 + 1e-12)
-    u = (lon - lon0) / (lon1 - lon0 + 1e-12)
+    s = np.sort(np.concatenate([
+        [0.0, 1.0],
+        crossings(grid.lats, radar_lat, target_lat),
+        crossings(grid.lons, radar_lon, target_lon)
+    ]))
+    s0, s1 = s[:-1], s[1:]
+    sm = 0.5 * (s0 + s1)
+    i1, j1 = grid.cell_index(radar_lat + sm * (target_lat - radar_lat),
+                             radar_lon + sm * (target_lon - radar_lon))
+    return s0, s1, i1, j1
 
-    z0 = (1 - u) * z00 + u * z01
-    z1 = (1 - u) * z10 + u * z11
-    return float((1 - t) * z0 + t * z1)
+
+# Earth curvature
+def earth_bulge(radar_lat: float, radar_lon: float,
+                target_lat: np.ndarray, target_lon: np.ndarray,
+                k_factor: Optional[float] = None) -> np.ndarray:
+    """
+    Earth bulge coefficient c (m) of radar->target paths over an earth of
+    effective radius k_factor * EARTH_RADIUS_M.
+
+    The earth drops by x^2 / (2 k R) at a ground distance x from the radar, so
+    relative to the straight radar->target line (target at distance D) the
+    terrain at path fraction s rises by c * s * (1 - s), with c = D^2 / (2 k R).
+    D is the chord between the two points (haversine term, no arctangent),
+    within 0.01 % of the great-circle distance below 300 km.
+    Returns zeros for k_factor=None (flat terrain).
+    """
+    target_lat = np.asarray(target_lat, dtype=float)
+    target_lon = np.asarray(target_lon, dtype=float)
+    if k_factor is None:
+        return np.zeros(np.broadcast(target_lat, target_lon).shape)
+    if k_factor <= 0:
+        raise ValueError(f"k_factor must be > 0, got {k_factor}")
+
+    deg = np.pi / 180.0
+    phi_r = radar_lat * deg
+    phi_t = target_lat * deg
+    h_lat = np.sin(0.5 * (phi_t - phi_r))
+    h_lon = np.sin(0.5 * ((target_lon - radar_lon) * deg))
+    a = h_lat * h_lat + np.cos(phi_r) * np.cos(phi_t) * (h_lon * h_lon)
+    # D^2 = 4 R^2 a, so c = D^2 / (2 k R) = (2 R / k) a
+    return (2.0 * EARTH_RADIUS_M / k_factor) * a
+
+
+def bulge_profile(bulge: np.ndarray, s: np.ndarray) -> np.ndarray:
+    """Earth bulge (m) at path fractions s: bulge * s * (1 - s)."""
+    return bulge * (s * (1.0 - s))
 
 
 # Line altitude
@@ -74,35 +154,263 @@ def fl_to_m(FL: float) -> float:
 # LOS function
 def los_visible(radar_lat: float, radar_lon: float, radar_height_agl_m: float,
                 target_lat: float, target_lon: float, target_alt_m_msl: float,
-                lats: np.ndarray, lons: np.ndarray, Z: np.ndarray,
-                n_samples: int = 400, margin_m: float = 0.0) -> bool:
+                lats: Union[np.ndarray, TerrainGrid],
+                lons: np.ndarray = None, Z: np.ndarray = None,
+                n_samples: int = 400, margin_m: float = 0.0,
+                mode: str = "sample", k_factor: Optional[float] = None) -> bool:
     """
     Returns True if LOS is clear, False otherwise.
 
     - radar_height_agl_m : tower height above ground level (AGL)
     - target_alt_m_msl   : target altitude in m (MSL), e.g.: fl_to_m(50)
     - margin_m           : safety margin (0 or 10m for example)
+    - lats               : latitude axis, or a TerrainGrid (lons and Z omitted)
+    - mode               : "sample" (n_samples regular samples) or "dda"
+                           (exact, each crossed terrain cell visited once)
+    - k_factor           : effective earth radius factor, e.g. STANDARD_K_FACTOR
+                           (4/3); None = flat terrain (see earth_bulge)
     """
+    if mode not in LOS_MODES:
+        raise ValueError(f"Unknown LOS mode '{mode}', expected one of {LOS_MODES}")
 
-    z_ground_r = z_terrain(radar_lat, radar_lon, lats, lons, Z)
+    grid = as_terrain_grid(lats, lons, Z)
+    z_ground_r = z_terrain(radar_lat, radar_lon, grid)
     if z_ground_r is None:
         return False
     z_radar = z_ground_r + radar_height_agl_m
 
-    for k in range(1, n_samples):
-        s = k / n_samples
+    bulge = float(earth_bulge(radar_lat, radar_lon, target_lat, target_lon, k_factor))
+
+    if mode == "dda":
+        min_alt = _dda_min_visible_altitude(radar_lat, radar_lon, z_radar,
+                                            target_lat, target_lon, grid, margin_m,
+                                            bulge=bulge)
+        return target_alt_m_msl > min_alt
+
+    s, z_ground, nodata = los_profile(radar_lat, radar_lon, target_lat, target_lon,
+                                      grid, n_samples=n_samples)
+    if nodata.any():
+        return False  # Safe: no-data => consider blocked
+
+    z_line = z_ligne(s, z_radar, target_alt_m_msl)
+    return not np.any(z_ground + margin_m + bulge_profile(bulge, s) >= z_line)
+
+
+def los_visible_batch(radar_lat: float, radar_lon: float, radar_height_agl_m: float,
+                      target_lat: np.ndarray, target_lon: np.ndarray, target_alt_m_msl: float,
+                      lats: Union[np.ndarray, TerrainGrid],
+                      lons: np.ndarray = None, Z: np.ndarray = None,
+                      n_samples: int = 400, margin_m: float = 0.0,
+                      return_blocker: bool = False, k_factor: Optional[float] = None):
+    """
+    los_visible (mode="sample") for 1D arrays of targets at once.
+
+    The targets x samples points are interpolated as one 2D array and each
+    row is reduced with any(), so the result is identical to calling
+    los_visible per target. Memory grows with len(target_lat) * n_samples:
+    callers split large target sets into chunks (see coverage_analysis).
+
+    With return_blocker, also returns the path fraction s of the most
+    blocking sample of each target (NaN where visible), see los_blocked_at.
+    """
+    grid = as_terrain_grid(lats, lons, Z)
+    target_lat = np.asarray(target_lat, dtype=float)
+    z_ground_r = z_terrain(radar_lat, radar_lon, grid)
+    if z_ground_r is None:
+        visible = np.zeros(target_lat.shape, dtype=bool)
+        return (visible, np.full(target_lat.shape, np.nan)) if return_blocker else visible
+    z_radar = z_ground_r + radar_height_agl_m
+
+    s, z_ground, nodata = los_profile(radar_lat, radar_lon, target_lat, target_lon,
+                                      grid, n_samples=n_samples)
+    bulge = earth_bulge(radar_lat, radar_lon, target_lat, target_lon, k_factor)
+    z_ground = z_ground + margin_m + bulge_profile(bulge[:, None], s)
+    z_line = z_ligne(s, z_radar, target_alt_m_msl)
+    # No-data => blocked (safe)
+    visible = ~np.any(nodata | (z_ground >= z_line), axis=1)
+    if not return_blocker:
+        return visible
 
-        lat = radar_lat + s * (target_lat - radar_lat)
-        lon = radar_lon + s * (target_lon - radar_lon)
+    blocker = np.full(target_lat.shape, np.nan)
+    if s.size:
+        excess = np.where(nodata, np.inf, z_ground - z_line)
+        blocker[~visible] = s[np.argmax(excess[~visible], axis=1)]
+    return visible, blocker
 
-        z_ground = z_terrain(lat, lon, lats, lons, Z)
-        if z_ground is None:
-            return False  # Safe: no-data => consider blocked
 
-        z_line = z_ligne(s, z_radar, target_alt_m_msl)
+def los_blocked_at(radar_lat: float, radar_lon: float, radar_height_agl_m: float,
+                   target_lat: np.ndarray, target_lon: np.ndarray, target_alt_m_msl: float,
+                   s: np.ndarray,
+                   lats: Union[np.ndarray, TerrainGrid],
+                   lons: np.ndarray = None, Z: np.ndarray = None,
+                   margin_m: float = 0.0, tolerance_m: float = 0.0,
+                   k_factor: Optional[float] = None) -> np.ndarray:
+    """
+    True where the radar->target path is blocked at path fraction s (one
+    sample per target, same test as los_visible). Coverage loops use it to
+    test a neighbour's blocker first: neighbouring targets are usually
+    blocked by the same ridge.
+
+    With tolerance_m = 0 and s = k / n_samples this is exactly sample k of
+    los_visible. A positive tolerance_m only reports samples clearly above
+    the line, e.g. to reject a target before the exact "dda" LOS, whose
+    terrain is evaluated per cell rather than by sampling.
+    """
+    grid = as_terrain_grid(lats, lons, Z)
+    s = np.asarray(s, dtype=float)
+    z_ground_r = z_terrain(radar_lat, radar_lon, grid)
+    if z_ground_r is None:
+        return np.ones(s.shape, dtype=bool)
+    z_radar = z_ground_r + radar_height_agl_m
+
+    z_ground, nodata = grid.sample(radar_lat + s * (target_lat - radar_lat),
+                                   radar_lon + s * (target_lon - radar_lon))
+    z_line = z_ligne(s, z_radar, target_alt_m_msl)
+    bulge = earth_bulge(radar_lat, radar_lon, target_lat, target_lon, k_factor)
+    return nodata | (z_ground + margin_m + bulge_profile(bulge, s) >= z_line + tolerance_m)
+
+
+def _dda_min_visible_altitude(radar_lat: float, radar_lon: float, z_radar: float,
+                              target_lat: float, target_lon: float,
+                              grid: TerrainGrid, margin_m: float,
+                              return_s: bool = False, bulge: float = 0.0):
+    """
+    Exact minimum visible altitude over the cells crossed by the path
+    (and, with return_s, the path fraction where it is reached, or NaN).
+
+    Inside a cell the bilinear terrain along the path is a quadratic
+    q(s) = A s^2 + B s + C (terrain + margin - z_radar), and the target is
+    visible above z_radar + max q(s) / s. On each piece the maximum of q(s) / s
+    is reached at an end point or at s = sqrt(C / A). The earth bulge
+    c * s * (1 - s) (c = `bulge`, see earth_bulge) is a quadratic as well and
+    adds to A and B, so the result stays exact.
+    """
+    blocked = (float("inf"), float("nan")) if return_s else float("inf")
+    if not (grid.contains(radar_lat, radar_lon) and grid.contains(target_lat, target_lon)):
+        return blocked
+
+    s0, s1, i1, j1 = los_cells(radar_lat, radar_lon, target_lat, target_lon, grid)
+    i0, j0 = i1 - 1, j1 - 1
+    lats, lons, Z = grid
+
+    # Elevations may be stored compact (int16 / float32): the kernel works in float64
+    z00 = Z[i0, j0].astype(float)
+    z01 = Z[i0, j1].astype(float)
+    z10 = Z[i1, j0].astype(float)
+    z11 = Z[i1, j1].astype(float)
+    if np.any(np.minimum(np.minimum(z00, z01), np.minimum(z10, z11)) < 0):
+        return blocked  # Safe: no-data => consider blocked
+
+    # Cell coordinates along the path: t = t0 + tb * s, u = u0 + ub * s
+    dlat_c = lats[i1] - lats[i0]
+    dlon_c = lons[j1] - lons[j0]
+    t0 = (radar_lat - lats[i0]) / dlat_c
+    tb = (target_lat - radar_lat) / dlat_c
+    u0 = (radar_lon - lons[j0]) / dlon_c
+    ub = (target_lon - radar_lon) / dlon_c
+
+    e = z00 - z01 - z10 + z11
+    A = e * tb * ub - bulge
+    B = (z10 - z00) * tb + (z01 - z00) * ub + e * (t0 * ub + u0 * tb) + bulge
+    C = z00 + (z10 - z00) * t0 + (z01 - z00) * u0 + e * t0 * u0 + margin_m - z_radar
+
+    # At the radar (s -> 0) q / s diverges: blocked whatever the altitude if q(0) > 0
+    if C[0] > 0:
+        return blocked
+
+    # q / s is continuous along the path, so the piece end points s1 cover
+    # every cell boundary; add the interior critical points s = sqrt(C / A)
+    ratio = np.divide(C, A, out=np.full_like(C, -1.0), where=A != 0)
+    s_crit = np.sqrt(ratio, out=np.zeros_like(ratio), where=ratio > 0)
+    s_crit = np.where((s_crit > s0) & (s_crit < s1), s_crit, s1)
+
+    g_end = (A * s1 + B) + C / s1
+    g_crit = (A * s_crit + B) + C / s_crit
+    min_alt = float(z_radar + max(g_end.max(), g_crit.max()))
+    if not return_s:
+        return min_alt
+    k_end, k_crit = np.argmax(g_end), np.argmax(g_crit)
+    s_max = s1[k_end] if g_end[k_end] >= g_crit[k_crit] else s_crit[k_crit]
+    return min_alt, float(s_max)
 
-        if z_ground + margin_m >= z_line:
-            return False
 
-    return True
+# Minimum visible altitude
+def los_min_visible_altitude(radar_lat: float, radar_lon: float, radar_height_agl_m: float,
+                             target_lat: float, target_lon: float,
+                             lats: Union[np.ndarray, TerrainGrid],
+                             lons: np.ndarray = None, Z: np.ndarray = None,
+                             n_samples: int = 400, margin_m: float = 0.0,
+                             mode: str = "sample", return_blocker: bool = False,
+                             k_factor: Optional[float] = None):
+    """
+    Returns the lowest altitude (m MSL) strictly above which a target at
+    (target_lat, target_lon) is visible, i.e. los_visible(..., alt) is True
+    for every alt > result. Returns inf if the path crosses no-data.
+
+    A sample at fraction s blocks the LOS when
+        z_ground + margin_m >= z_radar + s * (alt - z_radar)
+    so the target must be above z_radar + (z_ground + margin_m - z_radar) / s
+    for every sample. `lats` may be a TerrainGrid (lons and Z omitted).
+    With mode="dda" the maximum is taken exactly over the continuous path.
+    With k_factor, z_ground includes the earth bulge (see earth_bulge).
+
+    With return_blocker, returns (altitude, s): s is the path fraction where
+    the maximum is reached (NaN if none), see los_blocked_at.
+    """
+    if mode not in LOS_MODES:
+        raise ValueError(f"Unknown LOS mode '{mode}', expected one of {LOS_MODES}")
+
+    def result(min_alt, s_max=float("nan")):
+        return (min_alt, s_max) if return_blocker else min_alt
+
+    grid = as_terrain_grid(lats, lons, Z)
+    z_ground_r = z_terrain(radar_lat, radar_lon, grid)
+    if z_ground_r is None:
+        return result(float("inf"))
+    z_radar = z_ground_r + radar_height_agl_m
+
+    bulge = float(earth_bulge(radar_lat, radar_lon, target_lat, target_lon, k_factor))
+
+    if mode == "dda":
+        return _dda_min_visible_altitude(radar_lat, radar_lon, z_radar,
+                                         target_lat, target_lon, grid, margin_m,
+                                         return_s=return_blocker, bulge=bulge)
+
+    s, z_ground, nodata = los_profile(radar_lat, radar_lon, target_lat, target_lon,
+                                      grid, n_samples=n_samples)
+    if nodata.any():
+        return result(float("inf"))  # Safe: no-data => consider blocked
+    if s.size == 0:
+        return result(-float("inf"))
+
+    alt = z_radar + (z_ground + margin_m + bulge_profile(bulge, s) - z_radar) / s
+    k = int(np.argmax(alt))
+    return result(float(alt[k]), float(s[k]))
+
+
+def los_min_visible_altitude_batch(radar_lat: float, radar_lon: float, radar_height_agl_m: float,
+                                   target_lat: np.ndarray, target_lon: np.ndarray,
+                                   lats: Union[np.ndarray, TerrainGrid],
+                                   lons: np.ndarray = None, Z: np.ndarray = None,
+                                   n_samples: int = 400, margin_m: float = 0.0,
+                                   k_factor: Optional[float] = None) -> np.ndarray:
+    """
+    los_min_visible_altitude (mode="sample") for 1D arrays of targets at once,
+    as one targets x samples array reduced row by row (see los_visible_batch).
+    """
+    grid = as_terrain_grid(lats, lons, Z)
+    target_lat = np.asarray(target_lat, dtype=float)
+    z_ground_r = z_terrain(radar_lat, radar_lon, grid)
+    if z_ground_r is None:
+        return np.full(target_lat.shape, np.inf)
+    z_radar = z_ground_r + radar_height_agl_m
+    if n_samples <= 1:
+        return np.full(target_lat.shape, -np.inf)
 
+    s, z_ground, nodata = los_profile(radar_lat, radar_lon, target_lat, target_lon,
+                                      grid, n_samples=n_samples)
+    bulge = earth_bulge(radar_lat, radar_lon, target_lat, target_lon, k_factor)
+    z_ground = z_ground + margin_m + bulge_profile(bulge[:, None], s)
+    min_alt = np.max(z_radar + (z_ground - z_radar) / s, axis=1)
+    min_alt[np.any(nodata, axis=1)] = np.inf  # Safe: no-data => consider blocked
+    return min_alt
@@ -0,0 +1,212 @@
+"""
+Adaptive Module
+
+This module implements coarse-to-fine coverage refinement on a TerrainGrid.
+
+The grid is cut into blocks of ADAPTIVE_BLOCK x ADAPTIVE_BLOCK cells and the
+minimum visible altitude is computed at the block corners only. A block is
+filled without further LOS evaluation when, at every requested altitude:
+- its four corners agree (all visible or all blocked)
+- no corner is within ADAPTIVE_CLEARANCE_M of its minimum visible altitude
+- for a visible block, the terrain maximum of the block (max-elevation
+  pyramid, see TerrainGrid.max_pyramid) stays ADAPTIVE_CLEARANCE_M below the
+  target altitude
+Any other block is split in four and the new corners are evaluated, down to
+single cells. Maps keep the full grid resolution while LOS evaluations are
+concentrated near visibility boundaries.
+
+Evaluated cells are exact; filled cells are an approximation (a gap in a
+ridge or a peak narrower than a block with clear corners can be missed), so
+the result may differ slightly from the per-cell engines.
+
+With an `active` mask (range limits, region of interest), blocks holding no
+active cell are dropped without any evaluation and inactive cells are
+reported blocked. The corners of the other blocks are evaluated even when
+inactive, so a block straddling the edge of a narrow sector is still
+decided on real LOS values.
+"""
+
+import numpy as np
+from typing import Callable, Optional
+from terrain import TerrainGrid
+
+
+# Side of the coarse blocks (cells, power of two)
+ADAPTIVE_BLOCK = 8
+
+# Clearance (m) between a corner's minimum visible altitude, or the block
+# terrain, and the target altitude below which a block is refined
+ADAPTIVE_CLEARANCE_M = 30.0
+
+
+def block_lattice(n: int, step: int) -> np.ndarray:
+    """Node indices 0, step, 2 * step, ... of an axis of n nodes, closed by n - 1."""
+    return np.unique(np.append(np.arange(0, n, step), n - 1))
+
+
+def block_terrain_max(grid: TerrainGrid, lat_a: np.ndarray, lat_b: np.ndarray,
+                      lon_a: np.ndarray, lon_b: np.ndarray) -> np.ndarray:
+    """
+    Upper bound of the terrain inside the rectangles spanned by lat_a..lat_b
+    and lon_a..lon_b (1D arrays, either order): the at most 2 x 2 blocks of the
+    first max-elevation pyramid level whose blocks are as large as the rectangle.
+    """
+    pyramid = grid.max_pyramid()
+    n_cells_lat, n_cells_lon = pyramid[0].shape
+    ci0 = np.clip(np.searchsorted(grid.lats, np.minimum(lat_a, lat_b), side='right') - 1, 0, n_cells_lat - 1)
+    ci1 = np.clip(np.searchsorted(grid.lats, np.maximum(lat_a, lat_b), side='left') - 1, ci0, n_cells_lat - 1)
+    cj0 = np.clip(np.searchsorted(grid.lons, np.minimum(lon_a, lon_b), side='right') - 1, 0, n_cells_lon - 1)
+    cj1 = np.clip(np.searchsorted(grid.lons, np.maximum(lon_a, lon_b), side='left') - 1, cj0, n_cells_lon - 1)
+
+    span = np.maximum(ci1 - ci0, cj1 - cj0) + 1
+    levels = np.minimum(np.ceil(np.log2(span)).astype(int), len(pyramid) - 1)
+    terrain_max = np.empty(span.shape)
+    for k in np.unique(levels):
+        at = levels == k
+        level = pyramid[k]
+        i0, i1, j0, j1 = ci0[at] >> k, ci1[at] >> k, cj0[at] >> k, cj1[at] >> k
+        terrain_max[at] = np.maximum(np.maximum(level[i0, j0], level[i0, j1]),
+                                     np.maximum(level[i1, j0], level[i1, j1]))
+    return terrain_max
+
+
+def adaptive_coverage(
+    grid: TerrainGrid,
+    target_alts_m_msl: np.ndarray,
+    min_altitude_points: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    block_size: int = ADAPTIVE_BLOCK,
+    margin_m: float = 0.0,
+    point_progress_callback: Optional[callable] = None,
+    stats: Optional[dict] = None,
+    target_lats: Optional[np.ndarray] = None,
+    target_lons: Optional[np.ndarray] = None,
+    active: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Coverage of a target grid at several altitudes by coarse-to-fine refinement.
+
+    Parameters:
+    -----------
+    grid : TerrainGrid
+        Terrain grid
+    target_alts_m_msl : np.ndarray
+        1D array of target altitudes (meters MSL)
+    min_altitude_points : callable
+        min_altitude_points(target_lat, target_lon) -> 1D array of minimum
+        visible altitudes (m MSL, inf = never visible) of arbitrary targets
+    block_size : int, optional
+        Side of the coarse blocks in cells, a power of two (default: ADAPTIVE_BLOCK)
+    margin_m : float, optional
+        Safety margin in meters added to the block terrain (default: 0.0)
+    point_progress_callback : callable, optional
+        Callback function for progress updates: callback(current, total, percentage),
+        current = cells decided so far
+    stats : dict, optional
+        If provided, "evaluated" (cells with an LOS evaluation) and "filled"
+        (cells filled from their block corners) are added to it
+    target_lats, target_lons : np.ndarray, optional
+        1D monotonic axes of the target cells (default: the terrain grid axes)
+    active : np.ndarray, optional
+        2D boolean array (len(target_lats), len(target_lons)) of the cells to
+        compute, the others are blocked (default: None = all cells)
+
+    Returns:
+    --------
+    np.ndarray
+        3D boolean array with shape (len(target_alts_m_msl), len(target_lats), len(target_lons))
+        True = visible, False = blocked
+    """
+    if block_size < 1 or block_size & (block_size - 1):
+        raise ValueError(f"block_size must be a power of two, got {block_size}")
+
+    if target_lats is None:
+        target_lats, target_lons = grid.lats, grid.lons
+    alts = np.atleast_1d(np.asarray(target_alts_m_msl, dtype=float))
+    n_rows, n_cols = len(target_lats), len(target_lons)
+    total_points = n_rows * n_cols
+
+    coverage = np.zeros((len(alts), n_rows, n_cols), dtype=bool)
+    min_altitude = np.full((n_rows, n_cols), np.inf)
+    evaluated = np.zeros((n_rows, n_cols), dtype=bool)
+
+    def evaluate(i, j):
+        # Minimum visible altitude of the corner nodes not evaluated yet
+        flat = np.unique(np.ravel_multi_index((i, j), (n_rows, n_cols)))
+        flat = flat[~evaluated.ravel()[flat]]
+        if flat.size:
+            ii, jj = np.unravel_index(flat, (n_rows, n_cols))
+            min_altitude[ii, jj] = min_altitude_points(target_lats[ii], target_lons[jj])
+            evaluated[ii, jj] = True
+
+    if active is None:
+        active = np.ones((n_rows, n_cols), dtype=bool)
+    # Summed-area table of the active cells: active cells of a block in O(1)
+    active_sum = np.zeros((n_rows + 1, n_cols + 1), dtype=np.int64)
+    active_sum[1:, 1:] = np.cumsum(np.cumsum(active, axis=0), axis=1)
+
+    def any_active(i0, i1, j0, j1):
+        count = (active_sum[i1 + 1, j1 + 1] - active_sum[i0, j1 + 1]
+                 - active_sum[i1 + 1, j0] + active_sum[i0, j0])
+        return count > 0
+
+    # Coarse blocks (i0, i1, j0, j1), corner node indices, aligned on the step
+    step = block_size
+    rows = block_lattice(n_rows, step)
+    cols = block_lattice(n_cols, step)
+    i0, j0 = [a.ravel() for a in np.meshgrid(rows[:-1], cols[:-1], indexing='ij')]
+    i1, j1 = [a.ravel() for a in np.meshgrid(rows[1:], cols[1:], indexing='ij')]
+
+    if min(n_rows, n_cols) < 2:
+        # A single row / column of targets has no block: evaluate every active target
+        evaluate(*np.nonzero(active))
+
+    while True:
+        keep = any_active(i0, i1, j0, j1)
+        i0, i1, j0, j1 = i0[keep], i1[keep], j0[keep], j1[keep]
+        if not i0.size:
+            break
+        evaluate(np.concatenate([i0, i0, i1, i1]), np.concatenate([j0, j1, j0, j1]))
+
+        # Corner visibility at every altitude: (blocks, altitudes, corners)
+        corners = np.stack([min_altitude[i0, j0], min_altitude[i0, j1],
+                            min_altitude[i1, j0], min_altitude[i1, j1]], axis=1)
+        visible = alts[None, :, None] > corners[:, None, :]
+        agree = np.all(visible == visible[:, :, :1], axis=2)
+        clear = np.abs(alts[None, :, None] - corners[:, None, :]) >= ADAPTIVE_CLEARANCE_M
+
+        # Terrain of the block against a visible decision
+        terrain_max = block_terrain_max(grid, target_lats[i0], target_lats[i1],
+                                        target_lons[j0], target_lons[j1]) + margin_m
+        low_terrain = terrain_max[:, None] < alts[None, :] - ADAPTIVE_CLEARANCE_M
+
+        uniform = np.all(agree & np.all(clear, axis=2) & (low_terrain | ~visible[:, :, 0]), axis=1)
+        for b in np.flatnonzero(uniform):
+            coverage[:, i0[b]:i1[b] + 1, j0[b]:j1[b] + 1] = visible[b, :, 0][:, None, None]
+
+        # Split the other blocks in four at half the step (single cells are done)
+        keep = ~uniform & ((i1 - i0 > 1) | (j1 - j0 > 1))
+        i0, i1, j0, j1 = i0[keep], i1[keep], j0[keep], j1[keep]
+        if point_progress_callback:
+            remaining = int(np.sum((i1 - i0 + 1) * (j1 - j0 + 1)))
+            current = max(0, total_points - remaining)
+            point_progress_callback(current, total_points, current / total_points * 100)
+        if step == 1:
+            break
+        step //= 2
+        im = np.minimum(i0 + step, i1)
+        jm = np.minimum(j0 + step, j1)
+        children = ([i0, im, j0, jm], [i0, im, jm, j1], [im, i1, j0, jm], [im, i1, jm, j1])
+        i0, i1, j0, j1 = [np.concatenate(parts) for parts in zip(*children)]
+        nonempty = (i1 > i0) & (j1 > j0)
+        i0, i1, j0, j1 = i0[nonempty], i1[nonempty], j0[nonempty], j1[nonempty]
+
+    # Evaluated cells are exact (shared block edges may also have been filled)
+    coverage[:, evaluated] = alts[:, None] > min_altitude[evaluated][None, :]
+    coverage[:, ~active] = False
+
+    if stats is not None:
+        n_evaluated = int(np.sum(evaluated))
+        stats["evaluated"] = stats.get("evaluated", 0) + n_evaluated
+        stats["filled"] = stats.get("filled", 0) + total_points - n_evaluated
+
+    return coverage
@@ -0,0 +1,102 @@
+"""
+Checkpoint Module
+
+This module keeps the row tiles of a long grid computation on disk as they
+complete, so an interrupted run (crash, Ctrl-C) resumes where it stopped.
+
+A checkpoint is keyed by the parameters of the computation (see
+result_cache.cache_key) and made of three files:
+- <key>.result.npy : the result array, memory-mapped, filled tile by tile
+- <key>.done.npy   : the completion bitmap, one flag per row tile
+- <key>.json       : the parameters, written once both arrays exist
+The tile layout only depends on the result shape (not on the number of
+workers), so a run may resume with other workers or backend. A tile's rows
+are flushed before its flag is set, so a set flag always means stored rows.
+"""
+
+import json
+import os
+import numpy as np
+from typing import Iterator, Tuple
+from numpy.lib.format import open_memmap
+from parallel import bounded_row_tiles
+from result_cache import RESULT_CACHE_DIR, cache_key
+
+
+# Default checkpoint directory, under the cache root (the result cache only
+# evicts its own top-level entries)
+CHECKPOINT_DIR = os.path.join(RESULT_CACHE_DIR, "checkpoints")
+
+
+class TileCheckpoint:
+    """
+    On-disk result of a row-tiled computation with a tile completion bitmap.
+
+    Attributes:
+    -----------
+    tiles : list of slice
+        Row tiles of the result (parallel.bounded_row_tiles: one flush per
+        tile of about TILE_CELLS cells is negligible next to its LOS work)
+    result : np.memmap
+        Result array (rows of pending tiles are undefined)
+    done : np.memmap
+        1D boolean array, True for each completed tile
+    """
+
+    def __init__(self, checkpoint_dir: str, params: dict, shape: Tuple[int, int], dtype):
+        self.tiles = bounded_row_tiles(shape)
+        dtype = np.dtype(dtype)
+        params = dict(params, shape=list(shape), dtype=dtype.str, tiles=len(self.tiles))
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.stem = os.path.join(checkpoint_dir, cache_key(params))
+
+        self.result = self.done = None
+        try:
+            with open(self.stem + ".json") as f:
+                if json.load(f) == json.loads(json.dumps(params)):
+                    self.result = open_memmap(self.stem + ".result.npy", mode="r+")
+                    self.done = open_memmap(self.stem + ".done.npy", mode="r+")
+        except (OSError, ValueError):
+            self.result = self.done = None
+        if (self.result is None or self.result.shape != tuple(shape) or
+                self.done.shape != (len(self.tiles),)):
+            # New checkpoint: arrays first, parameters last
+            self.result = open_memmap(self.stem + ".result.npy", mode="w+", dtype=dtype, shape=tuple(shape))
+            self.done = open_memmap(self.stem + ".done.npy", mode="w+", dtype=bool, shape=(len(self.tiles),))
+            self.done.flush()
+            tmp_path = f"{self.stem}.json.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(params, f)
+            os.replace(tmp_path, self.stem + ".json")
+
+    @property
+    def n_done(self) -> int:
+        """Number of completed tiles."""
+        return int(np.sum(self.done))
+
+    def pending(self) -> Iterator[Tuple[int, slice]]:
+        """(index, rows) of the tiles not completed yet."""
+        return ((index, rows) for index, rows in enumerate(self.tiles) if not self.done[index])
+
+    def complete(self, index: int, block: np.ndarray):
+        """Store the rows of tile `index` and mark it completed."""
+        rows = self.tiles[index]
+        self.result[rows] = block
+        self.result.flush()
+        self.done[index] = True
+        self.done.flush()
+
+    def close(self, remove: bool = False) -> np.ndarray:
+        """
+        Release the memory maps; with `remove`, delete the checkpoint files
+        (the computation is complete). Returns an in-memory copy of the result.
+        """
+        result = np.array(self.result)
+        self.result = self.done = None
+        if remove:
+            for suffix in (".json", ".done.npy", ".result.npy"):
+                try:
+                    os.remove(self.stem + suffix)
+                except OSError:
+                    pass
+        return result
@@ -6,9 +6,266 @@ Each coverage map is a 2D boolean array indicating visibility (True) or blockage
 at a specific altitude.
 """
 
+import os
 import numpy as np
-from typing import Dict, List, Optional
-from LOS import los_visible, fl_to_m
+from numpy.lib.format import open_memmap
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+from terrain import TerrainGrid, as_terrain_grid, grid_axes, to_caller_order
+from LOS import (los_min_visible_altitude, los_visible_batch, los_blocked_at,
+                 los_min_visible_altitude_batch, fl_to_m, BLOCKER_TOLERANCE_M)
+from viewshed import compute_viewshed_sweep, sweep_min_visible_altitude
+from pyramid import pyramid_coverage_rows
+from parallel import TILE_CELLS, bounded_row_tiles, iter_tiles, resolve_workers, run_tiled
+from los_jit import jit_coverage_rows, jit_min_altitude_rows, jit_min_altitude_points, resolve_backend
+from adaptive import adaptive_coverage
+from site_location_masks import mask_range_sector
+from horizon_cache import HORIZON_CACHE_DIR, horizon_params, horizon_store
+from result_cache import ResultCache, array_hash
+from checkpoint import TileCheckpoint
+
+
+# Available coverage engines
+ENGINES = ("los", "dda", "sweep", "pyramid")
+
+# Memory budget of one block of sampled LOS (targets x samples arrays): small
+# enough to stay in cache, ~32 targets (~13,000 sample points) at 400 samples
+LOS_CHUNK_BYTES = 2 * 2**20
+
+# Approximate memory held per sample point by the block temporaries
+LOS_BYTES_PER_SAMPLE = 160
+
+# Approximate memory held per target cell of a tile in flight: minimum
+# altitude, cell targets, active mask / indices and the copy sent back by a
+# worker (flight level maps add one byte each)
+TILE_BYTES_PER_CELL = 48
+
+
+class SparseMap(NamedTuple):
+    """
+    Compact form of a map computed on a region of interest: the values of the
+    computed cells only, at their flat (row-major) indices in the full map.
+    """
+    shape: Tuple[int, int]
+    index: np.ndarray
+    values: np.ndarray
+    fill: Union[bool, float]
+
+    @classmethod
+    def from_dense(cls, array: np.ndarray, region: np.ndarray, fill) -> "SparseMap":
+        """Keep the cells of `array` where `region` is True."""
+        index = np.flatnonzero(region)
+        if array.size <= np.iinfo(np.int32).max:
+            index = index.astype(np.int32)
+        return cls(array.shape, index, array.ravel()[index], fill)
+
+    def to_dense(self) -> np.ndarray:
+        """Full map, cells outside the region set to `fill`."""
+        dense = np.full(self.shape, self.fill, dtype=self.values.dtype)
+        dense.ravel()[self.index] = self.values
+        return dense
+
+
+class CoverageTile(NamedTuple):
+    """
+    Row tile of a coverage map, yielded by iter_coverage_tiles.
+
+    Attributes:
+    -----------
+    flight_level : float
+        Flight level of the map
+    bounds : tuple of slice
+        (rows, cols) of the tile in the full map, in the caller's order:
+        full_map[tile.bounds] = tile.coverage
+    coverage : np.ndarray
+        2D boolean array, True = visible, False = blocked
+    """
+    flight_level: float
+    bounds: Tuple[slice, slice]
+    coverage: np.ndarray
+
+
+def los_chunk_targets(n_samples: int, budget_bytes: Optional[int] = None) -> int:
+    """Number of targets per sampled-LOS block within the memory budget (default LOS_CHUNK_BYTES)."""
+    if budget_bytes is None:
+        budget_bytes = LOS_CHUNK_BYTES
+    return max(1, budget_bytes // (LOS_BYTES_PER_SAMPLE * max(1, n_samples - 1)))
+
+
+def budget_tile_cells(memory_budget: int, n_flight_levels: int, workers: int) -> int:
+    """
+    Cells per tile of iter_coverage_tiles keeping the tiles in flight (one
+    with workers=1, else 2 * workers) and the sampled-LOS blocks of the
+    workers within `memory_budget` bytes.
+    """
+    in_flight = 1 if workers == 1 else 2 * workers
+    free = memory_budget - workers * LOS_CHUNK_BYTES
+    return max(0, free // (in_flight * (TILE_BYTES_PER_CELL + n_flight_levels)))
+
+
+def _cell_targets(lats: np.ndarray, lons: np.ndarray):
+    """Flattened (target_lat, target_lon) of every grid cell, row-major."""
+    lon_grid, lat_grid = np.meshgrid(lons, lats)
+    return lat_grid.ravel(), lon_grid.ravel()
+
+
+def _target_axes(grid: TerrainGrid, lats, target_lats: Optional[np.ndarray],
+                 target_lons: Optional[np.ndarray]):
+    """
+    Target cell axes of a computation, and the function returning a result in
+    the caller's order: the terrain grid nodes by default (canonical order),
+    else the given target axes, used in their own order.
+    """
+    if target_lats is None and target_lons is None:
+        return grid.lats, grid.lons, lambda array: to_caller_order(array, grid, lats)
+    if target_lats is None or target_lons is None:
+        raise ValueError("target_lats and target_lons must be given together")
+    target_lats = np.asarray(target_lats, dtype=float)
+    target_lons = np.asarray(target_lons, dtype=float)
+    if target_lats.ndim != 1 or target_lons.ndim != 1 or not target_lats.size or not target_lons.size:
+        raise ValueError(f"Target axes must be non-empty 1D arrays, got shapes "
+                         f"{target_lats.shape} and {target_lons.shape}")
+    return target_lats, target_lons, lambda array: array
+
+
+def _range_limits(max_range_km: Optional[float], min_range_km: float,
+                  azimuth_sectors: Optional[Sequence[Tuple[float, float]]]) -> Optional[tuple]:
+    """
+    Checked (max_range_km, min_range_km, azimuth_sectors) around the radar,
+    or None when the whole grid is computed.
+    """
+    if max_range_km is not None and max_range_km <= 0:
+        raise ValueError(f"max_range_km must be > 0, got {max_range_km}")
+    if min_range_km < 0:
+        raise ValueError(f"min_range_km must be >= 0, got {min_range_km}")
+    if max_range_km is not None and min_range_km >= max_range_km:
+        raise ValueError(f"min_range_km ({min_range_km}) must be below max_range_km ({max_range_km})")
+    if azimuth_sectors is not None:
+        azimuth_sectors = [(float(start), float(end)) for start, end in azimuth_sectors]
+        if not azimuth_sectors:
+            raise ValueError("azimuth_sectors must hold at least one (start_deg, end_deg) sector")
+    if max_range_km is None and min_range_km == 0 and azimuth_sectors is None:
+        return None
+    return max_range_km, float(min_range_km), azimuth_sectors
+
+
+def _roi_cells(roi_mask: Optional[np.ndarray], shape: Tuple[int, int]) -> Optional[np.ndarray]:
+    """Checked boolean region-of-interest mask of the result shape, or None."""
+    if roi_mask is None:
+        return None
+    roi_mask = np.asarray(roi_mask, dtype=bool)
+    if roi_mask.shape != shape:
+        raise ValueError(f"roi_mask shape {roi_mask.shape} does not match the map shape {shape}")
+    return roi_mask
+
+
+def _active_cells(lats: np.ndarray, lons: np.ndarray, radar_lat: float, radar_lon: float,
+                  limits: Optional[tuple], roi: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Boolean (len(lats), len(lons)) array of the cells to compute: inside the
+    range / sector limits and the region of interest `roi` (same shape).
+    """
+    if limits is None:
+        active = np.ones((len(lats), len(lons)), dtype=bool)
+    else:
+        max_range_km, min_range_km, azimuth_sectors = limits
+        active = mask_range_sector(lats, lons, center_lat=radar_lat, center_lon=radar_lon,
+                                   max_range_km=max_range_km, min_range_km=min_range_km,
+                                   azimuth_sectors=azimuth_sectors)
+    if roi is not None:
+        active &= roi
+    return active
+
+
+def _rows_roi(roi: Optional[np.ndarray], rows: slice) -> Optional[np.ndarray]:
+    """Rows `rows` of a region-of-interest mask, or None."""
+    return None if roi is None else roi[rows]
+
+
+def _min_altitude_points(
+    grid: TerrainGrid,
+    target_lat: np.ndarray,
+    target_lon: np.ndarray,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    n_samples: int,
+    margin_m: float,
+    los_mode: str,
+    backend: str = "numpy",
+    k_factor: Optional[float] = None
+) -> np.ndarray:
+    """
+    Minimum visible altitude of 1D arrays of targets at any positions (the
+    LOS evaluator of the adaptive refinement, see adaptive.adaptive_coverage).
+    """
+    if backend == "jit":
+        return jit_min_altitude_points(grid, target_lat, target_lon, radar_lat, radar_lon,
+                                       radar_height_agl_m, n_samples, margin_m, los_mode,
+                                       k_factor)
+    if los_mode == "dda":
+        return np.array([
+            los_min_visible_altitude(radar_lat, radar_lon, radar_height_agl_m, lat, lon,
+                                     grid, margin_m=margin_m, mode="dda", k_factor=k_factor)
+            for lat, lon in zip(target_lat, target_lon)
+        ], dtype=float)
+    
+    min_altitude = np.empty(len(target_lat))
+    chunk = los_chunk_targets(n_samples)
+    for start in range(0, len(target_lat), chunk):
+        stop = min(start + chunk, len(target_lat))
+        min_altitude[start:stop] = los_min_visible_altitude_batch(
+            radar_lat, radar_lon, radar_height_agl_m,
+            target_lat[start:stop], target_lon[start:stop],
+            grid, n_samples=n_samples, margin_m=margin_m, k_factor=k_factor
+        )
+    return min_altitude
+
+
+def _adaptive_coverage(
+    grid: TerrainGrid,
+    target_lats: np.ndarray,
+    target_lons: np.ndarray,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    target_alts_m_msl: List[float],
+    n_samples: int,
+    margin_m: float,
+    engine: str,
+    backend: str,
+    adaptive_block: int,
+    limits: Optional[tuple] = None,
+    roi: Optional[np.ndarray] = None,
+    k_factor: Optional[float] = None,
+    point_progress_callback: Optional[callable] = None,
+    stats: Optional[dict] = None
+) -> np.ndarray:
+    """
+    Coverage of the target axes at several altitudes by adaptive
+    refinement, with the per-cell LOS of `engine` at the evaluated cells.
+    Blocks without a cell inside the range / sector `limits` and the region
+    of interest `roi` are skipped (blocked). Corners of the other blocks get
+    their LOS even outside the limits: a corner outside a narrow sector must
+    not fill the cells of the block inside it as blocked. The limits are
+    applied once, to the final maps.
+    """
+    if engine == "sweep":
+        raise ValueError("Adaptive refinement needs a per-cell LOS engine ('los', 'dda' or 'pyramid')")
+    los_mode = "dda" if engine in ("dda", "pyramid") else "sample"
+    backend = resolve_backend(backend, grid)
+    
+    def min_altitude_points(target_lat, target_lon):
+        return _min_altitude_points(grid, target_lat, target_lon,
+                                    radar_lat, radar_lon, radar_height_agl_m,
+                                    n_samples, margin_m, los_mode, backend, k_factor)
+    
+    active = None
+    if limits is not None or roi is not None:
+        active = _active_cells(target_lats, target_lons, radar_lat, radar_lon, limits, roi)
+    return adaptive_coverage(grid, target_alts_m_msl, min_altitude_points,
+                             block_size=adaptive_block, margin_m=margin_m,
+                             point_progress_callback=point_progress_callback, stats=stats,
+                             target_lats=target_lats, target_lons=target_lons, active=active)
 
 
 def compute_coverage_map(
@@ -16,14 +273,29 @@ def compute_coverage_map(
     radar_lon: float,
     radar_height_agl_m: float,
     flight_level: float,
-    lats: np.ndarray,
-    lons: np.ndarray,
-    Z: np.ndarray,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    Z: Optional[np.ndarray] = None,
     n_samples: int = 400,
     margin_m: float = 0.0,
     progress_callback: Optional[callable] = None,
-    point_progress_callback: Optional[callable] = None
-) -> np.ndarray:
+    point_progress_callback: Optional[callable] = None,
+    engine: str = "los",
+    workers: int = 1,
+    backend: str = "numpy",
+    stats: Optional[dict] = None,
+    adaptive_block: int = 0,
+    target_lats: Optional[np.ndarray] = None,
+    target_lons: Optional[np.ndarray] = None,
+    max_range_km: Optional[float] = None,
+    min_range_km: float = 0.0,
+    azimuth_sectors: Optional[List[Tuple[float, float]]] = None,
+    roi_mask: Optional[np.ndarray] = None,
+    sparse: bool = False,
+    k_factor: Optional[float] = None,
+    horizon_cache: Optional[str] = None,
+    checkpoint: Optional[str] = None
+) -> Union[np.ndarray, SparseMap]:
     """
     Compute coverage map for a single flight level.
     
@@ -37,8 +309,8 @@ def compute_coverage_map(
         Radar height above ground level (meters)
     flight_level : float
         Flight level (e.g., 5, 10, 20, 50, 100, 200, 300, 400)
-    lats : np.ndarray
-        1D array of latitude values
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values, or a TerrainGrid (lons and Z omitted)
     lons : np.ndarray
         1D array of longitude values
     Z : np.ndarray
@@ -51,39 +323,332 @@ def compute_coverage_map(
         (Deprecated - use point_progress_callback instead)
     point_progress_callback : callable, optional
         Callback function for progress updates: callback(current, total, percentage)
+    engine : str, optional
+        Coverage engine (default: "los")
+        - "los"   : LOS.los_visible for every grid cell (n_samples per path),
+                    evaluated in blocks of targets x samples within
+                    LOS_CHUNK_BYTES of memory
+        - "dda"   : one exact LOS per grid cell, visiting each terrain cell
+                    crossed by the path once (n_samples unused)
+        - "sweep" : radial sweep carrying the running horizon along rays cast
+                    from the radar (one pass over the grid, n_samples unused);
+                    approximate, errors are mostly cells wrongly visible
+                    (see viewshed.py)
+        - "pyramid" : accept / reject each cell against the max-elevation
+                    pyramid, exact "dda" LOS only for undecided cells
+                    (same result as "dda", n_samples unused)
+    workers : int, optional
+        Number of worker processes (default: 1 = serial, 0 = one per CPU).
+        Row tiles of the grid are scheduled dynamically on a process pool and
+        the result is identical to the serial loop. Unused by "sweep".
+    backend : str, optional
+        Per-cell LOS loop of the "los" and "dda" engines (default: "numpy")
+        - "numpy" : NumPy evaluation (blocks of targets for "los", one
+                    exact LOS per cell for "dda")
+        - "jit"   : the same loop compiled with numba (identical result);
+                    falls back to "numpy" when numba is not installed
+    stats : dict, optional
+        If provided, filled with instrumentation counters summed over all
+        tiles / workers:
+        - "los" / "dda": "blocker_tests" (targets first tested at a
+          neighbour's blocker, see LOS.los_blocked_at), "blocker_hits"
+          (targets rejected by that single test) and "blocker_hit_rate"
+        - "pyramid": "accepted", "rejected" and "refined"
+        - adaptive refinement: "evaluated" and "filled"
+    adaptive_block : int, optional
+        Coarse block side (cells, power of two) of the adaptive refinement
+        (default: 0 = off). The LOS of `engine` is evaluated at the block
+        corners and only the blocks near a visibility boundary or close to
+        the terrain are subdivided; the others are filled from their corners
+        (see adaptive.py). Full resolution at a fraction of the LOS
+        evaluations, but filled cells are approximate. Runs serially
+        (workers unused) and needs a per-cell engine (not "sweep").
+    target_lats, target_lons : np.ndarray, optional
+        1D axes of the target cells, when the map is not wanted at the terrain
+        grid nodes (default: None = terrain grid nodes). The LOS still runs on
+        the full terrain grid, so a coarse target grid costs in proportion to
+        its cells without smoothing out peaks. Targets should lie inside the
+        terrain grid (terrain beyond it is no-data, hence blocked). Not
+        supported by engine "sweep".
+    max_range_km : float, optional
+        Instrumented range: cells farther from the radar (great-circle
+        distance) are skipped before any LOS work and reported blocked
+        (default: None = unlimited)
+    min_range_km : float, optional
+        Cells closer to the radar than this are skipped (default: 0.0)
+    azimuth_sectors : list of (start_deg, end_deg), optional
+        Sectors covered by the sensor, each from start_deg clockwise to
+        end_deg (degrees from true north); cells in the blanked gaps between
+        them are skipped (default: None = all azimuths). The "sweep" engine
+        computes its whole grid and masks these limits afterwards.
+    roi_mask : np.ndarray, optional
+        2D boolean region of interest (e.g. an FIR or airspace footprint, see
+        site_location_masks) with the shape of the result: only the cells
+        where it is True are computed, the others are reported blocked, so
+        the cost follows the size of the region (default: None = all cells).
+        The "sweep" engine computes its whole grid and masks it afterwards.
+    sparse : bool, optional
+        Return a SparseMap holding only the computed cells (inside roi_mask
+        and the range / sector limits) instead of the 2D array (default: False)
+    k_factor : float, optional
+        Effective earth radius factor (default: None = flat terrain). Terrain
+        and target are lowered by the earth drop x^2 / (2 k R) at their
+        ground distance x from the radar, in every engine and backend (see
+        LOS.earth_bulge); LOS.STANDARD_K_FACTOR (4/3) models standard
+        atmospheric refraction, 1.0 the geometric earth.
+    horizon_cache : str, optional
+        Directory of the horizon profile cache (default: None = off, see
+        horizon_cache.py and compute_horizon_profile). The minimum visible
+        altitude of every target cell is loaded from it, or computed once
+        without range limits / region of interest and stored, and the map is
+        derived from it: any flight level, range / sector limit or region of
+        interest then costs a threshold and a mask. Not combined with
+        adaptive_block.
+    checkpoint : str, optional
+        Checkpoint directory (default: None = off, see checkpoint.py). The
+        map is computed in row tiles stored to a memory-mapped file as they
+        complete, with a tile completion bitmap; calling again with the same
+        parameters after an interruption only computes the missing tiles.
+        The checkpoint is deleted once the map is complete. Unused by
+        "sweep" and adaptive refinement.
     
     Returns:
     --------
-    np.ndarray
-        2D boolean array with shape (len(lats), len(lons))
+    np.ndarray or SparseMap
+        2D boolean array with shape (len(lats), len(lons)), or
+        (len(target_lats), len(target_lons)) with target axes
         True = visible, False = blocked
+        With sparse=True, the SparseMap of that array (fill False)
     """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown coverage engine '{engine}', expected one of {ENGINES}")
+    if engine == "sweep" and (target_lats is not None or target_lons is not None):
+        raise ValueError("Engine 'sweep' computes the terrain grid nodes: use a per-cell engine with target axes")
+    limits = _range_limits(max_range_km, min_range_km, azimuth_sectors)
+    
     # Convert flight level to altitude in meters
     target_alt_m_msl = fl_to_m(flight_level)
     
+    if horizon_cache is not None:
+        if adaptive_block:
+            raise ValueError("adaptive_block cannot be combined with horizon_cache: "
+                             "the horizon profile already holds every cell")
+        min_altitude = compute_min_altitude_map(
+            radar_lat, radar_lon, radar_height_agl_m, lats, lons, Z,
+            n_samples=n_samples, margin_m=margin_m,
+            point_progress_callback=point_progress_callback, engine=engine, workers=workers,
+            backend=backend, target_lats=target_lats, target_lons=target_lons,
+            max_range_km=max_range_km, min_range_km=min_range_km, azimuth_sectors=azimuth_sectors,
+            roi_mask=roi_mask, sparse=sparse, k_factor=k_factor, horizon_cache=horizon_cache,
+            checkpoint=checkpoint
+        )
+        if sparse:
+            return min_altitude._replace(values=target_alt_m_msl > min_altitude.values, fill=False)
+        return target_alt_m_msl > min_altitude
+    
+    if engine == "sweep" and not adaptive_block:
+        coverage_map = compute_viewshed_sweep(
+            radar_lat, radar_lon, radar_height_agl_m, target_alt_m_msl,
+            lats, lons, Z, margin_m=margin_m,
+            point_progress_callback=point_progress_callback, k_factor=k_factor
+        )
+        region = _active_cells(*grid_axes(lats, lons), radar_lat, radar_lon, limits,
+                               _roi_cells(roi_mask, coverage_map.shape))
+        coverage_map &= region
+        return SparseMap.from_dense(coverage_map, region, False) if sparse else coverage_map
+    
+    # Build the terrain grid once, outside the per-cell loop
+    grid = as_terrain_grid(lats, lons, Z)
+    t_lats, t_lons, caller_order = _target_axes(grid, lats, target_lats, target_lons)
+    # Region of interest in the canonical order of the target cells
+    roi = _roi_cells(roi_mask, (len(t_lats), len(t_lons)))
+    if roi is not None:
+        roi = caller_order(roi)
+    
+    if adaptive_block:
+        coverage_map = _adaptive_coverage(
+            grid, t_lats, t_lons, radar_lat, radar_lon, radar_height_agl_m, [target_alt_m_msl],
+            n_samples, margin_m, engine, backend, adaptive_block, limits, roi, k_factor,
+            point_progress_callback=point_progress_callback, stats=stats
+        )[0]
+        return _caller_result(coverage_map, caller_order, t_lats, t_lons, radar_lat, radar_lon,
+                              limits, roi, sparse, False)
+    
+    args = (t_lats, t_lons, radar_lat, radar_lon, radar_height_agl_m, target_alt_m_msl,
+            n_samples, margin_m, engine, resolve_backend(backend, grid), limits, roi, k_factor)
+    
+    workers = resolve_workers(workers)
+    tile_checkpoint = None
+    if checkpoint is not None:
+        tile_checkpoint = _open_checkpoint(
+            checkpoint, "coverage", grid, t_lats, t_lons, radar_lat, radar_lon, radar_height_agl_m,
+            flight_level, n_samples, margin_m, engine, limits, roi, k_factor, bool)
+    if workers > 1 or tile_checkpoint is not None:
+        if engine == "pyramid" and workers > 1:
+            # Build the cached bounds once, shared with the workers
+            grid.max_pyramid()
+            grid.slope_bounds()
+        coverage_map = run_tiled(_coverage_rows, grid, args, bool, workers,
+                                 point_progress_callback=point_progress_callback,
+                                 stats=stats, shape=(len(t_lats), len(t_lons)),
+                                 checkpoint=tile_checkpoint)
+    else:
+        coverage_map = _coverage_rows(grid, slice(0, len(t_lats)), *args,
+                                      point_progress_callback=point_progress_callback,
+                                      stats=stats)
+    
+    if stats is not None and "blocker_tests" in stats:
+        stats["blocker_hit_rate"] = stats["blocker_hits"] / max(1, stats["blocker_tests"])
+    
+    return _caller_result(coverage_map, caller_order, t_lats, t_lons, radar_lat, radar_lon,
+                          limits, roi, sparse, False)
+
+
+def _caller_result(array: np.ndarray, caller_order, target_lats: np.ndarray,
+                   target_lons: np.ndarray, radar_lat: float, radar_lon: float,
+                   limits: Optional[tuple], roi: Optional[np.ndarray], sparse: bool, fill):
+    """
+    Canonical result of the target cells in the caller's order, as a 2D array
+    or, with `sparse`, as the SparseMap of the cells inside the limits and ROI.
+    """
+    array = caller_order(array)
+    if not sparse:
+        return array
+    region = _active_cells(target_lats, target_lons, radar_lat, radar_lon, limits, roi)
+    return SparseMap.from_dense(array, caller_order(region), fill)
+
+
+def _coverage_rows(
+    grid: TerrainGrid,
+    rows: slice,
+    target_lats: np.ndarray,
+    target_lons: np.ndarray,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    target_alt_m_msl: float,
+    n_samples: int,
+    margin_m: float,
+    engine: str,
+    backend: str = "numpy",
+    limits: Optional[tuple] = None,
+    roi: Optional[np.ndarray] = None,
+    k_factor: Optional[float] = None,
+    point_progress_callback: Optional[callable] = None,
+    stats: Optional[dict] = None
+) -> np.ndarray:
+    """
+    Coverage of the target rows `rows` (a slice of target_lats): the per-cell
+    loop of compute_coverage_map, shared by the serial and process-pool paths.
+    Cells outside the range / sector `limits` or the region of interest `roi`
+    (all target cells) are skipped (blocked).
+    """
+    lats = target_lats[rows]
+    lons = target_lons
+    active = _active_cells(lats, lons, radar_lat, radar_lon, limits, _rows_roi(roi, rows))
+    
+    if engine == "pyramid":
+        return pyramid_coverage_rows(
+            grid, rows, radar_lat, radar_lon, radar_height_agl_m, target_alt_m_msl,
+            margin_m=margin_m, point_progress_callback=point_progress_callback,
+            stats=stats, target_lats=target_lats, target_lons=target_lons, active=active,
+            k_factor=k_factor
+        )
+    
+    los_mode = "dda" if engine == "dda" else "sample"
+    if backend == "jit":
+        return jit_coverage_rows(
+            grid, rows, target_lats, target_lons,
+            radar_lat, radar_lon, radar_height_agl_m, target_alt_m_msl,
+            n_samples, margin_m, los_mode, point_progress_callback=point_progress_callback,
+            stats=stats, active=active, k_factor=k_factor
+        )
+    
     # Initialize coverage map
     coverage_map = np.zeros((len(lats), len(lons)), dtype=bool)
     
-    # Total number of grid points
-    total_points = len(lats) * len(lons)
+    # Grid points to compute (flat indices, row-major)
+    cells = np.flatnonzero(active)
+    total_points = cells.size
     current_point = 0
     
     # Progress reporting interval (print every N points)
     progress_interval = max(1, total_points // 50)  # Report ~50 times
     
-    # Loop over all grid points
-    for i in range(len(lats)):
-        for j in range(len(lons)):
+    # Blocker cache: neighbouring targets are usually blocked by the same
+    # ridge, so the path fraction where a target was blocked is tested first
+    # on the next one (one sample instead of a whole LOS)
+    blocker_tests = 0
+    blocker_hits = 0
+    
+    if los_mode == "sample":
+        # Blocks of targets x samples evaluated as one array; the cached
+        # blocker of each target is the one of the cell below it
+        target_lat, target_lon = _cell_targets(lats, lons)
+        flat = coverage_map.ravel()
+        column_blocker = np.full(len(lons), np.nan)
+        chunk = los_chunk_targets(n_samples)
+        for start in range(0, total_points, chunk):
+            stop = min(start + chunk, total_points)
+            block = cells[start:stop]
+            cols = block % len(lons)
+            blocker = column_blocker[cols]
+            
+            tested = np.flatnonzero(~np.isnan(blocker))
+            hit = np.zeros(stop - start, dtype=bool)
+            hit[tested] = los_blocked_at(
+                radar_lat, radar_lon, radar_height_agl_m,
+                target_lat[block[tested]], target_lon[block[tested]], target_alt_m_msl,
+                blocker[tested], grid, margin_m=margin_m, k_factor=k_factor
+            )
+            blocker_tests += tested.size
+            blocker_hits += int(np.sum(hit))
+            
+            rest = np.flatnonzero(~hit)
+            visible, blocker[rest] = los_visible_batch(
+                radar_lat, radar_lon, radar_height_agl_m,
+                target_lat[block[rest]], target_lon[block[rest]], target_alt_m_msl,
+                grid, n_samples=n_samples, margin_m=margin_m, return_blocker=True,
+                k_factor=k_factor
+            )
+            flat[block[rest]] = visible
+            column_blocker[cols] = blocker
+            
+            if point_progress_callback and (stop // progress_interval > start // progress_interval or stop == total_points):
+                point_progress_callback(stop, total_points, stop / total_points * 100)
+    else:
+        last_blocker = np.nan
+        
+        # Loop over the grid points to compute
+        for i, j in zip(*np.unravel_index(cells, coverage_map.shape)):
             target_lat = lats[i]
             target_lon = lons[j]
             
+            # Previous target's blocker first, with a tolerance since the
+            # exact LOS does not evaluate the terrain by sampling
+            if not np.isnan(last_blocker):
+                blocker_tests += 1
+                is_visible = not los_blocked_at(
+                    radar_lat, radar_lon, radar_height_agl_m,
+                    target_lat, target_lon, target_alt_m_msl,
+                    last_blocker, grid, margin_m=margin_m, tolerance_m=BLOCKER_TOLERANCE_M,
+                    k_factor=k_factor
+                )
+                blocker_hits += not is_visible
+            else:
+                is_visible = True
+            
             # Check LOS visibility
-            is_visible = los_visible(
-                radar_lat, radar_lon, radar_height_agl_m,
-                target_lat, target_lon, target_alt_m_msl,
-                lats, lons, Z,
-                n_samples=n_samples, margin_m=margin_m
-            )
+            if is_visible:
+                min_alt, blocker_s = los_min_visible_altitude(
+                    radar_lat, radar_lon, radar_height_agl_m,
+                    target_lat, target_lon,
+                    grid,
+                    n_samples=n_samples, margin_m=margin_m, mode=los_mode,
+                    return_blocker=True, k_factor=k_factor
+                )
+                is_visible = target_alt_m_msl > min_alt
+                last_blocker = np.nan if is_visible else blocker_s
             
             coverage_map[i, j] = is_visible
             
@@ -93,21 +658,436 @@ def compute_coverage_map(
                 pct = (current_point / total_points) * 100
                 point_progress_callback(current_point, total_points, pct)
     
+    if stats is not None:
+        stats["blocker_tests"] = stats.get("blocker_tests", 0) + blocker_tests
+        stats["blocker_hits"] = stats.get("blocker_hits", 0) + blocker_hits
+    
     return coverage_map
 
 
+def compute_min_altitude_map(
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    Z: Optional[np.ndarray] = None,
+    n_samples: int = 400,
+    margin_m: float = 0.0,
+    point_progress_callback: Optional[callable] = None,
+    engine: str = "los",
+    workers: int = 1,
+    backend: str = "numpy",
+    target_lats: Optional[np.ndarray] = None,
+    target_lons: Optional[np.ndarray] = None,
+    max_range_km: Optional[float] = None,
+    min_range_km: float = 0.0,
+    azimuth_sectors: Optional[List[Tuple[float, float]]] = None,
+    roi_mask: Optional[np.ndarray] = None,
+    sparse: bool = False,
+    k_factor: Optional[float] = None,
+    horizon_cache: Optional[str] = None,
+    checkpoint: Optional[str] = None
+) -> Union[np.ndarray, SparseMap]:
+    """
+    Compute the minimum visible altitude of every grid cell.
+    
+    For a fixed target position visibility only grows with altitude, so one
+    raster holds the coverage of every flight level: a cell is visible at
+    altitude h (m MSL) if and only if h > min_altitude[i, j].
+    
+    Parameters:
+    -----------
+    radar_lat : float
+        Radar latitude (degrees)
+    radar_lon : float
+        Radar longitude (degrees)
+    radar_height_agl_m : float
+        Radar height above ground level (meters)
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values, or a TerrainGrid (lons and Z omitted)
+    lons : np.ndarray
+        1D array of longitude values
+    Z : np.ndarray
+        2D terrain elevation array with shape (len(lats), len(lons))
+    n_samples : int, optional
+        Number of samples along LOS path (default: 400)
+    margin_m : float, optional
+        Safety margin in meters (default: 0.0)
+    point_progress_callback : callable, optional
+        Callback function for progress updates: callback(current, total, percentage)
+    engine : str, optional
+        Coverage engine, see compute_coverage_map (default: "los");
+        "pyramid" computes the raster with the exact "dda" LOS
+    workers : int, optional
+        Number of worker processes, see compute_coverage_map (default: 1)
+    backend : str, optional
+        LOS backend, see compute_coverage_map (default: "numpy")
+    target_lats, target_lons : np.ndarray, optional
+        1D axes of the target cells, see compute_coverage_map (default: terrain grid nodes)
+    max_range_km, min_range_km, azimuth_sectors : optional
+        Range / azimuth-sector limits, see compute_coverage_map; skipped
+        cells are never visible (inf)
+    roi_mask : np.ndarray, optional
+        2D boolean region of interest, see compute_coverage_map; cells
+        outside are never visible (inf)
+    sparse : bool, optional
+        Return the SparseMap of the computed cells, see compute_coverage_map
+        (default: False)
+    k_factor : float, optional
+        Effective earth radius factor, see compute_coverage_map (default: None)
+    horizon_cache : str, optional
+        Directory of the horizon profile cache, see compute_coverage_map
+        (default: None = off): the raster is loaded from it (or computed and
+        stored) and the limits / region of interest are applied as a mask
+    checkpoint : str, optional
+        Checkpoint directory, see compute_coverage_map (default: None = off)
+    
+    Returns:
+    --------
+    np.ndarray or SparseMap
+        2D float array with shape (len(lats), len(lons)), or
+        (len(target_lats), len(target_lons)) with target axes
+        Minimum visible altitude in meters MSL (inf = never visible)
+        With sparse=True, the SparseMap of that array (fill inf)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown coverage engine '{engine}', expected one of {ENGINES}")
+    if engine == "sweep" and (target_lats is not None or target_lons is not None):
+        raise ValueError("Engine 'sweep' computes the terrain grid nodes: use a per-cell engine with target axes")
+    limits = _range_limits(max_range_km, min_range_km, azimuth_sectors)
+    
+    if horizon_cache is not None:
+        grid = as_terrain_grid(lats, lons, Z)
+        t_lats, t_lons, caller_order = _target_axes(grid, lats, target_lats, target_lons)
+        roi = _roi_cells(roi_mask, (len(t_lats), len(t_lons)))
+        if roi is not None:
+            roi = caller_order(roi)
+        min_altitude = _horizon_profile(
+            grid, target_lats, target_lons, radar_lat, radar_lon, radar_height_agl_m,
+            n_samples, margin_m, engine, workers, backend, k_factor, horizon_cache,
+            point_progress_callback=point_progress_callback, checkpoint=checkpoint
+        )
+        region = _active_cells(t_lats, t_lons, radar_lat, radar_lon, limits, roi)
+        return _caller_result(np.where(region, min_altitude, np.inf), caller_order, t_lats, t_lons,
+                              radar_lat, radar_lon, limits, roi, sparse, np.inf)
+    
+    if engine == "sweep":
+        min_altitude = sweep_min_visible_altitude(
+            radar_lat, radar_lon, radar_height_agl_m,
+            lats, lons, Z, margin_m=margin_m,
+            point_progress_callback=point_progress_callback, k_factor=k_factor
+        )
+        region = _active_cells(*grid_axes(lats, lons), radar_lat, radar_lon, limits,
+                               _roi_cells(roi_mask, min_altitude.shape))
+        min_altitude[~region] = np.inf
+        return SparseMap.from_dense(min_altitude, region, np.inf) if sparse else min_altitude
+    
+    grid = as_terrain_grid(lats, lons, Z)
+    t_lats, t_lons, caller_order = _target_axes(grid, lats, target_lats, target_lons)
+    roi = _roi_cells(roi_mask, (len(t_lats), len(t_lons)))
+    if roi is not None:
+        roi = caller_order(roi)
+    # The pyramid needs a target altitude to accept / reject: use its exact fallback
+    los_mode = "dda" if engine in ("dda", "pyramid") else "sample"
+    args = (t_lats, t_lons, radar_lat, radar_lon, radar_height_agl_m, n_samples, margin_m,
+            los_mode, resolve_backend(backend, grid), limits, roi, k_factor)
+    
+    workers = resolve_workers(workers)
+    tile_checkpoint = None
+    if checkpoint is not None:
+        tile_checkpoint = _open_checkpoint(
+            checkpoint, "min_altitude", grid, t_lats, t_lons, radar_lat, radar_lon,
+            radar_height_agl_m, None, n_samples, margin_m, engine, limits, roi, k_factor, float)
+    if workers > 1 or tile_checkpoint is not None:
+        min_altitude = run_tiled(_min_altitude_rows, grid, args, float, workers,
+                                 point_progress_callback=point_progress_callback,
+                                 shape=(len(t_lats), len(t_lons)), checkpoint=tile_checkpoint)
+    else:
+        min_altitude = _min_altitude_rows(grid, slice(0, len(t_lats)), *args,
+                                          point_progress_callback=point_progress_callback)
+    
+    return _caller_result(min_altitude, caller_order, t_lats, t_lons, radar_lat, radar_lon,
+                          limits, roi, sparse, np.inf)
+
+
+def _min_altitude_rows(
+    grid: TerrainGrid,
+    rows: slice,
+    target_lats: np.ndarray,
+    target_lons: np.ndarray,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    n_samples: int,
+    margin_m: float,
+    los_mode: str,
+    backend: str = "numpy",
+    limits: Optional[tuple] = None,
+    roi: Optional[np.ndarray] = None,
+    k_factor: Optional[float] = None,
+    point_progress_callback: Optional[callable] = None
+) -> np.ndarray:
+    """
+    Minimum visible altitude of the target rows `rows` (a slice of
+    target_lats): the per-cell loop of compute_min_altitude_map. Cells
+    outside the range / sector `limits` or the region of interest `roi` are
+    skipped (inf).
+    """
+    lats = target_lats[rows]
+    lons = target_lons
+    active = _active_cells(lats, lons, radar_lat, radar_lon, limits, _rows_roi(roi, rows))
+    
+    if backend == "jit":
+        return jit_min_altitude_rows(
+            grid, rows, target_lats, target_lons, radar_lat, radar_lon, radar_height_agl_m,
+            n_samples, margin_m, los_mode, point_progress_callback=point_progress_callback,
+            active=active, k_factor=k_factor
+        )
+    
+    min_altitude = np.full((len(lats), len(lons)), np.inf)
+    
+    cells = np.flatnonzero(active)
+    total_points = cells.size
+    current_point = 0
+    progress_interval = max(1, total_points // 50)  # Report ~50 times
+    
+    if los_mode == "sample":
+        # Blocks of targets x samples evaluated as one array
+        target_lat, target_lon = _cell_targets(lats, lons)
+        flat = min_altitude.ravel()
+        chunk = los_chunk_targets(n_samples)
+        for start in range(0, total_points, chunk):
+            stop = min(start + chunk, total_points)
+            block = cells[start:stop]
+            flat[block] = los_min_visible_altitude_batch(
+                radar_lat, radar_lon, radar_height_agl_m,
+                target_lat[block], target_lon[block],
+                grid, n_samples=n_samples, margin_m=margin_m, k_factor=k_factor
+            )
+            if point_progress_callback and (stop // progress_interval > start // progress_interval or stop == total_points):
+                point_progress_callback(stop, total_points, stop / total_points * 100)
+        return min_altitude
+    
+    for i, j in zip(*np.unravel_index(cells, min_altitude.shape)):
+        min_altitude[i, j] = los_min_visible_altitude(
+            radar_lat, radar_lon, radar_height_agl_m,
+            lats[i], lons[j],
+            grid,
+            n_samples=n_samples, margin_m=margin_m, mode=los_mode, k_factor=k_factor
+        )
+        
+        current_point += 1
+        if point_progress_callback and (current_point % progress_interval == 0 or current_point == total_points):
+            pct = (current_point / total_points) * 100
+            point_progress_callback(current_point, total_points, pct)
+    
+    return min_altitude
+
+
+def _horizon_profile(
+    grid: TerrainGrid,
+    target_lats: Optional[np.ndarray],
+    target_lons: Optional[np.ndarray],
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    n_samples: int,
+    margin_m: float,
+    engine: str,
+    workers: int,
+    backend: str,
+    k_factor: Optional[float],
+    cache_dir: str,
+    point_progress_callback: Optional[callable] = None,
+    checkpoint: Optional[str] = None
+) -> np.ndarray:
+    """
+    Minimum visible altitude of every target cell (canonical order without
+    target axes), loaded from the horizon cache in `cache_dir`, or computed
+    without range limits / region of interest and stored there.
+    """
+    t_lats, t_lons, _ = _target_axes(grid, grid, target_lats, target_lons)
+    params = horizon_params(radar_lat, radar_lon, radar_height_agl_m, grid, t_lats, t_lons,
+                            engine, n_samples, margin_m, k_factor)
+    store = horizon_store(cache_dir)
+    min_altitude = store.get(params)
+    if min_altitude is not None:
+        print(f"  → Horizon profile loaded from {cache_dir}", flush=True)
+        return min_altitude
+    
+    min_altitude = compute_min_altitude_map(
+        radar_lat, radar_lon, radar_height_agl_m, grid,
+        n_samples=n_samples, margin_m=margin_m,
+        point_progress_callback=point_progress_callback, engine=engine, workers=workers,
+        backend=backend, target_lats=target_lats, target_lons=target_lons, k_factor=k_factor,
+        checkpoint=checkpoint
+    )
+    try:
+        store.put(params, min_altitude)
+        print(f"  → Horizon profile saved to {cache_dir}", flush=True)
+    except OSError as e:
+        print(f"  ⚠️  Horizon profile not saved: {e}")
+    return min_altitude
+
+
+def _coverage_params(
+    grid: TerrainGrid,
+    target_lats: np.ndarray,
+    target_lons: np.ndarray,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    flight_level: float,
+    n_samples: int,
+    margin_m: float,
+    engine: str,
+    adaptive_block: int,
+    limits: Optional[tuple],
+    roi: Optional[np.ndarray],
+    k_factor: Optional[float]
+) -> dict:
+    """
+    Result cache parameters of one coverage map (see result_cache.py): those
+    of its horizon profile, plus the flight level, adaptive refinement, range /
+    sector limits and region of interest.
+    """
+    params = horizon_params(radar_lat, radar_lon, radar_height_agl_m, grid,
+                            target_lats, target_lons, engine, n_samples, margin_m, k_factor)
+    params.update(kind="coverage",
+                  flight_level=None if flight_level is None else float(flight_level),
+                  adaptive_block=int(adaptive_block), limits=limits, roi=array_hash(roi))
+    return params
+
+
+def _open_checkpoint(
+    checkpoint_dir: str,
+    kind: str,
+    grid: TerrainGrid,
+    target_lats: np.ndarray,
+    target_lons: np.ndarray,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    flight_level: Optional[float],
+    n_samples: int,
+    margin_m: float,
+    engine: str,
+    limits: Optional[tuple],
+    roi: Optional[np.ndarray],
+    k_factor: Optional[float],
+    dtype
+) -> TileCheckpoint:
+    """
+    Checkpoint of a row-tiled pass (`kind` "coverage" or "min_altitude"),
+    keyed like the result cache; reports the tiles already done.
+    """
+    params = _coverage_params(grid, target_lats, target_lons, radar_lat, radar_lon,
+                              radar_height_agl_m, flight_level, n_samples, margin_m, engine,
+                              0, limits, roi, k_factor)
+    params["kind"] = kind
+    tile_checkpoint = TileCheckpoint(checkpoint_dir, params, (len(target_lats), len(target_lons)), dtype)
+    if tile_checkpoint.n_done:
+        print(f"  → Resuming from checkpoint: {tile_checkpoint.n_done}/{len(tile_checkpoint.tiles)} "
+              f"tiles already done", flush=True)
+    return tile_checkpoint
+
+
+def compute_horizon_profile(
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    Z: Optional[np.ndarray] = None,
+    n_samples: int = 400,
+    margin_m: float = 0.0,
+    point_progress_callback: Optional[callable] = None,
+    engine: str = "los",
+    workers: int = 1,
+    backend: str = "numpy",
+    target_lats: Optional[np.ndarray] = None,
+    target_lons: Optional[np.ndarray] = None,
+    k_factor: Optional[float] = None,
+    cache_dir: str = HORIZON_CACHE_DIR,
+    checkpoint: Optional[str] = None
+) -> np.ndarray:
+    """
+    Build (or load) the horizon profile of a radar: the minimum visible
+    altitude of every target cell, stored in `cache_dir` keyed by the radar,
+    the terrain content and the LOS settings (see horizon_cache.py).
+    
+    The first call costs one compute_min_altitude_map pass; any later call
+    with the same parameters, in this run or another, only reads the file
+    (until the store evicts it, see horizon_cache.horizon_store).
+    Parameters are those of compute_min_altitude_map.
+    
+    Returns:
+    --------
+    np.ndarray
+        2D float array with shape (len(lats), len(lons)), or
+        (len(target_lats), len(target_lons)) with target axes
+        Minimum visible altitude in meters MSL (inf = never visible)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown coverage engine '{engine}', expected one of {ENGINES}")
+    if engine == "sweep" and (target_lats is not None or target_lons is not None):
+        raise ValueError("Engine 'sweep' computes the terrain grid nodes: use a per-cell engine with target axes")
+    grid = as_terrain_grid(lats, lons, Z)
+    _, _, caller_order = _target_axes(grid, lats, target_lats, target_lons)
+    return caller_order(_horizon_profile(
+        grid, target_lats, target_lons, radar_lat, radar_lon, radar_height_agl_m,
+        n_samples, margin_m, engine, workers, backend, k_factor, cache_dir,
+        point_progress_callback=point_progress_callback, checkpoint=checkpoint
+    ))
+
+
+def coverage_from_min_altitude(min_altitude: np.ndarray, flight_level: float) -> np.ndarray:
+    """
+    Threshold a minimum visible altitude raster at a flight level.
+    
+    Returns:
+    --------
+    np.ndarray
+        2D boolean array, True = visible, False = blocked
+    """
+    return fl_to_m(flight_level) > min_altitude
+
+
+def coverage_map_path(out_dir: str, flight_level: float) -> str:
+    """File of a flight level map in an out-of-core output directory (see compute_all_coverage_maps)."""
+    return os.path.join(out_dir, f"coverage_FL{flight_level:g}.npy")
+
+
 def compute_all_coverage_maps(
     radar_lat: float,
     radar_lon: float,
     radar_height_agl_m: float,
     flight_levels: List[float],
-    lats: np.ndarray,
-    lons: np.ndarray,
-    Z: np.ndarray,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    Z: Optional[np.ndarray] = None,
     n_samples: int = 400,
     margin_m: float = 0.0,
-    progress_callback: Optional[callable] = None
-) -> Dict[float, np.ndarray]:
+    progress_callback: Optional[callable] = None,
+    engine: str = "los",
+    workers: int = 1,
+    backend: str = "numpy",
+    adaptive_block: int = 0,
+    target_lats: Optional[np.ndarray] = None,
+    target_lons: Optional[np.ndarray] = None,
+    max_range_km: Optional[float] = None,
+    min_range_km: float = 0.0,
+    azimuth_sectors: Optional[List[Tuple[float, float]]] = None,
+    roi_mask: Optional[np.ndarray] = None,
+    sparse: bool = False,
+    k_factor: Optional[float] = None,
+    horizon_cache: Optional[str] = None,
+    result_cache: Union[str, ResultCache, None] = None,
+    checkpoint: Optional[str] = None,
+    out_dir: Optional[str] = None,
+    memory_budget: Optional[int] = None
+) -> Dict[float, Union[np.ndarray, SparseMap]]:
     """
     Compute coverage maps for multiple flight levels.
     
@@ -121,8 +1101,8 @@ def compute_all_coverage_maps(
         Radar height above ground level (meters)
     flight_levels : List[float]
         List of flight levels (e.g., [5, 10, 20, 50, 100, 200, 300, 400])
-    lats : np.ndarray
-        1D array of latitude values
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values, or a TerrainGrid (lons and Z omitted)
     lons : np.ndarray
         1D array of longitude values
     Z : np.ndarray
@@ -133,23 +1113,188 @@ def compute_all_coverage_maps(
         Safety margin in meters (default: 0.0)
     progress_callback : callable, optional
         Callback function for progress updates: callback(flight_level, current_fl, total_fl)
+    engine : str, optional
+        Coverage engine, see compute_coverage_map (default: "los"). Without
+        adaptive_block, every flight level is thresholded from one
+        compute_min_altitude_map pass: "pyramid" then runs its exact "dda"
+        LOS (identical maps, no cells skipped) and the blocker cache of the
+        per-flight-level "los" / "dda" loop does not apply, a single minimum
+        visible altitude per cell replacing one LOS per flight level
+    workers : int, optional
+        Number of worker processes, see compute_coverage_map (default: 1)
+    backend : str, optional
+        LOS backend, see compute_coverage_map (default: "numpy")
+    adaptive_block : int, optional
+        Adaptive refinement block side, see compute_coverage_map (default: 0 = off);
+        one refinement serves every flight level
+    target_lats, target_lons : np.ndarray, optional
+        1D axes of the target cells, see compute_coverage_map (default: terrain grid nodes)
+    max_range_km, min_range_km, azimuth_sectors : optional
+        Range / azimuth-sector limits, see compute_coverage_map
+    roi_mask : np.ndarray, optional
+        2D boolean region of interest, see compute_coverage_map
+    sparse : bool, optional
+        Return SparseMap values, see compute_coverage_map (default: False)
+    k_factor : float, optional
+        Effective earth radius factor, see compute_coverage_map (default: None)
+    horizon_cache : str, optional
+        Directory of the horizon profile cache, see compute_coverage_map
+        (default: None = off); a cached profile serves every flight level
+        without any LOS
+    result_cache : str or ResultCache, optional
+        Directory of the coverage result cache, bounded to
+        result_cache.RESULT_CACHE_MAX_BYTES, or a ResultCache with another
+        bound (default: None = off, see result_cache.py). Each flight level map is stored
+        keyed by the terrain content, radar, flight level, LOS settings,
+        limits, region of interest and LOS.ENGINE_VERSION; maps found there
+        are returned memory-mapped without any computation, only the others
+        are computed (and stored)
+    checkpoint : str, optional
+        Checkpoint directory of the minimum visible altitude pass, see
+        compute_coverage_map (default: None = off): an interrupted run
+        resumes from its last completed tile
+    out_dir : str, optional
+        Out-of-core output directory (default: None = maps in memory): the
+        pass streams its tiles (see iter_coverage_tiles) into one
+        memory-mapped .npy file per flight level (coverage_map_path), so no
+        full-size array is held in memory. Not available with engine
+        "sweep", adaptive refinement, sparse results, horizon_cache or
+        checkpoint, which hold whole rasters
+    memory_budget : int, optional
+        Bytes of the tiles in flight with out_dir, see iter_coverage_tiles
+        (default: None = parallel.TILE_CELLS cells per tile)
     
     Returns:
     --------
     Dict[float, np.ndarray]
         Dictionary mapping flight level to coverage map array
-        Keys are flight levels, values are 2D boolean arrays
+        Keys are flight levels, values are 2D boolean arrays (SparseMap with
+        sparse=True, copy-on-write np.memmap of the files with out_dir)
     """
     coverage_maps = {}
+    if adaptive_block and horizon_cache is not None:
+        raise ValueError("adaptive_block cannot be combined with horizon_cache: "
+                         "the horizon profile already holds every cell")
+    if out_dir is not None:
+        if engine == "sweep":
+            raise ValueError("Engine 'sweep' holds the whole grid in memory: use a per-cell engine with out_dir")
+        if adaptive_block or sparse or horizon_cache is not None or checkpoint is not None:
+            raise ValueError("out_dir cannot be combined with adaptive_block, sparse, "
+                             "horizon_cache or checkpoint, which hold whole rasters")
+    elif memory_budget is not None:
+        raise ValueError("memory_budget bounds the out-of-core computation: set out_dir")
     
-    for idx, flight_level in enumerate(flight_levels):
-        print(f"  → Starting FL{flight_level}...", end='', flush=True)
-        
-        coverage_map = compute_coverage_map(
+    if result_cache is not None:
+        store = result_cache if isinstance(result_cache, ResultCache) else ResultCache(result_cache)
+        grid = as_terrain_grid(lats, lons, Z)
+        t_lats, t_lons, caller_order = _target_axes(grid, lats, target_lats, target_lons)
+        limits = _range_limits(max_range_km, min_range_km, azimuth_sectors)
+        roi = _roi_cells(roi_mask, (len(t_lats), len(t_lons)))
+        if roi is not None:
+            roi = caller_order(roi)
+        # Maps are stored in canonical order, keyed per flight level
+        params = {
+            flight_level: _coverage_params(
+                grid, t_lats, t_lons, radar_lat, radar_lon, radar_height_agl_m, flight_level,
+                n_samples, margin_m, engine, adaptive_block, limits, roi, k_factor
+            )
+            for flight_level in flight_levels
+        }
+        cached = {flight_level: store.get(params[flight_level]) for flight_level in flight_levels}
+        missing = [flight_level for flight_level in cached if cached[flight_level] is None]
+        print(f"  → {len(cached) - len(missing)}/{len(cached)} flight levels loaded "
+              f"from the result cache ({store.cache_dir})", flush=True)
+        if missing:
+            computed = compute_all_coverage_maps(
+                radar_lat, radar_lon, radar_height_agl_m, missing, grid,
+                n_samples=n_samples, margin_m=margin_m, progress_callback=progress_callback,
+                engine=engine, workers=workers, backend=backend, adaptive_block=adaptive_block,
+                target_lats=target_lats, target_lons=target_lons,
+                max_range_km=max_range_km, min_range_km=min_range_km, azimuth_sectors=azimuth_sectors,
+                roi_mask=roi, k_factor=k_factor, horizon_cache=horizon_cache, checkpoint=checkpoint,
+                out_dir=out_dir, memory_budget=memory_budget
+            )
+            for flight_level in missing:
+                try:
+                    cached[flight_level] = store.put(params[flight_level], computed[flight_level])
+                except OSError as e:
+                    print(f"  ⚠️  FL{flight_level:3.0f} not stored in the result cache: {e}")
+                    cached[flight_level] = computed[flight_level]
+        for flight_level in flight_levels:
+            coverage_maps[flight_level] = _caller_result(
+                cached[flight_level], caller_order, t_lats, t_lons,
+                radar_lat, radar_lon, limits, roi, sparse, False)
+        return coverage_maps
+    
+    if out_dir is not None:
+        # Out of core: tiles are thresholded and written as they complete
+        print(f"  → Computing minimum visible altitude tile by tile into {out_dir}...", flush=True)
+        grid = as_terrain_grid(lats, lons, Z)
+        t_lats, t_lons, _ = _target_axes(grid, lats, target_lats, target_lons)
+        os.makedirs(out_dir, exist_ok=True)
+        files = {flight_level: open_memmap(coverage_map_path(out_dir, flight_level), mode="w+",
+                                           dtype=bool, shape=(len(t_lats), len(t_lons)))
+                 for flight_level in flight_levels}
+        for flight_level, bounds, coverage in iter_coverage_tiles(
+            radar_lat, radar_lon, radar_height_agl_m, flight_levels, lats, lons, Z,
+            n_samples=n_samples, margin_m=margin_m, engine=engine, workers=workers,
+            backend=backend, target_lats=target_lats, target_lons=target_lons,
+            max_range_km=max_range_km, min_range_km=min_range_km, azimuth_sectors=azimuth_sectors,
+            roi_mask=roi_mask, k_factor=k_factor, memory_budget=memory_budget
+        ):
+            files[flight_level][bounds] = coverage
+        for idx, flight_level in enumerate(flight_levels):
+            files[flight_level].flush()
+            coverage_maps[flight_level] = np.load(coverage_map_path(out_dir, flight_level), mmap_mode="c")
+            if progress_callback:
+                progress_callback(flight_level, idx + 1, len(flight_levels))
+            else:
+                print(f"  ✓ FL{flight_level:3.0f} complete ({idx + 1}/{len(flight_levels)})")
+        return coverage_maps
+    
+    if adaptive_block:
+        # Blocks are refined until uniform at every flight level
+        print(f"  → Adaptive refinement ({adaptive_block} x {adaptive_block} cell blocks)...", flush=True)
+        grid = as_terrain_grid(lats, lons, Z)
+        t_lats, t_lons, caller_order = _target_axes(grid, lats, target_lats, target_lons)
+        limits = _range_limits(max_range_km, min_range_km, azimuth_sectors)
+        roi = _roi_cells(roi_mask, (len(t_lats), len(t_lons)))
+        if roi is not None:
+            roi = caller_order(roi)
+        stats = {}
+        adaptive_maps = _adaptive_coverage(
+            grid, t_lats, t_lons, radar_lat, radar_lon, radar_height_agl_m,
+            [fl_to_m(flight_level) for flight_level in flight_levels],
+            n_samples, margin_m, engine, backend, adaptive_block, limits, roi, k_factor,
+            stats=stats
+        )
+        total_points = stats["evaluated"] + stats["filled"]
+        print(f"  → LOS evaluated at {stats['evaluated']}/{total_points} points "
+              f"({stats['evaluated'] / total_points * 100:.1f}%)")
+    else:
+        # Visibility only grows with altitude: one minimum-altitude pass
+        # serves every flight level
+        print("  → Computing minimum visible altitude...", flush=True)
+        min_altitude = compute_min_altitude_map(
             radar_lat, radar_lon, radar_height_agl_m,
-            flight_level, lats, lons, Z,
-            n_samples=n_samples, margin_m=margin_m
+            lats, lons, Z,
+            n_samples=n_samples, margin_m=margin_m, engine=engine, workers=workers,
+            backend=backend, target_lats=target_lats, target_lons=target_lons,
+            max_range_km=max_range_km, min_range_km=min_range_km, azimuth_sectors=azimuth_sectors,
+            roi_mask=roi_mask, sparse=sparse, k_factor=k_factor, horizon_cache=horizon_cache,
+            checkpoint=checkpoint
         )
+    
+    for idx, flight_level in enumerate(flight_levels):
+        if adaptive_block:
+            coverage_map = _caller_result(adaptive_maps[idx], caller_order, t_lats, t_lons,
+                                          radar_lat, radar_lon, limits, roi, sparse, False)
+        elif sparse:
+            # Threshold the computed cells only
+            coverage_map = min_altitude._replace(
+                values=coverage_from_min_altitude(min_altitude.values, flight_level), fill=False)
+        else:
+            coverage_map = coverage_from_min_altitude(min_altitude, flight_level)
         
         # Report completion
         if progress_callback:
@@ -160,3 +1305,102 @@ def compute_all_coverage_maps(
         coverage_maps[flight_level] = coverage_map
     
     return coverage_maps
+
+
+def iter_coverage_tiles(
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    flight_levels: List[float],
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    Z: Optional[np.ndarray] = None,
+    n_samples: int = 400,
+    margin_m: float = 0.0,
+    engine: str = "los",
+    workers: int = 1,
+    backend: str = "numpy",
+    target_lats: Optional[np.ndarray] = None,
+    target_lons: Optional[np.ndarray] = None,
+    max_range_km: Optional[float] = None,
+    min_range_km: float = 0.0,
+    azimuth_sectors: Optional[List[Tuple[float, float]]] = None,
+    roi_mask: Optional[np.ndarray] = None,
+    k_factor: Optional[float] = None,
+    memory_budget: Optional[int] = None
+) -> Iterator[CoverageTile]:
+    """
+    Stream the coverage maps of multiple flight levels tile by tile.
+    
+    The minimum visible altitude pass of compute_all_coverage_maps runs in
+    row tiles of about parallel.TILE_CELLS cells; as each tile completes it
+    is thresholded at every flight level and yielded, so consumers (plotting,
+    export, statistics) start before the pass ends and memory is bounded by
+    the tiles in flight instead of the full maps. Tiles come in completion
+    order (in row order with workers=1); each one is yielded once per flight
+    level, in the order of flight_levels. Assembling the tiles gives the maps
+    of compute_all_coverage_maps.
+    
+    Engine "sweep" computes the whole raster in one pass: its tiles are
+    yielded once it completes.
+    
+    Parameters are those of compute_all_coverage_maps (adaptive refinement,
+    sparse results and the caches / checkpoints hold whole maps and are not
+    available here), plus:
+    
+    memory_budget : int, optional
+        Bytes of the tiles in flight (see budget_tile_cells): tiles are made
+        smaller to fit (default: None = parallel.TILE_CELLS cells per tile)
+    
+    Yields:
+    -------
+    CoverageTile
+        (flight_level, bounds, coverage) of each tile and flight level
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown coverage engine '{engine}', expected one of {ENGINES}")
+    if engine == "sweep" and (target_lats is not None or target_lons is not None):
+        raise ValueError("Engine 'sweep' computes the terrain grid nodes: use a per-cell engine with target axes")
+    limits = _range_limits(max_range_km, min_range_km, azimuth_sectors)
+    altitudes = [(flight_level, fl_to_m(flight_level)) for flight_level in flight_levels]
+    
+    grid = as_terrain_grid(lats, lons, Z)
+    t_lats, t_lons, caller_order = _target_axes(grid, lats, target_lats, target_lons)
+    shape = (len(t_lats), len(t_lons))
+    roi = _roi_cells(roi_mask, shape)
+    if roi is not None:
+        roi = caller_order(roi)
+    workers = resolve_workers(workers)
+    tile_cells = TILE_CELLS
+    if memory_budget is not None:
+        tile_cells = min(tile_cells, budget_tile_cells(memory_budget, len(altitudes), workers))
+        if tile_cells < shape[1]:
+            raise ValueError(f"memory_budget of {memory_budget} bytes cannot hold one row of "
+                             f"{shape[1]} cells per tile with {workers} worker(s)")
+    tiles = bounded_row_tiles(shape, tile_cells)
+    
+    # Rows of a canonical tile in the caller's order (loose latitudes given north to south)
+    flip_rows = target_lats is None and not isinstance(lats, TerrainGrid) and grid.lat_reversed
+    
+    def caller_tiles(rows: slice, block: np.ndarray) -> Iterator[CoverageTile]:
+        if flip_rows:
+            rows = slice(shape[0] - rows.stop, shape[0] - rows.start)
+        block = caller_order(block)
+        for flight_level, altitude in altitudes:
+            yield CoverageTile(flight_level, (rows, slice(0, shape[1])), altitude > block)
+    
+    if engine == "sweep":
+        min_altitude = compute_min_altitude_map(
+            radar_lat, radar_lon, radar_height_agl_m, grid, margin_m=margin_m, engine=engine,
+            max_range_km=max_range_km, min_range_km=min_range_km, azimuth_sectors=azimuth_sectors,
+            roi_mask=roi, k_factor=k_factor
+        )
+        for rows in tiles:
+            yield from caller_tiles(rows, min_altitude[rows])
+        return
+    
+    los_mode = "dda" if engine in ("dda", "pyramid") else "sample"
+    args = (t_lats, t_lons, radar_lat, radar_lon, radar_height_agl_m, n_samples, margin_m,
+            los_mode, resolve_backend(backend, grid), limits, roi, k_factor)
+    for rows, block in iter_tiles(_min_altitude_rows, grid, args, tiles, workers):
+        yield from caller_tiles(rows, block)
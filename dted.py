@@ -0,0 +1,326 @@
+"""
+DTED Module
+
+This module reads DTED Level 1 tiles (.dt1 files) directly.
+
+A .dt1 file is a fixed-layout binary file (MIL-PRF-89020B):
+- UHL header (80 bytes): tile origin (south-west corner), point spacing and
+  number of longitude lines / latitude points
+- DSI (648 bytes) and ACC (2700 bytes) records, not needed here
+- one data record per longitude line, south to north: 8-byte header,
+  big-endian signed-magnitude int16 elevations (meters), 4-byte checksum
+  (unsigned sum of the record bytes before it, verified when a tile is decoded)
+
+Tiles are decoded through np.memmap, straight from the file. DTEDMosaic
+presents a set of tiles as one TerrainGrid whose elevations are assembled
+lazily: only the tiles actually sampled are decoded, and at most max_tiles
+decoded tiles are kept (least recently used first out), so a mosaic covering a
+wide radar range never needs to be fully resident in memory.
+"""
+
+import os
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from terrain import TerrainGrid
+
+
+# Record sizes before the first data record
+DTED_UHL_SIZE = 80
+DTED_DSI_SIZE = 648
+DTED_ACC_SIZE = 2700
+DTED_DATA_OFFSET = DTED_UHL_SIZE + DTED_DSI_SIZE + DTED_ACC_SIZE
+
+# Data record sentinel byte and no-data elevation
+DTED_SENTINEL = 0xAA
+DTED_NODATA = -32767
+
+# Default number of decoded tiles kept by a mosaic (~2.9 MB each at 1201 x 1201)
+DEFAULT_MAX_TILES = 16
+
+
+def _parse_angle(field: bytes) -> float:
+    """Parse a DTED 'DDDMMSSH' angle field to decimal degrees."""
+    text = field.decode("ascii")
+    value = int(text[0:3]) + int(text[3:5]) / 60.0 + int(text[5:7]) / 3600.0
+    return -value if text[7] in "SW" else value
+
+
+def read_dt1_header(path: str) -> Dict[str, float]:
+    """
+    Read the UHL header of a DTED tile.
+
+    Returns:
+    --------
+    dict
+        lat0, lon0 : origin (south-west node, degrees)
+        dlat, dlon : point spacing (degrees)
+        n_lat, n_lon : number of latitude points / longitude lines
+    """
+    with open(path, "rb") as f:
+        uhl = f.read(DTED_UHL_SIZE)
+    if len(uhl) < DTED_UHL_SIZE or uhl[0:3] != b"UHL":
+        raise ValueError(f"Not a DTED file (missing UHL header): {path}")
+
+    return {
+        "lon0": _parse_angle(uhl[4:12]),
+        "lat0": _parse_angle(uhl[12:20]),
+        "dlon": int(uhl[20:24]) / 36000.0,  # tenths of arc-seconds
+        "dlat": int(uhl[24:28]) / 36000.0,
+        "n_lon": int(uhl[47:51]),
+        "n_lat": int(uhl[51:55]),
+    }
+
+
+def decode_dt1(path: str, header: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    Decode the elevations of a DTED tile through a memory map.
+
+    Raises ValueError if a data record has no sentinel or a wrong checksum.
+
+    Returns:
+    --------
+    np.ndarray
+        2D int16 array with shape (n_lat, n_lon), rows south to north,
+        columns west to east; no-data is DTED_NODATA (< 0)
+    """
+    header = header or read_dt1_header(path)
+    n_lat, n_lon = header["n_lat"], header["n_lon"]
+    record = np.dtype([
+        ("sentinel", "u1"), ("block_count", "u1", (3,)),
+        ("lon_count", ">u2"), ("lat_count", ">u2"),
+        ("data", ">u2", (n_lat,)), ("checksum", ">u4"),
+    ])
+
+    records = np.memmap(path, dtype=record, mode="r", offset=DTED_DATA_OFFSET, shape=(n_lon,))
+    if not np.all(records["sentinel"] == DTED_SENTINEL):
+        raise ValueError(f"Corrupt DTED data records: {path}")
+    record_bytes = np.memmap(path, dtype=np.uint8, mode="r", offset=DTED_DATA_OFFSET,
+                             shape=(n_lon, record.itemsize))
+    checksum = record_bytes[:, :-4].sum(axis=1, dtype=np.uint32)
+    bad = np.flatnonzero(checksum != records["checksum"])
+    if bad.size:
+        raise ValueError(f"DTED checksum mismatch in {bad.size} data record(s), "
+                         f"first at longitude line {bad[0]}: {path}")
+
+    # Signed magnitude: bit 15 is the sign, bits 0-14 the magnitude
+    raw = records["data"].T
+    magnitude = (raw & 0x7FFF).astype(np.int16)
+    return np.where(raw & 0x8000, -magnitude, magnitude)
+
+
+def read_dt1(path: str) -> TerrainGrid:
+    """Read a single DTED tile into an in-memory TerrainGrid (int16 elevations)."""
+    header = read_dt1_header(path)
+    lats = header["lat0"] + np.arange(header["n_lat"]) * header["dlat"]
+    lons = header["lon0"] + np.arange(header["n_lon"]) * header["dlon"]
+    return TerrainGrid(lats, lons, decode_dt1(path, header))
+
+
+def find_dt1_files(root: str) -> List[str]:
+    """All .dt1 files under a directory (e.g. the usual <root>/e007/n43.dt1 layout)."""
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        paths.extend(os.path.join(dirpath, name) for name in filenames
+                     if name.lower().endswith(".dt1"))
+    return sorted(paths)
+
+
+class MosaicArray:
+    """
+    Lazily assembled 2D elevation array of a DTED mosaic.
+
+    Supports the indexing used by the terrain samplers: integer index arrays
+    (gathered tile by tile), integers and slices (the requested window is
+    assembled). Tiles are decoded on first use and kept in an LRU cache of
+    max_tiles tiles; missing tiles read as DTED_NODATA.
+    """
+
+    def __init__(self, paths: Dict[Tuple[int, int], str], headers: Dict[Tuple[int, int], dict],
+                 n_tiles: Tuple[int, int], tile_points: Tuple[int, int],
+                 max_tiles: int = DEFAULT_MAX_TILES):
+        if max_tiles < 1:
+            raise ValueError(f"max_tiles must be >= 1, got {max_tiles}")
+        self.paths = paths
+        self.headers = headers
+        self.n_tiles = n_tiles
+        # Adjacent tiles share their edge nodes: a tile adds (points - 1) nodes
+        self.step = (tile_points[0] - 1, tile_points[1] - 1)
+        self.shape = (n_tiles[0] * self.step[0] + 1, n_tiles[1] * self.step[1] + 1)
+        self.dtype = np.dtype(np.int16)
+        self.ndim = 2
+        self.size = self.shape[0] * self.shape[1]
+        self.max_tiles = max_tiles
+        self.hits = 0
+        self.misses = 0
+        self._tiles = OrderedDict()
+
+    def __getstate__(self):
+        # Worker processes re-decode the tiles they need (the files are mapped, not copied)
+        state = self.__dict__.copy()
+        state["_tiles"] = OrderedDict()
+        return state
+
+    def tile(self, key: Tuple[int, int]) -> Optional[np.ndarray]:
+        """Decoded tile (None if the mosaic has no file for it), via the LRU cache."""
+        if key in self._tiles:
+            self.hits += 1
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+        if key not in self.paths:
+            return None
+
+        self.misses += 1
+        tile = decode_dt1(self.paths[key], self.headers[key])
+        self._tiles[key] = tile
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def _axis_index(self, key, axis: int) -> np.ndarray:
+        n = self.shape[axis]
+        if isinstance(key, slice):
+            return np.arange(n)[key]
+        index = np.asarray(key)
+        if index.dtype.kind not in "iu":
+            raise IndexError("MosaicArray only supports integer and slice indices")
+        index = np.where(index < 0, index + n, index)
+        if index.size and (index.min() < 0 or index.max() >= n):
+            raise IndexError(f"index out of range for axis {axis} with size {n}")
+        return index
+
+    def __getitem__(self, key) -> np.ndarray:
+        if not isinstance(key, tuple) or len(key) != 2:
+            raise IndexError("MosaicArray takes two indices (rows, columns)")
+        i = self._axis_index(key[0], 0)
+        j = self._axis_index(key[1], 1)
+        # A slice combined with another non-scalar index selects a window
+        if (isinstance(key[0], slice) or isinstance(key[1], slice)) and i.ndim and j.ndim:
+            i = i[:, None]
+        i, j = np.broadcast_arrays(i, j)
+
+        ti = np.minimum(i // self.step[0], self.n_tiles[0] - 1)
+        tj = np.minimum(j // self.step[1], self.n_tiles[1] - 1)
+        li = i - ti * self.step[0]
+        lj = j - tj * self.step[1]
+
+        out = np.full(i.shape, DTED_NODATA, dtype=np.int16)
+        found = np.zeros(i.shape, dtype=bool)
+        self._gather(out, found, ti, tj, li, lj)
+
+        # Nodes on a shared tile edge are also held by the tile below / to the
+        # left: read them from there when their own tile is missing
+        for di, dj in ((1, 0), (0, 1), (1, 1)):
+            retry = ~found
+            if di:
+                retry &= (li == 0) & (ti > 0)
+            if dj:
+                retry &= (lj == 0) & (tj > 0)
+            if np.any(retry):
+                sub_out = out[retry]
+                sub_found = found[retry]
+                self._gather(sub_out, sub_found, ti[retry] - di, tj[retry] - dj,
+                             li[retry] + di * self.step[0], lj[retry] + dj * self.step[1])
+                out[retry] = sub_out
+                found[retry] = sub_found
+        return out
+
+    def _gather(self, out: np.ndarray, found: np.ndarray, ti: np.ndarray, tj: np.ndarray,
+                li: np.ndarray, lj: np.ndarray):
+        """Fill out / found from the tiles (ti, tj) at local indices (li, lj)."""
+        if ti.size == 0:
+            return
+        tile_id = ti * self.n_tiles[1] + tj
+        if tile_id.min() == tile_id.max():
+            tile = self.tile((int(ti.flat[0]), int(tj.flat[0])))
+            if tile is not None:
+                out[...] = tile[li, lj]
+                found[...] = True
+            return
+        for k in np.unique(tile_id):
+            sel = tile_id == k
+            tile = self.tile((int(k // self.n_tiles[1]), int(k % self.n_tiles[1])))
+            if tile is not None:
+                out[sel] = tile[li[sel], lj[sel]]
+                found[sel] = True
+
+    def __array__(self, dtype=None, copy=None):
+        # Whole-grid consumers (sweep engine, pyramid, masks) assemble everything
+        array = self[:, :]
+        return array if dtype is None else array.astype(dtype)
+
+    def __repr__(self) -> str:
+        return (f"MosaicArray({self.shape[0]} x {self.shape[1]}, {len(self.paths)} tiles, "
+                f"{len(self._tiles)}/{self.max_tiles} decoded)")
+
+
+class DTEDMosaic(TerrainGrid):
+    """
+    TerrainGrid over a set of DTED tiles, with lazily decoded elevations.
+
+    All tiles must share the same point spacing and size (same DTED latitude
+    zone). The mosaic spans the bounding box of the tiles; gaps (e.g. sea
+    tiles absent from the product) read as no-data.
+
+    Z is a MosaicArray: point sampling (LOS.los_visible, compute_coverage_map
+    with the "los" and "dda" engines) only decodes the tiles it touches.
+    Whole-grid operations (nodata, max_pyramid, the sweep engine, masks)
+    assemble the full grid. The compiled kernels need the whole grid in
+    memory, so backend="jit" uses the NumPy backend on a mosaic (see
+    los_jit.resolve_backend).
+    """
+
+    def __init__(self, paths: List[str], max_tiles: int = DEFAULT_MAX_TILES):
+        if not paths:
+            raise ValueError("DTEDMosaic needs at least one .dt1 file")
+
+        headers = [read_dt1_header(path) for path in paths]
+        first = headers[0]
+        for path, header in zip(paths, headers):
+            if any(header[k] != first[k] for k in ("dlat", "dlon", "n_lat", "n_lon")):
+                raise ValueError(f"DTED tile spacing/size differs in {path}")
+
+        tile_lat = (first["n_lat"] - 1) * first["dlat"]
+        tile_lon = (first["n_lon"] - 1) * first["dlon"]
+        lat_min = min(h["lat0"] for h in headers)
+        lon_min = min(h["lon0"] for h in headers)
+
+        tile_paths, tile_headers = {}, {}
+        for path, header in zip(paths, headers):
+            key = (int(round((header["lat0"] - lat_min) / tile_lat)),
+                   int(round((header["lon0"] - lon_min) / tile_lon)))
+            if key in tile_paths:
+                raise ValueError(f"Duplicate DTED tile: {tile_paths[key]} and {path}")
+            tile_paths[key] = path
+            tile_headers[key] = header
+        n_tiles = (max(k[0] for k in tile_paths) + 1, max(k[1] for k in tile_paths) + 1)
+
+        self.Z = MosaicArray(tile_paths, tile_headers, n_tiles,
+                             (first["n_lat"], first["n_lon"]), max_tiles=max_tiles)
+        self.lats = lat_min + np.arange(self.Z.shape[0]) * first["dlat"]
+        self.lons = lon_min + np.arange(self.Z.shape[1]) * first["dlon"]
+        self.lat_reversed = False
+        self.lon_reversed = False
+        self.lat0 = float(self.lats[0])
+        self.lon0 = float(self.lons[0])
+        self.dlat = first["dlat"]
+        self.dlon = first["dlon"]
+        self.regular = True
+        self._nodata = None
+        self._max_pyramid = None
+        self._slope_bounds = None
+        self._content_hash = None
+
+    @classmethod
+    def from_directory(cls, root: str, max_tiles: int = DEFAULT_MAX_TILES) -> "DTEDMosaic":
+        """Mosaic of every .dt1 file under a directory."""
+        paths = find_dt1_files(root)
+        if not paths:
+            raise FileNotFoundError(f"No .dt1 files found under '{root}'")
+        return cls(paths, max_tiles=max_tiles)
+
+    def __repr__(self) -> str:
+        return (f"DTEDMosaic({len(self.lats)} x {len(self.lons)}, "
+                f"lat {self.lats[0]:.6f}..{self.lats[-1]:.6f}, "
+                f"lon {self.lons[0]:.6f}..{self.lons[-1]:.6f}, "
+                f"{len(self.Z.paths)} tiles)")
@@ -13,7 +13,7 @@ search areas based on static geographical constraints.
 """
 
 import numpy as np
-from visualize_terrain import load_terrain_npz
+from terrain import load_terrain_npz
 from site_location_masks import mask_land, mask_50km, mask_french_territory, combine_masks
 from visualize_site_location_masks import plot_masks_overlay
 from export_site_location_masks_kml import export_masks_to_kmz
@@ -70,7 +70,7 @@ def main():
     # Distance constraint: Within 50km of Nice airport
     print("\n   b) Creating 50km distance mask...")
     radius_km = 50.0
-    mask_50km_result = mask_50km(lats, lons, nice_lat, nice_lon, radius_km=radius_km)
+    mask_50km_result = mask_50km(lats, lons, center_lat=nice_lat, center_lon=nice_lon, radius_km=radius_km)
     within_50km = np.sum(mask_50km_result)
     within_pct = within_50km / mask_50km_result.size * 100
     print(f"      ✓ 50km mask created: {within_50km:,} admissible points ({within_pct:.1f}%)")
@@ -8,14 +8,16 @@ for visualization in Google Earth.
 import numpy as np
 import zipfile
 import xml.etree.ElementTree as ET
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 from pathlib import Path
+from terrain import TerrainGrid, grid_axes
 
 
 def create_visibility_map_kml(
     coverage_map: np.ndarray,
-    lats: np.ndarray,
-    lons: np.ndarray,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    *,
     flight_level: float,
     radar_lat: Optional[float] = None,
     radar_lon: Optional[float] = None,
@@ -29,10 +31,10 @@ def create_visibility_map_kml(
     -----------
     coverage_map : np.ndarray
         2D boolean array (True=visible, False=blocked)
-    lats : np.ndarray
-        1D array of latitude values
-    lons : np.ndarray
-        1D array of longitude values
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values, or a TerrainGrid (lons omitted)
+    lons : np.ndarray, optional
+        1D array of longitude values; the arguments after it are keyword-only
     flight_level : float
         Flight level for naming
     radar_lat : float, optional
@@ -49,6 +51,8 @@ def create_visibility_map_kml(
     ET.Element
         KML Document element
     """
+    lats, lons = grid_axes(lats, lons)
+    
     # Create KML document
     kml = ET.Element("kml", xmlns="http://www.opengis.net/kml/2.2")
     document = ET.SubElement(kml, "Document")
@@ -144,8 +148,9 @@ def create_visibility_map_kml(
 
 def export_coverage_to_kml(
     coverage_map: np.ndarray,
-    lats: np.ndarray,
-    lons: np.ndarray,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    *,
     flight_level: float,
     output_path: str,
     radar_lat: Optional[float] = None,
@@ -158,10 +163,10 @@ def export_coverage_to_kml(
     -----------
     coverage_map : np.ndarray
         2D boolean array (True=visible, False=blocked)
-    lats : np.ndarray
-        1D array of latitude values
-    lons : np.ndarray
-        1D array of longitude values
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values, or a TerrainGrid (lons omitted)
+    lons : np.ndarray, optional
+        1D array of longitude values; the arguments after it are keyword-only
     flight_level : float
         Flight level
     output_path : str
@@ -172,7 +177,8 @@ def export_coverage_to_kml(
         Radar longitude
     """
     kml = create_visibility_map_kml(
-        coverage_map, lats, lons, flight_level, radar_lat, radar_lon
+        coverage_map, lats, lons, flight_level=flight_level,
+        radar_lat=radar_lat, radar_lon=radar_lon
     )
     
     # Write to file
@@ -183,8 +189,8 @@ def export_coverage_to_kml(
 
 def export_all_coverage_to_kmz(
     coverage_maps: Dict[float, np.ndarray],
-    lats: np.ndarray,
-    lons: np.ndarray,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
     radar_lat: Optional[float] = None,
     radar_lon: Optional[float] = None,
     output_path: str = "radar_coverage.kmz"
@@ -196,10 +202,10 @@ def export_all_coverage_to_kmz(
     -----------
     coverage_maps : Dict[float, np.ndarray]
         Dictionary mapping flight level to coverage map
-    lats : np.ndarray
-        1D array of latitude values
-    lons : np.ndarray
-        1D array of longitude values
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values, or a TerrainGrid (lons omitted)
+    lons : np.ndarray, optional
+        1D array of longitude values (omitted with a TerrainGrid)
     radar_lat : float, optional
         Radar latitude
     radar_lon : float, optional
@@ -207,6 +213,8 @@ def export_all_coverage_to_kmz(
     output_path : str
         Output KMZ file path
     """
+    lats, lons = grid_axes(lats, lons)
+    
     # Create main KML document
     kml = ET.Element("kml", xmlns="http://www.opengis.net/kml/2.2")
     document = ET.SubElement(kml, "Document")
@@ -12,8 +12,9 @@ Masks are exported with:
 import numpy as np
 import zipfile
 import xml.etree.ElementTree as ET
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 from pathlib import Path
+from terrain import TerrainGrid, grid_axes
 
 
 def _create_grouped_polygons(folder: ET.Element, mask: np.ndarray, 
@@ -93,8 +94,8 @@ def _create_grouped_polygons(folder: ET.Element, mask: np.ndarray,
 
 def create_mask_kml(
     mask: np.ndarray,
-    lats: np.ndarray,
-    lons: np.ndarray,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
     mask_name: str = "Site Location Mask",
     nice_lat: Optional[float] = None,
     nice_lon: Optional[float] = None,
@@ -107,10 +108,10 @@ def create_mask_kml(
     -----------
     mask : np.ndarray
         2D boolean array (True=admissible, False=excluded)
-    lats : np.ndarray
-        1D array of latitude values
-    lons : np.ndarray
-        1D array of longitude values
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values, or a TerrainGrid (lons omitted)
+    lons : np.ndarray, optional
+        1D array of longitude values (omitted with a TerrainGrid)
     mask_name : str
         Name for the mask
     nice_lat : float, optional
@@ -125,6 +126,8 @@ def create_mask_kml(
     ET.Element
         KML Document element
     """
+    lats, lons = grid_axes(lats, lons)
+    
     # Create KML document
     kml = ET.Element("kml", xmlns="http://www.opengis.net/kml/2.2")
     document = ET.SubElement(kml, "Document")
@@ -192,8 +195,9 @@ def create_mask_kml(
 
 def export_mask_to_kml(
     mask: np.ndarray,
-    lats: np.ndarray,
-    lons: np.ndarray,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    *,
     output_path: str,
     mask_name: str = "Site Location Mask",
     nice_lat: Optional[float] = None,
@@ -206,10 +210,10 @@ def export_mask_to_kml(
     -----------
     mask : np.ndarray
         2D boolean array (True=admissible, False=excluded)
-    lats : np.ndarray
-        1D array of latitude values
-    lons : np.ndarray
-        1D array of longitude values
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values, or a TerrainGrid (lons omitted)
+    lons : np.ndarray, optional
+        1D array of longitude values; the arguments after it are keyword-only
     output_path : str
         Output KML file path
     mask_name : str, optional
@@ -230,8 +234,8 @@ def export_mask_to_kml(
 
 def export_masks_to_kmz(
     masks_dict: Dict[str, np.ndarray],
-    lats: np.ndarray,
-    lons: np.ndarray,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
     output_path: str = "site_location_masks.kmz",
     nice_lat: Optional[float] = None,
     nice_lon: Optional[float] = None
@@ -243,10 +247,10 @@ def export_masks_to_kmz(
     -----------
     masks_dict : Dict[str, np.ndarray]
         Dictionary mapping mask names to boolean arrays
-    lats : np.ndarray
-        1D array of latitude values
-    lons : np.ndarray
-        1D array of longitude values
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values, or a TerrainGrid (lons omitted)
+    lons : np.ndarray, optional
+        1D array of longitude values (omitted with a TerrainGrid)
     output_path : str, optional
         Output KMZ file path (default: "site_location_masks.kmz")
     nice_lat : float, optional
@@ -254,6 +258,8 @@ def export_masks_to_kmz(
     nice_lon : float, optional
         Nice airport longitude
     """
+    lats, lons = grid_axes(lats, lons)
+    
     # Create main KML document
     kml = ET.Element("kml", xmlns="http://www.opengis.net/kml/2.2")
     document = ET.SubElement(kml, "Document")
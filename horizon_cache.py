@@ -0,0 +1,64 @@
+"""
+Horizon Cache Module
+
+For a fixed radar (position and height) the terrain horizon of every target
+cell does not depend on the target altitude: the minimum visible altitude
+raster (coverage_analysis.compute_min_altitude_map) holds the coverage of
+every flight level (a threshold) and of every range / azimuth limit or region
+of interest (a mask). Profiles are stored on disk in a ResultCache (see
+result_cache.py), so later runs derive their maps from them without tracing
+any LOS. By default they share the result cache directory, and its LRU
+size bound, with the coverage maps: a profile is one more entry, of kind
+"horizon".
+
+A profile is keyed by everything its values depend on:
+- the radar position and height
+- the terrain content (TerrainGrid.content_hash) and the target cell axes
+- the LOS settings: engine ("los" with its n_samples, "dda" / "pyramid"
+  which give the same raster, or "sweep"), margin_m, k_factor and
+  LOS.ENGINE_VERSION
+The margin raises the terrain, whose effect on the horizon shrinks with the
+distance along the path, so a profile only serves its own margin.
+"""
+
+import numpy as np
+from typing import Optional
+from terrain import TerrainGrid
+from LOS import ENGINE_VERSION
+from result_cache import RESULT_CACHE_DIR, ResultCache, array_hash
+
+
+# Default cache directory: the result cache store
+HORIZON_CACHE_DIR = RESULT_CACHE_DIR
+
+
+def horizon_params(radar_lat: float, radar_lon: float, radar_height_agl_m: float,
+                   grid: TerrainGrid, target_lats: np.ndarray, target_lons: np.ndarray,
+                   engine: str, n_samples: int, margin_m: float,
+                   k_factor: Optional[float]) -> dict:
+    """
+    Parameters identifying a horizon profile (JSON-serialisable). Engines
+    computing the same raster share their profiles ("pyramid" is "dda", and
+    n_samples only matters to "los").
+    """
+    los_mode = "dda" if engine == "pyramid" else engine
+    return {
+        "kind": "horizon",
+        "version": ENGINE_VERSION,
+        "radar": [float(radar_lat), float(radar_lon), float(radar_height_agl_m)],
+        "terrain": grid.content_hash(),
+        "targets": array_hash(np.asarray(target_lats, dtype=float),
+                              np.asarray(target_lons, dtype=float)),
+        "engine": los_mode,
+        "n_samples": int(n_samples) if los_mode == "los" else None,
+        "margin_m": float(margin_m),
+        "k_factor": None if k_factor is None else float(k_factor),
+    }
+
+
+def horizon_store(cache_dir: str) -> ResultCache:
+    """
+    Store of the horizon profiles in `cache_dir`, bounded like the result
+    cache (RESULT_CACHE_MAX_BYTES, shared with the maps in the same directory).
+    """
+    return ResultCache(cache_dir)
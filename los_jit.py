@@ -0,0 +1,198 @@
+"""
+JIT LOS Module
+
+This module provides the "jit" backend of compute_coverage_map and
+compute_min_altitude_map: the per-cell LOS loops of the "los" and "dda"
+engines compiled with numba, when it is installed.
+
+The kernels repeat the arithmetic of LOS.py operation for operation (bilinear
+sampling of TerrainGrid.sample, the exact cell traversal of
+LOS._dda_min_visible_altitude), so the maps are identical to the NumPy
+backend. The gain comes from running the whole row loop in compiled code: no
+Python call, array allocation or grid lookup per cell, and the sampled LOS
+stops at the first blocking sample. The earth bulge of every target
+(LOS.earth_bulge) is computed with NumPy per batch of rows and passed to the
+kernels as a table.
+
+Without numba, backend="jit" falls back to the NumPy backend. It also does
+on a grid whose elevations are not an in-memory array (a DTEDMosaic decodes
+its tiles lazily): the kernels index the whole elevation array, which would
+assemble every tile of the mosaic.
+
+The kernels themselves live in los_jit_kernels.py, imported by the first
+backend="jit" run: importing this module (or coverage_analysis) does not
+import numba.
+"""
+
+import importlib.util
+import numpy as np
+from typing import Optional
+from terrain import TerrainGrid
+from LOS import z_terrain, earth_bulge, BLOCKER_TOLERANCE_M
+
+# numba is looked up, not imported: importing it takes longer than NumPy, so
+# the kernels (los_jit_kernels.py) are only imported on the first "jit" run
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+
+# Available LOS backends
+BACKENDS = ("numpy", "jit")
+
+
+def resolve_backend(backend: str, grid: Optional[TerrainGrid] = None) -> str:
+    """
+    Backend actually used for a `backend` argument: "jit" falls back to
+    "numpy" (with a note) when numba is not installed, or when the elevations
+    of `grid` are lazily decoded (not an np.ndarray, e.g. a DTEDMosaic).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    if backend == "jit" and not HAS_NUMBA:
+        print("Note: numba not available. Install with 'pip install numba' for backend='jit'; "
+              "using the NumPy backend.")
+        return "numpy"
+    if backend == "jit" and grid is not None and not isinstance(grid.Z, np.ndarray):
+        print(f"Note: backend='jit' needs the elevations in memory, {type(grid).__name__} "
+              "decodes them lazily; using the NumPy backend.")
+        return "numpy"
+    return backend
+
+
+def _run_rows(kernel, grid: TerrainGrid, rows: slice, target_lats: np.ndarray,
+              target_lons: np.ndarray, radar_lat: float, radar_lon: float,
+              radar_height_agl_m: float, extra: tuple, out: np.ndarray,
+              point_progress_callback: Optional[callable],
+              active: Optional[np.ndarray] = None,
+              k_factor: Optional[float] = None) -> np.ndarray:
+    """
+    Run a kernel over the target rows in ~50 batches, reporting progress
+    between them; cells where `active` is False are skipped. The earth bulge
+    table of each batch (LOS.earth_bulge, zeros without k_factor) is
+    computed before the kernel runs.
+    """
+    if active is None:
+        active = np.ones(out.shape, dtype=bool)
+    lat_rows = np.ascontiguousarray(target_lats[rows], dtype=float)
+    target_lons = np.ascontiguousarray(target_lons, dtype=float)
+    total_points = out.size
+
+    z_ground_r = z_terrain(radar_lat, radar_lon, grid)
+    if z_ground_r is not None:
+        z_radar = z_ground_r + radar_height_agl_m
+        grid_args = (grid.lats, grid.lons, grid.Z, grid.regular,
+                     grid.lat0, grid.lon0, grid.dlat, grid.dlon)
+        batch = max(1, len(lat_rows) // 50)  # Report ~50 times
+        for start in range(0, len(lat_rows), batch):
+            stop = min(start + batch, len(lat_rows))
+            bulge = earth_bulge(radar_lat, radar_lon, lat_rows[start:stop, None],
+                                target_lons[None, :], k_factor)
+            kernel(*grid_args, float(radar_lat), float(radar_lon), z_radar,
+                   lat_rows[start:stop], target_lons, *extra, bulge, active[start:stop],
+                   out[start:stop])
+            if point_progress_callback:
+                current = stop * len(target_lons)
+                point_progress_callback(current, total_points, current / total_points * 100)
+
+    if point_progress_callback:
+        point_progress_callback(total_points, total_points, 100.0)
+    return out
+
+
+def jit_coverage_rows(
+    grid: TerrainGrid,
+    rows: slice,
+    target_lats: np.ndarray,
+    target_lons: np.ndarray,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    target_alt_m_msl: float,
+    n_samples: int,
+    margin_m: float,
+    los_mode: str,
+    point_progress_callback: Optional[callable] = None,
+    stats: Optional[dict] = None,
+    active: Optional[np.ndarray] = None,
+    k_factor: Optional[float] = None
+) -> np.ndarray:
+    """
+    Coverage of the target rows `rows` (a slice of target_lats) with the
+    compiled kernel. Returns a 2D boolean array (rows x len(target_lons));
+    stats gets the blocker cache counters (see coverage_analysis.compute_coverage_map).
+    Cells where `active` (rows x len(target_lons)) is False are skipped (blocked).
+    k_factor: effective earth radius factor (None = flat terrain).
+    """
+    out = np.zeros((len(target_lats[rows]), len(target_lons)), dtype=bool)
+    counts = np.zeros(2, dtype=np.int64)
+    dda = los_mode == "dda"
+    tolerance_m = BLOCKER_TOLERANCE_M if dda else 0.0
+    extra = (float(target_alt_m_msl), int(n_samples), float(margin_m), dda, tolerance_m, counts)
+    from los_jit_kernels import coverage_kernel
+    _run_rows(coverage_kernel, grid, rows, target_lats, target_lons,
+              radar_lat, radar_lon, radar_height_agl_m, extra, out, point_progress_callback,
+              active, k_factor)
+    if stats is not None:
+        stats["blocker_tests"] = stats.get("blocker_tests", 0) + int(counts[0])
+        stats["blocker_hits"] = stats.get("blocker_hits", 0) + int(counts[1])
+    return out
+
+
+def jit_min_altitude_rows(
+    grid: TerrainGrid,
+    rows: slice,
+    target_lats: np.ndarray,
+    target_lons: np.ndarray,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    n_samples: int,
+    margin_m: float,
+    los_mode: str,
+    point_progress_callback: Optional[callable] = None,
+    active: Optional[np.ndarray] = None,
+    k_factor: Optional[float] = None
+) -> np.ndarray:
+    """
+    Minimum visible altitude of the target rows `rows` (a slice of
+    target_lats) with the compiled kernel. Returns a 2D float array
+    (rows x len(target_lons), inf = never visible). Cells where `active` is
+    False are skipped (inf).
+    """
+    from los_jit_kernels import min_altitude_kernel
+    out = np.full((len(target_lats[rows]), len(target_lons)), np.inf)
+    extra = (int(n_samples), float(margin_m), los_mode == "dda")
+    return _run_rows(min_altitude_kernel, grid, rows, target_lats, target_lons,
+                     radar_lat, radar_lon, radar_height_agl_m, extra, out, point_progress_callback,
+                     active, k_factor)
+
+
+def jit_min_altitude_points(
+    grid: TerrainGrid,
+    target_lat: np.ndarray,
+    target_lon: np.ndarray,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    n_samples: int,
+    margin_m: float,
+    los_mode: str,
+    k_factor: Optional[float] = None
+) -> np.ndarray:
+    """
+    Minimum visible altitude of 1D arrays of targets (any positions) with the
+    compiled kernel. Returns a 1D float array (inf = never visible).
+    """
+    from los_jit_kernels import min_altitude_points_kernel
+    target_lat = np.ascontiguousarray(target_lat, dtype=float)
+    target_lon = np.ascontiguousarray(target_lon, dtype=float)
+    out = np.full(target_lat.shape, np.inf)
+    z_ground_r = z_terrain(radar_lat, radar_lon, grid)
+    if z_ground_r is not None and target_lat.size:
+        min_altitude_points_kernel(grid.lats, grid.lons, grid.Z, grid.regular,
+                                   grid.lat0, grid.lon0, grid.dlat, grid.dlon,
+                                   float(radar_lat), float(radar_lon),
+                                   z_ground_r + radar_height_agl_m, target_lat, target_lon,
+                                   int(n_samples), float(margin_m), los_mode == "dda",
+                                   earth_bulge(radar_lat, radar_lon, target_lat, target_lon, k_factor),
+                                   out)
+    return out
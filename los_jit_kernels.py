@@ -0,0 +1,266 @@
+"""
+JIT LOS Kernels
+
+The numba kernels of the "jit" backend (see los_jit.py). They are kept apart
+from los_jit.py so that numba is only imported on the first backend="jit"
+run, not by every import of coverage_analysis.
+"""
+
+import math
+import numpy as np
+
+# Try to import numba for the compiled kernels
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        # Kernels stay importable as plain Python (slow, but same results)
+        if args and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+
+@njit(cache=True)
+def _axis_cell(axis, regular, origin, step, x):
+    """Upper node index of the axis interval holding x (TerrainGrid.cell_index)."""
+    n = axis.shape[0]
+    if regular:
+        k = int(np.ceil((x - origin) / step - 1e-9))
+    else:
+        k = np.searchsorted(axis, x)
+    return min(max(k, 1), n - 1)
+
+
+@njit(cache=True)
+def _sample(lats, lons, Z, regular, lat0, lon0, dlat, dlon, lat, lon):
+    """
+    Bilinear terrain altitude at (lat, lon) (TerrainGrid.sample).
+    Returns (z, nodata).
+    """
+    if not (lats[0] <= lat and lat <= lats[-1] and lons[0] <= lon and lon <= lons[-1]):
+        return np.nan, True
+    i1 = _axis_cell(lats, regular, lat0, dlat, lat)
+    j1 = _axis_cell(lons, regular, lon0, dlon, lon)
+    i0 = i1 - 1
+    j0 = j1 - 1
+
+    z00 = float(Z[i0, j0])
+    z01 = float(Z[i0, j1])
+    z10 = float(Z[i1, j0])
+    z11 = float(Z[i1, j1])
+    if min(min(z00, z01), min(z10, z11)) < 0:
+        return np.nan, True
+
+    t = (lat - lats[i0]) / (lats[i1] - lats[i0] + 1e-12)
+    u = (lon - lons[j0]) / (lons[j1] - lons[j0] + 1e-12)
+    z0 = (1 - u) * z00 + u * z01
+    z1 = (1 - u) * z10 + u * z11
+    return (1 - t) * z0 + t * z1, False
+
+
+@njit(cache=True)
+def _sample_visible(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                    radar_lat, radar_lon, z_radar, target_lat, target_lon,
+                    target_alt, n_samples, margin_m, bulge):
+    """
+    Sampled LOS (LOS.los_visible mode="sample"), stopping at the first
+    blocking sample. Returns (visible, s of the blocking sample or -1).
+    """
+    for k in range(1, n_samples):
+        s = k / n_samples
+        z, nodata = _sample(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                            radar_lat + s * (target_lat - radar_lat),
+                            radar_lon + s * (target_lon - radar_lon))
+        if nodata:
+            return False, s  # Safe: no-data => consider blocked
+        if z + margin_m + bulge * (s * (1.0 - s)) >= z_radar + s * (target_alt - z_radar):
+            return False, s
+    return True, -1.0
+
+
+@njit(cache=True)
+def _blocked_at(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                radar_lat, radar_lon, z_radar, target_lat, target_lon,
+                target_alt, s, margin_m, tolerance_m, bulge):
+    """Blocking test at path fraction s (LOS.los_blocked_at)."""
+    z, nodata = _sample(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                        radar_lat + s * (target_lat - radar_lat),
+                        radar_lon + s * (target_lon - radar_lon))
+    return (nodata or z + margin_m + bulge * (s * (1.0 - s))
+            >= z_radar + s * (target_alt - z_radar) + tolerance_m)
+
+
+@njit(cache=True)
+def _sample_min_altitude(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                         radar_lat, radar_lon, z_radar, target_lat, target_lon,
+                         n_samples, margin_m, bulge):
+    """Sampled minimum visible altitude (LOS.los_min_visible_altitude mode="sample")."""
+    result = -np.inf
+    for k in range(1, n_samples):
+        s = k / n_samples
+        z, nodata = _sample(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                            radar_lat + s * (target_lat - radar_lat),
+                            radar_lon + s * (target_lon - radar_lon))
+        if nodata:
+            return np.inf  # Safe: no-data => consider blocked
+        result = max(result, z_radar + (z + margin_m + bulge * (s * (1.0 - s)) - z_radar) / s)
+    return result
+
+
+@njit(cache=True)
+def _crossings(axis, a, b):
+    """Path fractions where the a -> b segment crosses the grid lines of an axis."""
+    if a == b:
+        return np.empty(0)
+    lo = min(a, b)
+    hi = max(a, b)
+    lines = axis[np.searchsorted(axis, lo, side='right'):np.searchsorted(axis, hi, side='left')]
+    return (lines - a) / (b - a)
+
+
+@njit(cache=True)
+def _dda_min_altitude(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                      radar_lat, radar_lon, z_radar, target_lat, target_lon, margin_m, bulge):
+    """
+    Exact minimum visible altitude (LOS._dda_min_visible_altitude), and the
+    path fraction where it is reached (-1 if blocked by no-data / at the radar).
+    """
+    if not (lats[0] <= radar_lat and radar_lat <= lats[-1] and
+            lons[0] <= radar_lon and radar_lon <= lons[-1] and
+            lats[0] <= target_lat and target_lat <= lats[-1] and
+            lons[0] <= target_lon and target_lon <= lons[-1]):
+        return np.inf, -1.0
+
+    cross_lat = _crossings(lats, radar_lat, target_lat)
+    cross_lon = _crossings(lons, radar_lon, target_lon)
+    s = np.empty(2 + cross_lat.size + cross_lon.size)
+    s[0] = 0.0
+    s[1] = 1.0
+    s[2:2 + cross_lat.size] = cross_lat
+    s[2 + cross_lat.size:] = cross_lon
+    s = np.sort(s)
+
+    # Maxima over the piece end points and over the critical points
+    g_end = -np.inf
+    s_end = -1.0
+    g_crit = -np.inf
+    s_crit_max = -1.0
+    for k in range(s.size - 1):
+        s0 = s[k]
+        s1 = s[k + 1]
+        sm = 0.5 * (s0 + s1)
+        i1 = _axis_cell(lats, regular, lat0, dlat, radar_lat + sm * (target_lat - radar_lat))
+        j1 = _axis_cell(lons, regular, lon0, dlon, radar_lon + sm * (target_lon - radar_lon))
+        i0 = i1 - 1
+        j0 = j1 - 1
+
+        z00 = float(Z[i0, j0])
+        z01 = float(Z[i0, j1])
+        z10 = float(Z[i1, j0])
+        z11 = float(Z[i1, j1])
+        if min(min(z00, z01), min(z10, z11)) < 0:
+            return np.inf, -1.0  # Safe: no-data => consider blocked
+
+        # Quadratic q(s) = A s^2 + B s + C of the terrain along the piece
+        dlat_c = lats[i1] - lats[i0]
+        dlon_c = lons[j1] - lons[j0]
+        t0 = (radar_lat - lats[i0]) / dlat_c
+        tb = (target_lat - radar_lat) / dlat_c
+        u0 = (radar_lon - lons[j0]) / dlon_c
+        ub = (target_lon - radar_lon) / dlon_c
+
+        e = z00 - z01 - z10 + z11
+        A = e * tb * ub - bulge
+        B = (z10 - z00) * tb + (z01 - z00) * ub + e * (t0 * ub + u0 * tb) + bulge
+        C = z00 + (z10 - z00) * t0 + (z01 - z00) * u0 + e * t0 * u0 + margin_m - z_radar
+
+        if k == 0 and C > 0:
+            return np.inf, -1.0  # Blocked at the radar whatever the altitude
+
+        ratio = C / A if A != 0 else -1.0
+        s_crit = math.sqrt(ratio) if ratio > 0 else 0.0
+        if not (s_crit > s0 and s_crit < s1):
+            s_crit = s1
+
+        g = (A * s1 + B) + C / s1
+        if g > g_end:
+            g_end = g
+            s_end = s1
+        g = (A * s_crit + B) + C / s_crit
+        if g > g_crit:
+            g_crit = g
+            s_crit_max = s_crit
+    if g_end >= g_crit:
+        return z_radar + g_end, s_end
+    return z_radar + g_crit, s_crit_max
+
+
+@njit(cache=True)
+def min_altitude_kernel(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                         radar_lat, radar_lon, z_radar, row_lats, target_lons,
+                         n_samples, margin_m, dda, bulge, active, out):
+    for i in range(row_lats.size):
+        for j in range(target_lons.size):
+            if not active[i, j]:
+                continue
+            if dda:
+                out[i, j] = _dda_min_altitude(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                                              radar_lat, radar_lon, z_radar,
+                                              row_lats[i], target_lons[j], margin_m,
+                                              bulge[i, j])[0]
+            else:
+                out[i, j] = _sample_min_altitude(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                                                 radar_lat, radar_lon, z_radar,
+                                                 row_lats[i], target_lons[j], n_samples, margin_m,
+                                                 bulge[i, j])
+
+
+@njit(cache=True)
+def min_altitude_points_kernel(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                                radar_lat, radar_lon, z_radar, target_lat, target_lon,
+                                n_samples, margin_m, dda, bulge, out):
+    for k in range(target_lat.size):
+        if dda:
+            out[k] = _dda_min_altitude(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                                       radar_lat, radar_lon, z_radar,
+                                       target_lat[k], target_lon[k], margin_m, bulge[k])[0]
+        else:
+            out[k] = _sample_min_altitude(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                                          radar_lat, radar_lon, z_radar,
+                                          target_lat[k], target_lon[k], n_samples, margin_m,
+                                          bulge[k])
+
+
+@njit(cache=True)
+def coverage_kernel(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                     radar_lat, radar_lon, z_radar, row_lats, target_lons, target_alt,
+                     n_samples, margin_m, dda, tolerance_m, counts, bulge, active, out):
+    # Blocker cache: the previous target's blocker is tested first
+    # (counts[0] = tests, counts[1] = hits, see coverage_analysis._coverage_rows)
+    blocker = -1.0
+    for i in range(row_lats.size):
+        for j in range(target_lons.size):
+            if not active[i, j]:
+                continue
+            if blocker > 0:
+                counts[0] += 1
+                if _blocked_at(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                               radar_lat, radar_lon, z_radar, row_lats[i], target_lons[j],
+                               target_alt, blocker, margin_m, tolerance_m, bulge[i, j]):
+                    counts[1] += 1
+                    out[i, j] = False
+                    continue
+            if dda:
+                min_alt, blocker = _dda_min_altitude(lats, lons, Z, regular, lat0, lon0,
+                                                     dlat, dlon, radar_lat, radar_lon,
+                                                     z_radar, row_lats[i], target_lons[j], margin_m,
+                                                     bulge[i, j])
+                visible = target_alt > min_alt
+            else:
+                visible, blocker = _sample_visible(lats, lons, Z, regular, lat0, lon0, dlat, dlon,
+                                                   radar_lat, radar_lon, z_radar, row_lats[i],
+                                                   target_lons[j], target_alt, n_samples, margin_m,
+                                                   bulge[i, j])
+            out[i, j] = visible
+            if visible:
+                blocker = -1.0
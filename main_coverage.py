@@ -9,8 +9,13 @@ This script orchestrates the complete coverage analysis workflow:
 """
 
 import numpy as np
-from visualize_terrain import load_terrain_npz
+from terrain import load_terrain_npz
 from coverage_analysis import compute_all_coverage_maps
+from LOS import STANDARD_K_FACTOR
+from horizon_cache import HORIZON_CACHE_DIR
+from result_cache import RESULT_CACHE_DIR
+from checkpoint import CHECKPOINT_DIR
+from parallel import resolve_workers
 from visualize_coverage import plot_all_coverage_maps
 from export_kml import export_all_coverage_to_kmz
 
@@ -32,24 +37,74 @@ def main():
     
     # Terrain data file (DTED 1 format)
     terrain_file = 'terrain_mat.npz'
+    # Elevation dtype in memory: "int16" holds DTED integer meters at 1/4 of float64
+    terrain_dtype = "float64"
     
     # Radar position
     radar_lat = 43.6584   # Example: Nice Airport latitude
     radar_lon = 7.2159    # Example: Nice Airport longitude
     radar_height_agl_m = 50.0  # Radar height above ground level (meters)
     
+    # Sensor range / azimuth limits: cells outside are skipped (None = whole terrain)
+    max_range_km = None    # Instrumented range (km)
+    min_range_km = 0.0     # Minimum range (km)
+    azimuth_sectors = None  # e.g. [(300, 60)] = from 300° clockwise to 60° (true north)
+    
     # Flight levels (tender requirement)
     flight_levels = [5, 10, 20, 50, 100, 200, 300, 400]
     
     # LOS parameters
     n_samples = 400  # Number of samples along LOS path
     margin_m = 0.0   # Safety margin (meters)
-    
-    # TEST MODE: Use smaller grid for faster testing
-    # Set to True to use every Nth point (much faster but lower resolution)
+    # Earth curvature / refraction: effective earth radius factor
+    # (STANDARD_K_FACTOR = 4/3 standard atmosphere, None = flat earth)
+    k_factor = STANDARD_K_FACTOR
+    
+    # Worker processes for the coverage computation (1 = serial, 0 = one per CPU)
+    workers = 1
+    # LOS loop backend: "numpy" or "jit" (compiled with numba if installed)
+    backend = "numpy"
+    
+    # TEST MODE: Use a coarser target grid for faster testing
+    # Set to True to compute every Nth point (much faster but lower map
+    # resolution); the LOS still runs on the full-resolution terrain
     TEST_MODE = True
     TEST_GRID_STEP = 10  # Use every 10th point in test mode
     
+    # ADAPTIVE REFINEMENT: keep the full resolution but evaluate LOS only near
+    # visibility boundaries (coarse block side in cells, e.g. 8; 0 = off)
+    adaptive_block = 0
+    
+    # On-disk caches below all default to coverage_cache/ (git-ignored):
+    # horizon profiles and maps share one store bounded to 1 GB
+    
+    # HORIZON CACHE: the minimum visible altitude of every cell is stored per
+    # radar / terrain / LOS settings, so reruns (other flight levels, range
+    # limits) skip the LOS entirely (None = off; unused with adaptive refinement)
+    horizon_cache_dir = HORIZON_CACHE_DIR
+    
+    # RESULT CACHE: finished flight level maps are stored per terrain / radar /
+    # settings (LRU), so reruns that only change plotting or export options
+    # load them instead of computing (None = off)
+    result_cache_dir = RESULT_CACHE_DIR
+    
+    # CHECKPOINT: the LOS pass is saved tile by tile, so rerunning after a
+    # crash or Ctrl-C resumes from the last completed tile (None = off)
+    checkpoint_dir = CHECKPOINT_DIR
+    
+    # OUT OF CORE: for grids larger than RAM, maps are written tile by tile to
+    # memory-mapped .npy files in this directory, with the tiles in flight
+    # bounded to memory_budget bytes (None = maps in memory; replaces the
+    # horizon cache and checkpoint; cannot be combined with adaptive refinement)
+    out_dir = None  # e.g. "coverage_maps"
+    memory_budget = 2**30
+    
+    if out_dir is not None and adaptive_block:
+        # Adaptive refinement holds whole rasters: refuse rather than drop out_dir
+        print("Error: out_dir cannot be combined with adaptive_block; "
+              "set adaptive_block = 0 or out_dir = None.")
+        return
+    
     # Output file
     kmz_output = 'radar_coverage.kmz'
     
@@ -59,20 +114,20 @@ def main():
     
     print("Loading terrain data...")
     try:
-        lats_full, lons_full, Z_full = load_terrain_npz(terrain_file)
+        lats_full, lons_full, Z_full = load_terrain_npz(terrain_file, dtype=terrain_dtype)
         print(f"Terrain loaded: {len(lats_full)} x {len(lons_full)} grid points")
         print(f"Latitude range: {lats_full.min():.6f} to {lats_full.max():.6f}")
         print(f"Longitude range: {lons_full.min():.6f} to {lons_full.max():.6f}")
         
-        # Apply test mode if enabled
+        # Apply test mode if enabled: coarser target cells, full terrain
         if TEST_MODE:
-            print(f"\n⚠️  TEST MODE ENABLED: Using every {TEST_GRID_STEP}th point")
+            print(f"\n⚠️  TEST MODE ENABLED: Using every {TEST_GRID_STEP}th point as target")
             lats = lats_full[::TEST_GRID_STEP]
             lons = lons_full[::TEST_GRID_STEP]
-            Z = Z_full[::TEST_GRID_STEP, ::TEST_GRID_STEP]
-            print(f"Reduced grid: {len(lats)} x {len(lons)} = {len(lats)*len(lons):,} points")
+            print(f"Reduced target grid: {len(lats)} x {len(lons)} = {len(lats)*len(lons):,} points "
+                  f"(terrain kept at full resolution)")
         else:
-            lats, lons, Z = lats_full, lons_full, Z_full
+            lats, lons = lats_full, lons_full
             
     except FileNotFoundError:
         print(f"Error: Terrain file '{terrain_file}' not found.")
@@ -87,13 +142,16 @@ def main():
     
     print("\nComputing coverage maps...")
     grid_size = len(lats) * len(lons)
-    total_calculations = grid_size * len(flight_levels)
+    # One minimum-visible-altitude pass serves every flight level (engine
+    # "pyramid" would run its exact DDA fallback there, and the per-flight-level
+    # blocker cache does not apply: see compute_all_coverage_maps)
+    total_calculations = grid_size
     print(f"Grid size: {len(lats)} x {len(lons)} = {grid_size:,} points")
-    print(f"Total LOS calculations: {total_calculations:,} ({total_calculations/1e6:.1f} million)")
+    print(f"Total LOS calculations: {total_calculations:,} ({total_calculations/1e6:.1f} million), shared by {len(flight_levels)} flight levels")
     
     # Rough time estimate (very approximate)
     # Assuming ~0.001-0.01 seconds per LOS calculation depending on complexity
-    est_seconds = total_calculations * 0.005  # Conservative estimate
+    est_seconds = total_calculations * 0.005 / resolve_workers(workers)  # Conservative estimate
     est_minutes = est_seconds / 60
     est_hours = est_minutes / 60
     
@@ -103,7 +161,8 @@ def main():
         print("   Consider:")
         print("   - Setting TEST_MODE = True in the script for faster testing")
         print("   - Reducing n_samples (currently 400)")
-        print("   - Processing fewer flight levels")
+        print("   - Increasing workers to use more CPU cores")
+        print("   - Setting adaptive_block = 8 (LOS only near visibility boundaries)")
         response = input("\nContinue with full computation? (y/n): ").lower().strip()
         if response != 'y':
             print("Computation cancelled. Edit main_coverage.py to enable TEST_MODE for faster testing.")
@@ -116,22 +175,26 @@ def main():
     print("\nStarting computation...")
     print("(Progress: each flight level will print when complete)")
     
-    # Track current flight level being processed
-    current_fl = [None]  # Use list to allow modification in nested function
-    
     # Progress callback for flight levels
     def fl_progress_callback(fl, current, total_fl):
         print(f"  ✓ FL{fl:3.0f} complete ({current}/{total_fl})")
-        if current < total_fl:
-            print(f"  → Starting FL{flight_levels[current]}...")
     
     # Compute all coverage maps
+    out_of_core = out_dir is not None
     try:
         coverage_maps = compute_all_coverage_maps(
             radar_lat, radar_lon, radar_height_agl_m,
-            flight_levels, lats, lons, Z,
+            flight_levels, lats_full, lons_full, Z_full,
             n_samples=n_samples, margin_m=margin_m,
-            progress_callback=fl_progress_callback
+            progress_callback=fl_progress_callback,
+            workers=workers, backend=backend, adaptive_block=adaptive_block,
+            target_lats=lats, target_lons=lons,
+            max_range_km=max_range_km, min_range_km=min_range_km, azimuth_sectors=azimuth_sectors,
+            k_factor=k_factor,
+            horizon_cache=None if adaptive_block or out_of_core else horizon_cache_dir,
+            result_cache=result_cache_dir, checkpoint=None if out_of_core else checkpoint_dir,
+            out_dir=out_dir if out_of_core else None,
+            memory_budget=memory_budget if out_of_core else None
         )
         print("Coverage maps computed successfully!")
     except Exception as e:
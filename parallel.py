@@ -0,0 +1,385 @@
+"""
+Parallel Module
+
+This module runs the per-cell coverage loops on a process pool.
+
+The terrain grid is split into blocks of rows (tiles). Tiles are handed to the
+worker processes one at a time as they become free, so a worker that drew
+cheap tiles (e.g. blocked rays close to the radar) simply takes more of them.
+Every cell is computed by the same function as in the serial loop, so the
+assembled result is identical to the serial one.
+
+The terrain arrays (and the result) live in multiprocessing shared memory:
+workers attach to them zero-copy instead of receiving a pickled copy of the
+terrain, and write their tiles straight into the shared result array, so
+worker start-up time and memory stay flat as the number of workers grows.
+Read-only memory-mapped terrain (the raw terrain cache) is not copied at all:
+workers map the same file, so a grid larger than RAM stays on disk.
+iter_tiles instead streams the tiles back to the caller as they complete,
+without a full result array.
+"""
+
+import mmap
+import os
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from multiprocessing import shared_memory
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+from terrain import TerrainGrid
+
+
+# Tiles per worker: more tiles balance uneven tile costs better
+TILES_PER_WORKER = 8
+
+# Target cells per tile of bounded tiles (streamed or checkpointed results):
+# each tile costs seconds of LOS work, so per-tile overhead is negligible,
+# while a tile stays small in memory (512 kB of float64)
+TILE_CELLS = 2**16
+
+# Minimum number of bounded tiles of a grid (fewer only with fewer rows)
+MIN_TILES = 16
+
+# Shared memory blocks, terrain grid and result array of the current worker
+# process (set once by the pool initializer)
+_worker_blocks = []
+_worker_grid = None
+_worker_result = None
+
+
+class SharedArraySpec(NamedTuple):
+    """Name, shape and dtype of a numpy array held in shared memory."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class MemmapSpec(NamedTuple):
+    """
+    Read-only view of a memory-mapped file: the mapping (file, offset, shape
+    and dtype of np.memmap) and the view inside it (byte offset, shape,
+    strides and dtype).
+    """
+    filename: str
+    map_offset: int
+    map_shape: Tuple[int, ...]
+    map_dtype: str
+    offset: int
+    shape: Tuple[int, ...]
+    strides: Tuple[int, ...]
+    dtype: str
+
+
+def memmap_spec(array: np.ndarray) -> Optional[MemmapSpec]:
+    """
+    MemmapSpec of an array viewing a read-only np.memmap (e.g. the flipped
+    elevations of a memory-mapped terrain), or None for other arrays.
+    """
+    root = array
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if not (isinstance(root, np.memmap) and isinstance(root.base, mmap.mmap)
+            and root.mode == "r" and root.filename):
+        return None
+    offset = array.__array_interface__["data"][0] - root.__array_interface__["data"][0]
+    return MemmapSpec(root.filename, root.offset, root.shape, root.dtype.str,
+                      offset, array.shape, array.strides, array.dtype.str)
+
+
+def attach_memmap(spec: MemmapSpec) -> np.ndarray:
+    """Map the file of a MemmapSpec again (read-only) and rebuild the view."""
+    root = np.memmap(spec.filename, dtype=np.dtype(spec.map_dtype), mode="r",
+                     offset=spec.map_offset, shape=spec.map_shape)
+    return np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=root,
+                      offset=spec.offset, strides=spec.strides)
+
+
+def create_shared_array(shape: Tuple[int, ...], dtype,
+                        blocks: List[shared_memory.SharedMemory]) -> Tuple[np.ndarray, SharedArraySpec]:
+    """
+    Allocate an array in a new shared memory block (appended to `blocks`).
+    Returns the array and the spec used by other processes to attach to it.
+    """
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape)) * dtype.itemsize
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    blocks.append(shm)
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return array, SharedArraySpec(shm.name, tuple(shape), dtype.str)
+
+
+def attach_shared_array(spec: SharedArraySpec,
+                        blocks: List[shared_memory.SharedMemory]) -> np.ndarray:
+    """Attach to an array created by create_shared_array (zero-copy)."""
+    shm = shared_memory.SharedMemory(name=spec.name)
+    blocks.append(shm)
+    return np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
+
+
+def share_grid(grid: TerrainGrid, blocks: List[shared_memory.SharedMemory]) -> dict:
+    """
+    Copy the arrays of a TerrainGrid (axes, Z, no-data mask and any cached
+    pyramid / slope bounds) to shared memory. Arrays of read-only memory-mapped
+    files are passed by reference (MemmapSpec) and mapped again by the
+    workers. Other attributes (e.g. the lazy elevations of a DTEDMosaic) are
+    passed as is.
+    Returns the grid state, with arrays replaced by SharedArraySpec / MemmapSpec.
+    """
+    def to_shared(value):
+        if isinstance(value, np.ndarray):
+            spec = memmap_spec(value)
+            if spec is not None:
+                return spec
+            array, spec = create_shared_array(value.shape, value.dtype, blocks)
+            array[...] = value
+            return spec
+        if isinstance(value, (list, tuple)):
+            return type(value)(to_shared(v) for v in value)
+        return value
+
+    state = {key: to_shared(value) for key, value in vars(grid).items()}
+    state["__class__"] = type(grid)
+    return state
+
+
+def attach_grid(state: dict, blocks: List[shared_memory.SharedMemory]) -> TerrainGrid:
+    """Rebuild a TerrainGrid from share_grid state, attached to shared memory."""
+    def from_shared(value):
+        if isinstance(value, SharedArraySpec):
+            return attach_shared_array(value, blocks)
+        if isinstance(value, MemmapSpec):
+            return attach_memmap(value)
+        if isinstance(value, (list, tuple)):
+            return type(value)(from_shared(v) for v in value)
+        return value
+
+    state = dict(state)
+    cls = state.pop("__class__", TerrainGrid)
+    grid = cls.__new__(cls)
+    for key, value in state.items():
+        setattr(grid, key, from_shared(value))
+    return grid
+
+
+def resolve_workers(workers: int) -> int:
+    """
+    Number of worker processes for a `workers` argument: 0 means one per CPU.
+    """
+    if workers < 0:
+        raise ValueError(f"workers must be >= 0, got {workers}")
+    if workers == 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def row_tiles(n_rows: int, n_tiles: int) -> List[slice]:
+    """Split rows 0..n_rows-1 into at most n_tiles contiguous row slices."""
+    edges = np.linspace(0, n_rows, min(n_tiles, n_rows) + 1).astype(int)
+    return [slice(a, b) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def bounded_row_tiles(shape: Tuple[int, int], tile_cells: int = TILE_CELLS) -> List[slice]:
+    """
+    Row tiles of at most `tile_cells` cells (at least one row, at least
+    MIN_TILES tiles) of a result of this shape: the layout only depends on
+    the shape and tile_cells.
+    """
+    n_rows, n_cols = shape
+    rows = max(1, min(-(-n_rows // MIN_TILES), tile_cells // max(1, n_cols)))
+    return row_tiles(n_rows, -(-n_rows // rows))
+
+
+def _init_worker(grid_state: dict, result_spec: Optional[SharedArraySpec]):
+    global _worker_grid, _worker_result
+    _worker_grid = attach_grid(grid_state, _worker_blocks)
+    _worker_result = None if result_spec is None else attach_shared_array(result_spec, _worker_blocks)
+
+
+def _run_tile(row_function: Callable, rows: slice, args: tuple,
+              with_stats: bool) -> Tuple[Optional[np.ndarray], int, Optional[dict]]:
+    if with_stats:
+        stats = {}
+        block = row_function(_worker_grid, rows, *args, stats=stats)
+    else:
+        stats = None
+        block = row_function(_worker_grid, rows, *args)
+    if _worker_result is None:
+        return block, block.size, stats  # Streamed: the tile goes back to the caller
+    _worker_result[rows] = block
+    return None, block.size, stats
+
+
+def run_tiled(
+    row_function: Callable,
+    grid: TerrainGrid,
+    args: tuple,
+    dtype,
+    workers: int,
+    point_progress_callback: Optional[callable] = None,
+    stats: Optional[dict] = None,
+    shape: Optional[Tuple[int, int]] = None,
+    checkpoint=None
+) -> np.ndarray:
+    """
+    Compute a grid-shaped result tile by tile on a process pool.
+
+    Parameters:
+    -----------
+    row_function : callable
+        Module-level function row_function(grid, rows, *args) returning the
+        result for the canonical grid rows `rows` (a slice)
+    grid : TerrainGrid
+        Terrain grid, shared with the workers through shared memory
+    args : tuple
+        Extra arguments passed to row_function
+    dtype : numpy dtype
+        Result dtype
+    workers : int
+        Number of worker processes (1 = tiles computed in this process)
+    point_progress_callback : callable, optional
+        Callback function for progress updates: callback(current, total, percentage),
+        called as tiles complete with the number of cells done over all workers
+    stats : dict, optional
+        If provided, row_function is also given a stats dict per tile
+        (keyword `stats`) and the numeric counters are summed into this one
+    shape : tuple, optional
+        Result shape when the targets are not the terrain grid nodes
+        (default: grid.shape); tiles are rows of this shape
+    checkpoint : checkpoint.TileCheckpoint, optional
+        On-disk checkpoint of the result: its tiles are used, completed
+        tiles are skipped, each tile is stored as it completes and the
+        checkpoint is removed once the result is complete (default: None)
+
+    Returns:
+    --------
+    np.ndarray
+        Result with the canonical grid shape (or `shape`)
+    """
+    if shape is None:
+        shape = grid.shape
+    if checkpoint is None:
+        tiles = list(enumerate(row_tiles(shape[0], workers * TILES_PER_WORKER)))
+    else:
+        tiles = list(checkpoint.pending())
+    total_points = shape[0] * shape[1]
+    done_points = total_points - sum((rows.stop - rows.start) * shape[1] for _, rows in tiles)
+
+    def tile_done(index, rows, block, tile_stats):
+        nonlocal done_points
+        if checkpoint is not None:
+            checkpoint.complete(index, block)
+        done_points += block.size
+        for key, value in (tile_stats or {}).items():
+            stats[key] = stats.get(key, 0) + value
+        if point_progress_callback:
+            point_progress_callback(done_points, total_points, done_points / total_points * 100)
+
+    if workers == 1:
+        # Same tiles in this process (a checkpointed serial run)
+        result = np.empty(shape, dtype) if checkpoint is None else checkpoint.result
+        for index, rows in tiles:
+            tile_stats = {} if stats is not None else None
+            if tile_stats is None:
+                block = row_function(grid, rows, *args)
+            else:
+                block = row_function(grid, rows, *args, stats=tile_stats)
+            if checkpoint is None:
+                result[rows] = block
+            tile_done(index, rows, block, tile_stats)
+        return result if checkpoint is None else checkpoint.close(remove=True)
+
+    blocks = []
+    try:
+        grid_state = share_grid(grid, blocks)
+        result, result_spec = create_shared_array(shape, dtype, blocks)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(grid_state, result_spec)) as pool:
+            futures = {pool.submit(_run_tile, row_function, rows, args, stats is not None): (index, rows)
+                       for index, rows in tiles}
+            try:
+                for future in as_completed(futures):
+                    index, rows = futures[future]
+                    _, _, tile_stats = future.result()
+                    tile_done(index, rows, result[rows], tile_stats)
+            except BaseException:
+                # Interrupted: drop the tiles not started (completed ones are checkpointed)
+                for future in futures:
+                    future.cancel()
+                raise
+
+        if checkpoint is not None:
+            return checkpoint.close(remove=True)
+        # Copy out before the shared block is released
+        return result.copy()
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def iter_tiles(
+    row_function: Callable,
+    grid: TerrainGrid,
+    args: tuple,
+    tiles: List[slice],
+    workers: int
+) -> Iterator[Tuple[slice, np.ndarray]]:
+    """
+    Compute row tiles and yield (rows, block) as each one completes.
+
+    The terrain is shared as in run_tiled, but no result array is allocated:
+    each block goes back to the caller. At most 2 * workers tiles are
+    submitted at a time, so memory is bounded by the tiles in flight even if
+    the caller consumes them slowly. Closing the generator early cancels the
+    tiles not started.
+
+    Parameters:
+    -----------
+    row_function : callable
+        Module-level function row_function(grid, rows, *args)
+    grid : TerrainGrid
+        Terrain grid, shared with the workers through shared memory
+    args : tuple
+        Extra arguments passed to row_function
+    tiles : list of slice
+        Row tiles to compute
+    workers : int
+        Number of worker processes (1 = tiles computed in order in this process)
+
+    Yields:
+    -------
+    tuple
+        (rows, block) in completion order
+    """
+    if workers == 1:
+        for rows in tiles:
+            yield rows, row_function(grid, rows, *args)
+        return
+
+    blocks = []
+    try:
+        grid_state = share_grid(grid, blocks)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(grid_state, None)) as pool:
+            queued = iter(tiles)
+            futures = {}
+            try:
+                while True:
+                    for rows in queued:
+                        futures[pool.submit(_run_tile, row_function, rows, args, False)] = rows
+                        if len(futures) >= 2 * workers:
+                            break
+                    if not futures:
+                        break
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        block, _, _ = future.result()
+                        yield futures.pop(future), block
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,312 @@
+"""
+Pyramid Module
+
+This module implements fast LOS accept / reject with the max-elevation pyramid
+of a TerrainGrid (see TerrainGrid.max_pyramid).
+
+Each radar->target ray is cut into stretches: short steps near the radar
+(bounded from the terrain slope), then stretches growing by 5 % with the
+distance from the radar, each bounded by the pyramid level whose blocks are
+at least as large as the stretch:
+- if no stretch can reach the radar->target line, the target is accepted
+  without looking at individual terrain cells
+- if the actual terrain at a stretch end point already reaches the line, the
+  target is rejected
+Only the remaining targets are refined with the exact cell-traversal LOS
+(LOS.los_visible mode="dda"), so the results are identical to engine "dda".
+"""
+
+import numpy as np
+from typing import Dict, Optional, Union
+from terrain import TerrainGrid, as_terrain_grid, to_caller_order
+from LOS import los_visible, z_terrain, earth_bulge
+
+
+# Near field (cells from the radar) bounded from the terrain slope, and its step
+NEAR_CELLS = 32.0
+NEAR_STEP = 0.25
+
+# Length of a far-field ray stretch relative to its distance from the radar
+STRETCH_GROWTH = 0.05
+
+# Number of targets classified per vectorised block
+CHUNK_TARGETS = 65536
+
+
+def dilated_max(level: np.ndarray) -> np.ndarray:
+    """
+    3 x 3 max filter of a pyramid level: bounds the terrain of every point
+    less than one block away from the block.
+    """
+    padded = np.pad(level, 1, mode='constant', constant_values=-np.inf)
+    n, m = level.shape
+    out = padded[1:n + 1, 1:m + 1].copy()
+    for di in (0, 1, 2):
+        for dj in (0, 1, 2):
+            np.maximum(out, padded[di:di + n, dj:dj + m], out=out)
+    return out
+
+
+def stretch_bounds(max_cells: float) -> np.ndarray:
+    """
+    Stretch boundaries along a ray, in cells from the radar: NEAR_STEP steps
+    up to NEAR_CELLS, then growing geometrically by STRETCH_GROWTH up to max_cells.
+    """
+    bounds = list(np.arange(0.0, NEAR_CELLS + NEAR_STEP / 2, NEAR_STEP))
+    while bounds[-1] < max_cells:
+        bounds.append(bounds[-1] * (1.0 + STRETCH_GROWTH))
+    return np.array(bounds)
+
+
+def classify_targets(
+    radar_lat: float,
+    radar_lon: float,
+    z_radar: float,
+    target_lat: np.ndarray,
+    target_lon: np.ndarray,
+    target_alt_m_msl: float,
+    grid: TerrainGrid,
+    margin_m: float = 0.0,
+    dilated: Optional[Dict[int, np.ndarray]] = None,
+    bulge: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Accept / reject targets with the max-elevation pyramid.
+
+    Along each ray q(s) = terrain + margin - z_radar (+ the earth bulge
+    c * s * (1 - s)), and the target is visible iff
+    q(s) / s < target_alt_m_msl - z_radar for every s in (0, 1]:
+    - near the radar, q(s) <= q(s_lo) + (s - s_lo) * slope on short steps
+    - farther away, q(s) <= the pyramid block maximum around each stretch
+    The actual q at the step / stretch end points gives the lower bound.
+
+    Parameters:
+    -----------
+    radar_lat, radar_lon : float
+        Radar position (degrees), inside the grid
+    z_radar : float
+        Radar antenna altitude (meters MSL)
+    target_lat, target_lon : np.ndarray
+        1D arrays of target positions (degrees), inside the grid
+    target_alt_m_msl : float
+        Target altitude (meters MSL)
+    grid : TerrainGrid
+        Terrain grid
+    margin_m : float, optional
+        Safety margin in meters (default: 0.0)
+    dilated : dict, optional
+        Cache of dilated pyramid levels, shared between calls on the same grid
+    bulge : np.ndarray, optional
+        Earth bulge coefficient c of each target (see LOS.earth_bulge,
+        default: None = flat terrain)
+
+    Returns:
+    --------
+    np.ndarray
+        1D int8 array: 1 = visible, 0 = blocked, -1 = undecided (needs the exact LOS)
+    """
+    pyramid = grid.max_pyramid()
+    gi, gj = grid.slope_bounds()
+    if dilated is None:
+        dilated = {}
+    n_cells_lat, n_cells_lon = pyramid[0].shape
+
+    lat_idx = np.arange(len(grid.lats), dtype=float)
+    lon_idx = np.arange(len(grid.lons), dtype=float)
+    ri = float(np.interp(radar_lat, grid.lats, lat_idx))
+    rj = float(np.interp(radar_lon, grid.lons, lon_idx))
+
+    # Ray direction in fractional cell indices; R = ray length in cells
+    di = np.interp(target_lat, grid.lats, lat_idx) - ri
+    dj = np.interp(target_lon, grid.lons, lon_idx) - rj
+    R = np.maximum(np.abs(di), np.abs(dj))
+    R_safe = np.where(R > 0, R, 1.0)
+    c = np.zeros(R.shape) if bulge is None else bulge
+
+    g_target = target_alt_m_msl - z_radar
+    upper = np.full(R.shape, -np.inf)
+    lower = np.full(R.shape, -np.inf)
+
+    z0, _ = grid.sample(radar_lat, radar_lon)
+    q_lo = np.full(R.shape, float(z0) + margin_m - z_radar)
+
+    def cell(s):
+        ci = np.clip(np.floor(ri + s * di).astype(np.intp), 0, n_cells_lat - 1)
+        cj = np.clip(np.floor(rj + s * dj).astype(np.intp), 0, n_cells_lon - 1)
+        return ci, cj
+
+    bounds = stretch_bounds(R.max())
+    for r_lo, r_hi in zip(bounds[:-1], bounds[1:]):
+        s_lo = np.minimum(r_lo, R) / R_safe
+        s_hi = np.minimum(r_hi, R) / R_safe
+        valid = s_hi > s_lo
+
+        # Actual terrain at the stretch end point (lower bound)
+        z, nodata = grid.sample(radar_lat + s_hi * (target_lat - radar_lat),
+                                radar_lon + s_hi * (target_lon - radar_lon))
+        q_hi = np.where(nodata, np.inf, z + margin_m - z_radar + c * (s_hi * (1.0 - s_hi)))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            lb = q_hi / s_hi
+        np.maximum(lower, np.where(valid & ~nodata, lb, -np.inf), out=lower)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if r_hi <= NEAR_CELLS:
+                # q(s) / s <= a / s + slope with a = q(s_lo) - s_lo * slope;
+                # the bulge grows by at most c * (1 - 2 s_lo) per unit of s
+                ci_lo, cj_lo = cell(s_lo)
+                ci_hi, cj_hi = cell(s_hi)
+                ci, cj = np.minimum(ci_lo, ci_hi), np.minimum(cj_lo, cj_hi)
+                slope = gi[ci, cj] * np.abs(di) + gj[ci, cj] * np.abs(dj) + c * (1.0 - 2.0 * s_lo)
+                a = q_lo - s_lo * slope
+                ub = np.where(a <= 0, a / s_hi + slope, q_lo / s_lo)
+            else:
+                # Every point of the stretch is less than one block away from its midpoint
+                level = int(min(len(pyramid) - 1, max(0, np.ceil(np.log2((r_hi - r_lo) / 2)))))
+                if level not in dilated:
+                    dilated[level] = dilated_max(pyramid[level])
+                ci, cj = cell(0.5 * (s_lo + s_hi))
+                N = dilated[level][ci >> level, cj >> level] + margin_m - z_radar
+                # bulge / s = c * (1 - s) is largest at s_lo
+                ub = np.where(N >= 0, N / s_lo, N / s_hi) + c * (1.0 - s_lo)
+        ub[np.isnan(ub)] = np.inf
+        np.maximum(upper, np.where(valid, ub, -np.inf), out=upper)
+        q_lo = q_hi
+
+    status = np.full(R.shape, -1, dtype=np.int8)
+    status[upper < g_target] = 1
+    status[lower >= g_target] = 0
+    status[R == 0] = -1
+    return status
+
+
+def compute_coverage_pyramid(
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    target_alt_m_msl: float,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    Z: Optional[np.ndarray] = None,
+    margin_m: float = 0.0,
+    point_progress_callback: Optional[callable] = None,
+    stats: Optional[dict] = None,
+    k_factor: Optional[float] = None
+) -> np.ndarray:
+    """
+    Compute a coverage map at a fixed MSL altitude with pyramid accept / reject.
+
+    Parameters:
+    -----------
+    radar_lat, radar_lon : float
+        Radar position (degrees)
+    radar_height_agl_m : float
+        Radar height above ground level (meters)
+    target_alt_m_msl : float
+        Target altitude (meters MSL), e.g. fl_to_m(100)
+    lats, lons : np.ndarray
+        1D latitude / longitude axes (lats may be a TerrainGrid, lons and Z omitted)
+    Z : np.ndarray
+        2D terrain elevation array with shape (len(lats), len(lons))
+    margin_m : float, optional
+        Safety margin in meters (default: 0.0)
+    point_progress_callback : callable, optional
+        Callback function for progress updates: callback(current, total, percentage)
+    stats : dict, optional
+        If provided, filled with the number of targets "accepted", "rejected"
+        and "refined" (exact LOS)
+    k_factor : float, optional
+        Effective earth radius factor, e.g. LOS.STANDARD_K_FACTOR (default:
+        None = flat terrain)
+
+    Returns:
+    --------
+    np.ndarray
+        2D boolean array with shape (len(lats), len(lons))
+        True = visible, False = blocked
+    """
+    grid = as_terrain_grid(lats, lons, Z)
+    coverage_map = pyramid_coverage_rows(
+        grid, slice(0, grid.shape[0]),
+        radar_lat, radar_lon, radar_height_agl_m, target_alt_m_msl,
+        margin_m=margin_m, point_progress_callback=point_progress_callback,
+        stats=stats, k_factor=k_factor
+    )
+    return to_caller_order(coverage_map, grid, lats)
+
+
+def pyramid_coverage_rows(
+    grid: TerrainGrid,
+    rows: slice,
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    target_alt_m_msl: float,
+    margin_m: float = 0.0,
+    point_progress_callback: Optional[callable] = None,
+    stats: Optional[dict] = None,
+    target_lats: Optional[np.ndarray] = None,
+    target_lons: Optional[np.ndarray] = None,
+    active: Optional[np.ndarray] = None,
+    k_factor: Optional[float] = None
+) -> np.ndarray:
+    """
+    Pyramid coverage of the canonical grid rows `rows` (a slice), see
+    compute_coverage_pyramid. Returns a 2D boolean array (rows x len(grid.lons)).
+    With target_lats / target_lons, the rows are those of the target axes
+    instead of the terrain grid axes. Cells where `active` (same shape as
+    the result) is False are skipped (blocked).
+    """
+    if target_lats is None:
+        target_lats, target_lons = grid.lats, grid.lons
+    lat_rows = target_lats[rows]
+    coverage_map = np.zeros((len(lat_rows), len(target_lons)), dtype=bool)
+
+    z_ground_r = z_terrain(radar_lat, radar_lon, grid)
+    if z_ground_r is None:
+        return coverage_map
+    z_radar = z_ground_r + radar_height_agl_m
+
+    lon_grid, lat_grid = np.meshgrid(target_lons, lat_rows)
+    target_lat = lat_grid.ravel()
+    target_lon = lon_grid.ravel()
+    flat = coverage_map.ravel()
+
+    # Targets outside the terrain are no-data (blocked, as in the exact LOS)
+    cells = np.flatnonzero(grid.contains(target_lat, target_lon) &
+                           (True if active is None else active.ravel()))
+    status = np.zeros(target_lat.size, dtype=np.int8)
+    dilated = {}
+    for start in range(0, cells.size, CHUNK_TARGETS):
+        chunk = cells[start:start + CHUNK_TARGETS]
+        status[chunk] = classify_targets(
+            radar_lat, radar_lon, z_radar,
+            target_lat[chunk], target_lon[chunk], target_alt_m_msl,
+            grid, margin_m=margin_m, dilated=dilated,
+            bulge=earth_bulge(radar_lat, radar_lon, target_lat[chunk], target_lon[chunk], k_factor)
+        )
+    flat[status == 1] = True
+
+    # Exact LOS only where the pyramid could not decide
+    undecided = np.flatnonzero(status == -1)
+    total_points = target_lat.size
+    progress_interval = max(1, undecided.size // 50)
+    for n, k in enumerate(undecided, 1):
+        flat[k] = los_visible(
+            radar_lat, radar_lon, radar_height_agl_m,
+            target_lat[k], target_lon[k], target_alt_m_msl,
+            grid, margin_m=margin_m, mode="dda", k_factor=k_factor
+        )
+        if point_progress_callback and (n % progress_interval == 0):
+            current = total_points - undecided.size + n
+            point_progress_callback(current, total_points, current / total_points * 100)
+
+    if point_progress_callback:
+        point_progress_callback(total_points, total_points, 100.0)
+
+    if stats is not None:
+        # Summed, so that one stats dict can collect several row tiles
+        stats["accepted"] = stats.get("accepted", 0) + int(np.sum(status == 1))
+        stats["rejected"] = stats.get("rejected", 0) + int(np.sum(status[cells] == 0))
+        stats["refined"] = stats.get("refined", 0) + int(undecided.size)
+
+    return coverage_map
@@ -0,0 +1,162 @@
+"""
+Result Cache Module
+
+This module implements a content-addressed on-disk store of computed arrays
+(coverage maps, horizon profiles). Each entry is keyed by a dict of the
+parameters its values depend on (radar, terrain content hash, LOS settings,
+LOS.ENGINE_VERSION, ...):
+- the SHA-256 of the parameters names a .npy file holding the array and a
+  .json file holding the parameters, written last (an entry is only read
+  once both exist and the parameters match)
+- files are written under temporary names and renamed, so concurrent runs
+  never read a partial entry
+- hits are returned as copy-on-write memory maps: nothing is read until the
+  array is used, and writes to it stay in memory
+- the store is bounded by a size in bytes: least recently used entries (by
+  the modification time of their .npy file, touched on every hit) are
+  deleted when a new entry exceeds the bound
+
+Coverage maps and horizon profiles are keyed with a different "kind", so one
+directory holds both under a single bound (RESULT_CACHE_DIR, the default
+root of every on-disk cache, also holding the checkpoints).
+"""
+
+import glob
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Optional
+
+
+# Default directory and size bound of the coverage result cache
+RESULT_CACHE_DIR = "coverage_cache"
+RESULT_CACHE_MAX_BYTES = 2**30
+
+
+def array_hash(*arrays: Optional[np.ndarray]) -> Optional[str]:
+    """
+    SHA-256 hex digest of the dtype, shape and contents of arrays
+    (None if the only array is None, e.g. no region of interest).
+    """
+    if len(arrays) == 1 and arrays[0] is None:
+        return None
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(params: dict) -> str:
+    """File name stem of an entry: SHA-256 hex digest of its parameters."""
+    text = json.dumps(params, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed store of arrays in a directory, with LRU eviction.
+
+    Attributes:
+    -----------
+    cache_dir : str
+        Directory of the entries (created on the first put)
+    max_bytes : int or None
+        Size bound of the directory in bytes (None = unbounded)
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = RESULT_CACHE_MAX_BYTES):
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError(f"max_bytes must be > 0, got {max_bytes}")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _stem(self, params: dict) -> str:
+        return os.path.join(self.cache_dir, cache_key(params))
+
+    def get(self, params: dict) -> Optional[np.ndarray]:
+        """
+        Memory-mapped (copy-on-write) array stored for `params`, or None if
+        the entry is missing, incomplete or was written for other parameters.
+        """
+        stem = self._stem(params)
+        try:
+            with open(stem + ".json") as f:
+                # Compared in JSON form (tuples are stored as lists)
+                if json.load(f) != json.loads(json.dumps(params)):
+                    return None
+            array = np.load(stem + ".npy", mmap_mode="c")
+            os.utime(stem + ".npy")  # Most recently used
+        except (OSError, ValueError):
+            return None
+        return array
+
+    def put(self, params: dict, array: np.ndarray) -> np.ndarray:
+        """
+        Store `array` for `params` and evict least recently used entries
+        beyond max_bytes (never the new one).
+
+        Returns:
+        --------
+        np.ndarray
+            The stored entry, memory-mapped as returned by get
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        stem = self._stem(params)
+
+        path = stem + ".npy"
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp_path, path)
+
+        params_path = stem + ".json"
+        tmp_path = f"{params_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(params, f)
+        os.replace(tmp_path, params_path)
+
+        self.evict(keep=path)
+        return np.load(path, mmap_mode="c")
+
+    def _entries(self) -> list:
+        """(mtime_ns, bytes, .npy path) of every entry, oldest first."""
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.npy")):
+            try:
+                stat = os.stat(path)
+                size = stat.st_size + os.path.getsize(path[:-4] + ".json")
+            except OSError:
+                continue  # Being written or evicted by another run
+            entries.append((stat.st_mtime_ns, size, path))
+        return sorted(entries)
+
+    def size_bytes(self) -> int:
+        """Total size of the entries in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Delete least recently used entries until the store fits max_bytes
+        (`keep`: .npy path never deleted). Returns the number of bytes freed.
+        """
+        if self.max_bytes is None:
+            return 0
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                # Parameters first: a half-deleted entry is never read
+                os.remove(path[:-4] + ".json")
+                os.remove(path)
+            except OSError:
+                continue  # Still mapped (Windows) or already gone
+            freed += size
+        return freed
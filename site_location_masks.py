@@ -12,6 +12,8 @@ The masks are designed to be:
 """
 
 import numpy as np
+from typing import Optional, Sequence, Tuple, Union
+from terrain import TerrainGrid, as_terrain_grid, grid_axes
 
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -50,7 +52,83 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return distance_km
 
 
-def mask_land(lats: np.ndarray, lons: np.ndarray, Z: np.ndarray) -> np.ndarray:
+def initial_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calculate the initial great-circle bearing from the first point to the second.
+    
+    Parameters:
+    -----------
+    lat1, lon1 : float
+        Latitude and longitude of first point (degrees)
+    lat2, lon2 : float
+        Latitude and longitude of second point (degrees)
+    
+    Returns:
+    --------
+    float
+        Azimuth in degrees clockwise from true north, in [0, 360)
+    """
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    dlon = np.radians(lon2) - np.radians(lon1)
+    
+    x = np.sin(dlon) * np.cos(lat2_rad)
+    y = np.cos(lat1_rad) * np.sin(lat2_rad) - np.sin(lat1_rad) * np.cos(lat2_rad) * np.cos(dlon)
+    return np.degrees(np.arctan2(x, y)) % 360.0
+
+
+def in_range_sector(lat: np.ndarray, lon: np.ndarray,
+                    center_lat: float, center_lon: float,
+                    max_range_km: Optional[float] = None, min_range_km: float = 0.0,
+                    azimuth_sectors: Optional[Sequence[Tuple[float, float]]] = None) -> np.ndarray:
+    """
+    Check which points lie within range / azimuth-sector limits around a center.
+    
+    Parameters:
+    -----------
+    lat, lon : np.ndarray
+        Arrays of point positions (degrees)
+    center_lat, center_lon : float
+        Center position, e.g. the radar (degrees)
+    max_range_km : float, optional
+        Maximum great-circle distance in kilometers (default: None = unlimited)
+    min_range_km : float, optional
+        Minimum great-circle distance in kilometers (default: 0.0)
+    azimuth_sectors : list of (start_deg, end_deg), optional
+        Sectors kept, each from start_deg clockwise to end_deg (degrees from
+        true north, e.g. (350, 10) spans north); blanked sectors are the gaps
+        between them (default: None = all azimuths)
+    
+    Returns:
+    --------
+    np.ndarray
+        Boolean array of the shape of lat, True = inside the limits
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    inside = np.ones(np.broadcast(lat, lon).shape, dtype=bool)
+    
+    if max_range_km is not None or min_range_km > 0:
+        distances_km = haversine_distance(center_lat, center_lon, lat, lon)
+        if max_range_km is not None:
+            inside &= distances_km <= max_range_km
+        inside &= distances_km >= min_range_km
+    
+    if azimuth_sectors is not None:
+        azimuth = initial_bearing(center_lat, center_lon, lat, lon)
+        in_sector = np.zeros_like(inside)
+        for start, end in azimuth_sectors:
+            if end - start >= 360.0:
+                in_sector[...] = True
+            else:
+                in_sector |= (azimuth - start) % 360.0 <= (end - start) % 360.0
+        inside &= in_sector
+    
+    return inside
+
+
+def mask_land(lats: Union[np.ndarray, TerrainGrid], lons: Optional[np.ndarray] = None,
+              Z: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Create a boolean mask for onshore areas (land).
     
@@ -59,8 +137,8 @@ def mask_land(lats: np.ndarray, lons: np.ndarray, Z: np.ndarray) -> np.ndarray:
     
     Parameters:
     -----------
-    lats : np.ndarray
-        1D array of latitude values (degrees)
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values (degrees), or a TerrainGrid (lons and Z omitted)
     lons : np.ndarray
         1D array of longitude values (degrees)
     Z : np.ndarray
@@ -72,15 +150,18 @@ def mask_land(lats: np.ndarray, lons: np.ndarray, Z: np.ndarray) -> np.ndarray:
         Boolean array of shape (len(lats), len(lons))
         True = land (admissible), False = sea/offshore (excluded)
     """
-    if Z.shape != (len(lats), len(lons)):
+    if isinstance(lats, TerrainGrid):
+        Z = np.asarray(as_terrain_grid(lats, lons, Z).Z)
+    elif Z.shape != (len(lats), len(lons)):
         raise ValueError(f"Terrain shape mismatch: Z{Z.shape} vs ({len(lats)}, {len(lons)})")
     
-    # True where elevation > 0 (land), False where elevation <= 0 (sea)
-    mask = Z > 0.0
+    # True where elevation > 0 (land), False where elevation <= 0 (sea);
+    # compared in the terrain dtype (no float copy of an int16 grid)
+    mask = Z > 0
     return mask
 
 
-def mask_50km(lats: np.ndarray, lons: np.ndarray, 
+def mask_50km(lats: Union[np.ndarray, TerrainGrid], lons: Optional[np.ndarray] = None, *,
               center_lat: float, center_lon: float, 
               radius_km: float = 50.0) -> np.ndarray:
     """
@@ -91,10 +172,11 @@ def mask_50km(lats: np.ndarray, lons: np.ndarray,
     
     Parameters:
     -----------
-    lats : np.ndarray
-        1D array of latitude values (degrees)
-    lons : np.ndarray
-        1D array of longitude values (degrees)
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values (degrees), or a TerrainGrid (lons omitted)
+    lons : np.ndarray, optional
+        1D array of longitude values (degrees); the arguments after it are
+        keyword-only
     center_lat : float
         Latitude of center point (degrees)
     center_lon : float
@@ -108,6 +190,8 @@ def mask_50km(lats: np.ndarray, lons: np.ndarray,
         Boolean array of shape (len(lats), len(lons))
         True = within radius (admissible), False = outside radius (excluded)
     """
+    lats, lons = grid_axes(lats, lons)
+    
     # Create meshgrid for all lat/lon combinations
     lon_grid, lat_grid = np.meshgrid(lons, lats)
     
@@ -133,6 +217,38 @@ def mask_50km(lats: np.ndarray, lons: np.ndarray,
     return mask
 
 
+def mask_range_sector(lats: Union[np.ndarray, TerrainGrid], lons: Optional[np.ndarray] = None, *,
+                      center_lat: float, center_lon: float,
+                      max_range_km: Optional[float] = None, min_range_km: float = 0.0,
+                      azimuth_sectors: Optional[Sequence[Tuple[float, float]]] = None) -> np.ndarray:
+    """
+    Create a boolean mask for locations within range / azimuth-sector limits
+    around a center point (see in_range_sector).
+    
+    Parameters:
+    -----------
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values (degrees), or a TerrainGrid (lons omitted)
+    lons : np.ndarray, optional
+        1D array of longitude values (degrees); the arguments after it are
+        keyword-only
+    center_lat, center_lon : float
+        Center position (degrees)
+    max_range_km, min_range_km, azimuth_sectors : optional
+        Limits, see in_range_sector
+    
+    Returns:
+    --------
+    np.ndarray
+        Boolean array of shape (len(lats), len(lons))
+        True = inside the limits, False = excluded
+    """
+    lats, lons = grid_axes(lats, lons)
+    lon_grid, lat_grid = np.meshgrid(lons, lats)
+    return in_range_sector(lat_grid, lon_grid, center_lat, center_lon,
+                           max_range_km, min_range_km, azimuth_sectors)
+
+
 def combine_masks(*masks: np.ndarray) -> np.ndarray:
     """
     Combine multiple boolean masks using logical AND.
@@ -167,7 +283,8 @@ def combine_masks(*masks: np.ndarray) -> np.ndarray:
     return result
 
 
-def mask_french_territory(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+def mask_french_territory(lats: Union[np.ndarray, TerrainGrid],
+                          lons: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Create a boolean mask for French territory only.
     
@@ -176,10 +293,10 @@ def mask_french_territory(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
     
     Parameters:
     -----------
-    lats : np.ndarray
-        1D array of latitude values (degrees)
-    lons : np.ndarray
-        1D array of longitude values (degrees)
+    lats : np.ndarray or TerrainGrid
+        1D array of latitude values (degrees), or a TerrainGrid (lons omitted)
+    lons : np.ndarray, optional
+        1D array of longitude values (degrees, omitted with a TerrainGrid)
     
     Returns:
     --------
@@ -187,6 +304,8 @@ def mask_french_territory(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
         Boolean array of shape (len(lats), len(lons))
         True = French territory (admissible), False = Monaco/Italy/excluded
     """
+    lats, lons = grid_axes(lats, lons)
+    
     # Create meshgrid for all lat/lon combinations
     lon_grid, lat_grid = np.meshgrid(lons, lats)
     
@@ -0,0 +1,422 @@
+"""
+Terrain Grid Module
+
+This module provides the TerrainGrid class, the in-memory representation of a
+DTED terrain grid shared by the LOS, coverage, mask and export functions.
+
+The grid is normalised once when it is built:
+- latitude and longitude axes are stored increasing (Z is reordered to match)
+- grid origin and spacing are stored, so regular DTED grids locate cells by
+  arithmetic indexing instead of a binary search
+- the no-data mask (elevation < 0) is computed once, on first use (per-cell
+  LOS never needs it, so memory-mapped elevations are not read in full)
+
+It also loads terrain files (load_terrain_npz) and manages the raw terrain
+cache: terrain_mat.npz is decoded once into
+uncompressed .npy files that later runs open with np.memmap (see
+load_terrain_cache), so start-up does not decompress the terrain again and
+concurrent processes share the same page-cache pages.
+
+The module only depends on NumPy and does no work at import time, so headless
+batch runs load the terrain without importing matplotlib.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+from typing import List, Optional, Tuple
+
+
+class TerrainGrid:
+    """
+    Terrain elevation grid with canonical (increasing) axes.
+
+    Attributes:
+    -----------
+    lats : np.ndarray
+        1D increasing latitude axis (degrees)
+    lons : np.ndarray
+        1D increasing longitude axis (degrees)
+    Z : np.ndarray
+        2D terrain elevation array (meters MSL), shape (len(lats), len(lons)),
+        kept in its source dtype (float64, float32 or int16, see TERRAIN_DTYPES);
+        interpolation converts only the sampled nodes to float
+    lat0, lon0 : float
+        Grid origin (south-west node)
+    dlat, dlon : float
+        Grid spacing (degrees), meaningful when regular is True
+    regular : bool
+        True if both axes are evenly spaced (arithmetic cell lookup)
+    nodata : np.ndarray
+        2D boolean array, True where elevation is no-data (< 0), built on first use
+    lat_reversed, lon_reversed : bool
+        True if the source axis was decreasing (see as_input_order)
+
+    A TerrainGrid unpacks like the (lats, lons, Z) tuple it replaces:
+        lats, lons, Z = grid
+    """
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, Z: np.ndarray):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        Z = np.asarray(Z)
+
+        if Z.shape != (len(lats), len(lons)):
+            raise ValueError(f"Incohérence: Z{Z.shape} vs ({len(lats)}, {len(lons)})")
+        if len(lats) < 2 or len(lons) < 2:
+            raise ValueError(f"Terrain grid must be at least 2 x 2, got {Z.shape}")
+
+        self.lat_reversed = bool(lats[0] > lats[-1])
+        self.lon_reversed = bool(lons[0] > lons[-1])
+
+        self.lats = lats[::-1] if self.lat_reversed else lats
+        self.lons = lons[::-1] if self.lon_reversed else lons
+        self.Z = self.as_input_order(Z)
+
+        self.lat0 = float(self.lats[0])
+        self.lon0 = float(self.lons[0])
+        self.dlat = float(self.lats[-1] - self.lats[0]) / (len(self.lats) - 1)
+        self.dlon = float(self.lons[-1] - self.lons[0]) / (len(self.lons) - 1)
+        self.regular = (_is_regular(self.lats, self.dlat) and
+                        _is_regular(self.lons, self.dlon))
+
+        self._nodata = None
+        self._max_pyramid = None
+        self._slope_bounds = None
+        self._content_hash = None
+
+    def __iter__(self):
+        return iter((self.lats, self.lons, self.Z))
+
+    def __repr__(self) -> str:
+        return (f"TerrainGrid({len(self.lats)} x {len(self.lons)}, "
+                f"lat {self.lats[0]:.6f}..{self.lats[-1]:.6f}, "
+                f"lon {self.lons[0]:.6f}..{self.lons[-1]:.6f}, "
+                f"regular={self.regular})")
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.Z.shape
+
+    @property
+    def nodata(self) -> np.ndarray:
+        if self._nodata is None:
+            self._nodata = np.asarray(self.Z) < 0
+        return self._nodata
+
+    def as_input_order(self, array: np.ndarray) -> np.ndarray:
+        """
+        Reorder a grid-shaped array between canonical order and the axis
+        order of the arrays the grid was built from (the operation is its own inverse).
+        """
+        if self.lat_reversed:
+            array = array[::-1, :]
+        if self.lon_reversed:
+            array = array[:, ::-1]
+        return array
+
+    def contains(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """True where (lat, lon) lies inside the grid extent."""
+        return ((self.lats[0] <= lat) & (lat <= self.lats[-1]) &
+                (self.lons[0] <= lon) & (lon <= self.lons[-1]))
+
+    def cell_index(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Upper node indices (i1, j1) of the cells holding (lat, lon), clipped
+        to [1, n - 1]; the cell spans nodes i1 - 1..i1 and j1 - 1..j1.
+        """
+        if self.regular:
+            # ceil() mirrors searchsorted(side='left') on an exact node
+            i1 = np.ceil((lat - self.lat0) / self.dlat - 1e-9).astype(np.intp)
+            j1 = np.ceil((lon - self.lon0) / self.dlon - 1e-9).astype(np.intp)
+        else:
+            i1 = np.searchsorted(self.lats, lat)
+            j1 = np.searchsorted(self.lons, lon)
+        i1 = np.minimum(np.maximum(i1, 1), len(self.lats) - 1)
+        j1 = np.minimum(np.maximum(j1, 1), len(self.lons) - 1)
+        return i1, j1
+
+    def max_pyramid(self) -> List[np.ndarray]:
+        """
+        Max-pooled terrain pyramid, built once per grid and cached.
+
+        Level 0 holds, for each cell, the maximum of its four corner nodes
+        (an upper bound of the bilinear terrain inside the cell). Level k + 1
+        is the 2 x 2 max-pooling of level k, so level k bounds blocks of
+        2**k x 2**k cells. Cells touching no-data are +inf.
+        """
+        if self._max_pyramid is None:
+            Z = np.asarray(self.Z)
+            level = np.maximum(np.maximum(Z[:-1, :-1], Z[:-1, 1:]),
+                               np.maximum(Z[1:, :-1], Z[1:, 1:])).astype(float)
+            level[self.nodata[:-1, :-1] | self.nodata[:-1, 1:] |
+                  self.nodata[1:, :-1] | self.nodata[1:, 1:]] = np.inf
+
+            pyramid = [level]
+            while level.shape[0] > 1 or level.shape[1] > 1:
+                n, m = level.shape
+                padded = np.full((n + n % 2, m + m % 2), -np.inf)
+                padded[:n, :m] = level
+                level = np.maximum(np.maximum(padded[0::2, 0::2], padded[0::2, 1::2]),
+                                   np.maximum(padded[1::2, 0::2], padded[1::2, 1::2]))
+                pyramid.append(level)
+            self._max_pyramid = pyramid
+        return self._max_pyramid
+
+    def slope_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-cell bounds (gi, gj) of the bilinear terrain slope, in meters per
+        cell along latitude and longitude, built once per grid and cached.
+
+        Entry [i, j] is max-filtered over cells i..i + 1, j..j + 1, so it bounds
+        any segment starting in cell (i, j) shorter than one cell. Cells
+        touching no-data are +inf.
+        """
+        if self._slope_bounds is None:
+            Z = np.asarray(self.Z, dtype=float)
+            gi = np.abs(np.diff(Z, axis=0))
+            gj = np.abs(np.diff(Z, axis=1))
+            gi = np.maximum(gi[:, :-1], gi[:, 1:])
+            gj = np.maximum(gj[:-1, :], gj[1:, :])
+            cell_nodata = (self.nodata[:-1, :-1] | self.nodata[:-1, 1:] |
+                           self.nodata[1:, :-1] | self.nodata[1:, 1:])
+
+            bounds = []
+            for g in (gi, gj):
+                g[cell_nodata] = np.inf
+                padded = np.pad(g, ((0, 1), (0, 1)), mode='edge')
+                bounds.append(np.maximum(np.maximum(padded[:-1, :-1], padded[:-1, 1:]),
+                                         np.maximum(padded[1:, :-1], padded[1:, 1:])))
+            self._slope_bounds = (bounds[0], bounds[1])
+        return self._slope_bounds
+
+    def content_hash(self) -> str:
+        """
+        SHA-256 hex digest of the canonical axes and elevations, computed once
+        per grid and cached. Elevations are hashed as float64, so the same
+        terrain loaded in another dtype (TERRAIN_DTYPES) has the same hash.
+        """
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            digest.update(np.asarray(self.Z.shape, dtype=np.int64).tobytes())
+            digest.update(np.ascontiguousarray(self.lats, dtype=float).tobytes())
+            digest.update(np.ascontiguousarray(self.lons, dtype=float).tobytes())
+            # Row blocks of ~8 MB: memory-mapped / tiled elevations are read once
+            rows = max(1, 2**20 // self.Z.shape[1])
+            for start in range(0, self.Z.shape[0], rows):
+                block = np.asarray(self.Z[start:start + rows, :], dtype=float)
+                digest.update(np.ascontiguousarray(block).tobytes())
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    def sample(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Terrain altitude (m) at arrays of points via bilinear interpolation.
+
+        Returns (z, nodata):
+        - z      : float array of altitudes (NaN where nodata)
+        - nodata : boolean array, True if out of bounds or no-data (values < 0)
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        lats, lons, Z = self.lats, self.lons, self.Z
+
+        i1, j1 = self.cell_index(lat, lon)
+        i0, j0 = i1 - 1, j1 - 1
+
+        lat0, lat1 = lats[i0], lats[i1]
+        lon0, lon1 = lons[j0], lons[j1]
+
+        z00 = Z[i0, j0]
+        z01 = Z[i0, j1]
+        z10 = Z[i1, j0]
+        z11 = Z[i1, j1]
+
+        # No-data: negative values or out of bounds
+        nodata = ~self.contains(lat, lon) | (np.minimum(np.minimum(z00, z01), np.minimum(z10, z11)) < 0)
+
+        t = (lat - lat0) / (lat1 - lat0 + 1e-12)
+        u = (lon - lon0) / (lon1 - lon0 + 1e-12)
+
+        z0 = (1 - u) * z00 + u * z01
+        z1 = (1 - u) * z10 + u * z11
+        z = np.where(nodata, np.nan, (1 - t) * z0 + t * z1)
+        return z, nodata
+
+
+def _is_regular(axis: np.ndarray, step: float) -> bool:
+    """True if a 1D axis is evenly spaced with the given step."""
+    return bool(np.allclose(np.diff(axis), step, rtol=0.0, atol=1e-6 * abs(step)))
+
+
+def as_terrain_grid(lats, lons: Optional[np.ndarray] = None,
+                    Z: Optional[np.ndarray] = None) -> TerrainGrid:
+    """
+    Return a TerrainGrid from either a TerrainGrid (passed as lats, with lons
+    and Z omitted) or loose (lats, lons, Z) arrays.
+    """
+    if isinstance(lats, TerrainGrid):
+        if lons is not None or Z is not None:
+            raise ValueError("lons and Z must be omitted when a TerrainGrid is given")
+        return lats
+    if lons is None or Z is None:
+        raise ValueError("lats, lons and Z are required unless a TerrainGrid is given")
+    return TerrainGrid(lats, lons, Z)
+
+
+def grid_axes(lats, lons: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the (lats, lons) axes from either a TerrainGrid (passed as lats,
+    with lons omitted) or loose 1D arrays.
+    """
+    if isinstance(lats, TerrainGrid):
+        if lons is not None:
+            raise ValueError("lons must be omitted when a TerrainGrid is given")
+        return lats.lats, lats.lons
+    if lons is None:
+        raise ValueError("lats and lons are required unless a TerrainGrid is given")
+    return lats, lons
+
+
+def to_caller_order(array: np.ndarray, grid: TerrainGrid, lats) -> np.ndarray:
+    """
+    Reorder a canonical grid-shaped result to the axis order of the caller's
+    `lats` argument: unchanged for a TerrainGrid, source order for loose arrays.
+    """
+    if isinstance(lats, TerrainGrid):
+        return array
+    return grid.as_input_order(array)
+
+
+# Supported elevation dtypes: DTED elevations are integer meters, so int16
+# holds them exactly at a quarter of the float64 footprint
+TERRAIN_DTYPES = ("float64", "float32", "int16")
+
+# Arrays of a terrain .npz file, stored one .npy file each in the cache
+TERRAIN_CACHE_ARRAYS = ("lat", "lon", "ter")
+
+
+def convert_terrain(ter: np.ndarray, dtype: str = "float64") -> np.ndarray:
+    """
+    Convert a terrain elevation array to one of TERRAIN_DTYPES.
+
+    Raises ValueError for integer dtypes if elevations are not whole meters
+    or do not fit the dtype.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.name not in TERRAIN_DTYPES:
+        raise ValueError(f"Unsupported terrain dtype '{dtype.name}', expected one of {TERRAIN_DTYPES}")
+
+    ter = np.asarray(ter)
+    if dtype.kind == 'i' and ter.dtype != dtype:
+        info = np.iinfo(dtype)
+        if ter.size and (ter.min() < info.min or ter.max() > info.max or
+                         not np.array_equal(ter, np.round(ter))):
+            raise ValueError(f"Terrain elevations are not whole meters within {dtype.name} range")
+    return np.ascontiguousarray(ter, dtype=dtype)
+
+
+def terrain_cache_dir(npz_path: str, dtype: str = "float64") -> str:
+    """Cache directory of a terrain .npz file: '<npz_path>.cache/<dtype>'."""
+    return os.path.join(npz_path + ".cache", np.dtype(dtype).name)
+
+
+def _npz_signature(npz_path: str) -> dict:
+    """Size and modification time of the source file, stored with the cache."""
+    stat = os.stat(npz_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_terrain_cache(npz_path: str, cache_dir: Optional[str] = None,
+                        dtype: str = "float64") -> str:
+    """
+    Decode a terrain .npz file (lat, lon, ter) once into uncompressed .npy
+    files (64-byte aligned data, memory-mappable): float64 axes and `ter`
+    converted to `dtype` (see convert_terrain).
+
+    Files are written under temporary names and renamed, and the source
+    signature is written last, so a concurrent reader never maps a partial cache.
+
+    Returns:
+    --------
+    str
+        Cache directory
+    """
+    cache_dir = cache_dir or terrain_cache_dir(npz_path, dtype)
+
+    # Decode first: a missing or unreadable .npz leaves no empty cache directory
+    d = np.load(npz_path)
+    arrays = {
+        "lat": np.ascontiguousarray(d["lat"], dtype=float),
+        "lon": np.ascontiguousarray(d["lon"], dtype=float),
+        "ter": convert_terrain(d["ter"], dtype),
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    for name in TERRAIN_CACHE_ARRAYS:
+        path = os.path.join(cache_dir, name + ".npy")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, arrays[name])
+        os.replace(tmp_path, path)
+
+    source_path = os.path.join(cache_dir, "source.json")
+    tmp_path = f"{source_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(_npz_signature(npz_path), f)
+    os.replace(tmp_path, source_path)
+    return cache_dir
+
+
+def load_terrain_cache(npz_path: str, cache_dir: Optional[str] = None,
+                       dtype: str = "float64") -> Optional[TerrainGrid]:
+    """
+    Open the raw terrain cache of a .npz file as a TerrainGrid backed by
+    read-only np.memmap arrays (elevations in `dtype`).
+
+    Returns None if the cache is missing or older than the .npz file.
+    """
+    cache_dir = cache_dir or terrain_cache_dir(npz_path, dtype)
+    try:
+        with open(os.path.join(cache_dir, "source.json")) as f:
+            if json.load(f) != _npz_signature(npz_path):
+                return None
+        lats, lons, Z = (np.load(os.path.join(cache_dir, name + ".npy"), mmap_mode="r")
+                         for name in TERRAIN_CACHE_ARRAYS)
+    except (OSError, ValueError):
+        return None
+    return TerrainGrid(lats, lons, Z)
+
+
+def load_terrain_npz(npz_path: str, use_cache: bool = True,
+                     dtype: str = "float64") -> TerrainGrid:
+    """
+    Load a terrain .npz file (lat, lon, ter) into a TerrainGrid.
+    The grid unpacks as before: lats, lons, Z = load_terrain_npz(path)
+
+    With use_cache, the first load decodes the .npz into a raw cache
+    ('<npz_path>.cache', see build_terrain_cache) and later loads
+    memory-map it instead of decompressing the file again.
+
+    dtype selects the elevation dtype kept in memory (TERRAIN_DTYPES):
+    "int16" stores DTED integer meters at a quarter of the float64 size.
+    """
+
+    if use_cache:
+        grid = load_terrain_cache(npz_path, dtype=dtype)
+        if grid is not None:
+            return grid
+        try:
+            build_terrain_cache(npz_path, dtype=dtype)
+            grid = load_terrain_cache(npz_path, dtype=dtype)
+        except OSError:
+            grid = None  # Read-only location: decode the .npz directly
+        if grid is not None:
+            return grid
+
+    d = np.load(npz_path)
+    lats = d["lat"].astype(float)
+    lons = d["lon"].astype(float)
+    Z = convert_terrain(d["ter"], dtype)
+
+    return TerrainGrid(lats, lons, Z)
@@ -2,18 +2,29 @@
 Test script for coverage analysis with small grid subset.
 
 This script tests the coverage analysis functionality with a small subset
-of the terrain grid to verify LOS integration and array indexing.
+of the terrain grid to verify LOS integration and array indexing. The
+feature tests (test_engines ... test_out_of_core) run on a synthetic grid,
+so they do not need terrain_mat.npz.
 """
 
+import os
+import tempfile
+import functools
 import numpy as np
 import matplotlib.pyplot as plt
+import time
 import warnings
+from types import SimpleNamespace
 warnings.filterwarnings('ignore', category=UserWarning)  # Suppress matplotlib warnings
 
-from visualize_terrain import load_terrain_npz
-from coverage_analysis import compute_coverage_map, compute_all_coverage_maps
+from terrain import load_terrain_npz
+from coverage_analysis import compute_coverage_map, compute_all_coverage_maps, iter_coverage_tiles
 from visualize_coverage import plot_all_coverage_maps, plot_coverage_map
-from LOS import los_visible, fl_to_m
+from LOS import los_visible, fl_to_m, STANDARD_K_FACTOR
+from los_jit import HAS_NUMBA
+from site_location_masks import haversine_distance, mask_range_sector
+from pyramid import pyramid_coverage_rows
+from terrain import TerrainGrid
 
 def test_small_grid():
     """Test coverage analysis with a small grid subset."""
@@ -185,6 +196,381 @@ def test_small_grid():
     return True
 
 
+def synthetic_terrain(n: int = 80, seed: int = 1):
+    """
+    Deterministic n x n terrain over 43.3-44.1 N / 6.8-7.6 E: multi-octave
+    value noise (0-2300 m) with sea along the west edge, latitudes
+    decreasing like DTED exports. Returns (lats, lons, Z).
+    """
+    rng = np.random.default_rng(seed)
+    lats = np.linspace(44.1, 43.3, n)
+    lons = np.linspace(6.8, 7.6, n)
+    Z = np.full((n, n), 600.0)
+    for octave, amplitude in [(4, 900), (8, 500), (16, 250), (32, 120), (64, 60)]:
+        # Bilinear interpolation of random node values, octave x octave cells
+        nodes = rng.normal(size=(octave + 1, octave + 1))
+        x = np.linspace(0, octave, n)
+        k = np.minimum(x.astype(int), octave - 1)
+        t = x - k
+        rows = nodes[k] * (1 - t)[:, None] + nodes[k + 1] * t[:, None]
+        Z += amplitude * (rows[:, k] * (1 - t) + rows[:, k + 1] * t)
+    Z = np.maximum(np.round(Z), 0)
+    west = Z[:, :n // 5]
+    west[west < 300] = 0
+    return lats, lons, Z
+
+
+@functools.lru_cache(maxsize=None)
+def _small_grid_case() -> SimpleNamespace:
+    """
+    80 x 80 synthetic terrain (synthetic_terrain) with a radar at its
+    center, and the per-cell sampled LOS maps (n_samples=40) the feature
+    tests compare against. Built once per run.
+    """
+    lats, lons, Z = synthetic_terrain()
+    case = SimpleNamespace(
+        lats=lats, lons=lons, Z=Z,
+        radar_lat=(lats.min() + lats.max()) / 2,
+        radar_lon=(lons.min() + lons.max()) / 2,
+        radar_height_agl_m=50.0
+    )
+    case.coverage_map = _coverage(case, 100, n_samples=40)
+    case.coverage_maps = compute_all_coverage_maps(
+        case.radar_lat, case.radar_lon, case.radar_height_agl_m,
+        [5, 100, 200], case.lats, case.lons, case.Z,
+        n_samples=40, progress_callback=lambda fl, current, total: None
+    )
+    return case
+
+
+def _coverage(case: SimpleNamespace, flight_level: float, **kwargs) -> np.ndarray:
+    """compute_coverage_map of the test radar on the small grid."""
+    return compute_coverage_map(
+        case.radar_lat, case.radar_lon, case.radar_height_agl_m,
+        flight_level, case.lats, case.lons, case.Z, **kwargs
+    )
+
+
+def _range_limits(case: SimpleNamespace) -> dict:
+    """Range / sector limits of the test: half the grid height, north sector."""
+    max_range_km = haversine_distance(case.radar_lat, case.radar_lon,
+                                      case.lats.max(), case.radar_lon) / 2
+    return dict(max_range_km=max_range_km, azimuth_sectors=[(270, 90)])
+
+
+def test_engines():
+    """Sweep, DDA and pyramid engines against per-cell sampled LOS and exact DDA."""
+    case = _small_grid_case()
+    print("\nTesting sweep, DDA and pyramid engines...")
+    engine_maps = {}
+    for engine in ["dda", "pyramid"]:
+        engine_maps[engine] = _coverage(case, 100, engine=engine)
+        agreement = np.mean(engine_maps[engine] == case.coverage_map) * 100
+        print(f"   ✓ {engine} map: agreement with per-cell LOS {agreement:.1f}%")
+        assert engine_maps[engine].shape == case.coverage_map.shape and agreement >= 99.0, \
+            f"{engine} engine disagrees with per-cell LOS"
+
+    # The pyramid only skips cells it can decide, so it must match DDA exactly
+    assert np.array_equal(engine_maps["pyramid"], engine_maps["dda"]), \
+        "pyramid engine differs from the DDA engine"
+    print("   ✓ pyramid map identical to DDA map")
+
+    # Pyramid counters are summed over row tiles, serial or on workers
+    stats = {}
+    _coverage(case, 100, engine="pyramid", stats=stats)
+    tile_stats = {}
+    grid = TerrainGrid(case.lats, case.lons, case.Z)
+    for rows in (slice(0, 30), slice(30, 55), slice(55, len(case.lats))):
+        pyramid_coverage_rows(grid, rows, case.radar_lat, case.radar_lon,
+                              case.radar_height_agl_m, fl_to_m(100), stats=tile_stats)
+    worker_stats = {}
+    _coverage(case, 100, engine="pyramid", workers=2, stats=worker_stats)
+    counters = ("accepted", "rejected", "refined")
+    assert sum(stats[key] for key in counters) == case.coverage_map.size, \
+        "pyramid counters do not cover every cell"
+    for multi_tile_stats in (tile_stats, worker_stats):
+        assert all(multi_tile_stats[key] == stats[key] for key in counters), \
+            f"pyramid counters of several tiles {multi_tile_stats} differ from one pass {stats}"
+    print(f"   ✓ pyramid counters ({stats['accepted']} accepted, {stats['rejected']} rejected, "
+          f"{stats['refined']} refined) summed over 3 row tiles and over workers")
+
+    # The sweep misses peaks between its ray samples: its errors against the
+    # exact LOS are mostly cells wrongly visible, rarely wrongly blocked
+    for flight_level in [50, 100]:
+        sweep_map = _coverage(case, flight_level, engine="sweep")
+        dda_map = _coverage(case, flight_level, engine="dda")
+        agreement = np.mean(sweep_map == dda_map) * 100
+        wrongly_visible = int(np.sum(sweep_map & ~dda_map))
+        wrongly_blocked = int(np.sum(~sweep_map & dda_map))
+        print(f"   ✓ sweep map at FL{flight_level}: agreement with DDA {agreement:.1f}%, "
+              f"{wrongly_visible} cells wrongly visible, {wrongly_blocked} wrongly blocked")
+        assert sweep_map.shape == dda_map.shape and agreement >= 98.5, \
+            f"sweep engine disagrees with DDA at FL{flight_level}"
+        assert wrongly_blocked <= wrongly_visible and wrongly_blocked <= 0.002 * sweep_map.size, \
+            f"sweep engine wrongly blocks {wrongly_blocked} cells at FL{flight_level}"
+
+
+def test_workers():
+    """Tiled process-pool execution reproduces the serial loop exactly."""
+    case = _small_grid_case()
+    print("\nTesting workers=2...")
+    parallel_map = _coverage(case, 100, n_samples=40, workers=2)
+    assert np.array_equal(parallel_map, case.coverage_map), "workers=2 map differs from the serial map"
+    print("   ✓ workers=2 map identical to serial map")
+
+
+def test_jit_backend():
+    """Compiled LOS loops reproduce the NumPy backend exactly."""
+    case = _small_grid_case()
+    print("\nTesting the JIT backend...")
+    if not HAS_NUMBA:
+        # backend="jit" would fall back to NumPy: nothing to compare or time
+        print("   - Skipped: numba is not installed")
+        return
+    for engine in ["los", "dda"]:
+        # Compile outside the timed calls
+        _coverage(case, 100, n_samples=40, engine=engine, backend="jit",
+                  target_lats=case.lats[:1], target_lons=case.lons[:1])
+        maps = {}
+        elapsed = {}
+        for backend in ["numpy", "jit"]:
+            start = time.perf_counter()
+            maps[backend] = _coverage(case, 100, n_samples=40, engine=engine, backend=backend)
+            elapsed[backend] = time.perf_counter() - start
+        assert np.array_equal(maps["jit"], maps["numpy"]), \
+            f"backend='jit' {engine} map differs from the NumPy backend"
+        print(f"   ✓ backend='jit' {engine} map identical to NumPy backend "
+              f"({elapsed['jit']:.2f} s vs {elapsed['numpy']:.2f} s)")
+
+
+def test_blocker_cache():
+    """The blocker cache only short-cuts confirmed blockers: the map is unchanged."""
+    case = _small_grid_case()
+    print("\nTesting the blocker cache...")
+    # FL5 keeps many cells behind the same ridges, so the cache must hit;
+    # the reference is the minimum-altitude pass, which has no blocker cache
+    assert not case.coverage_maps[5].all(), "no blocked cell at FL5: the blocker cache is not exercised"
+    for engine in ["los", "dda"]:
+        reference_map = compute_all_coverage_maps(
+            case.radar_lat, case.radar_lon, case.radar_height_agl_m,
+            [5], case.lats, case.lons, case.Z,
+            n_samples=40, engine=engine, progress_callback=lambda fl, current, total: None
+        )[5]
+        stats = {}
+        stats_map = _coverage(case, 5, n_samples=40, engine=engine, stats=stats)
+        print(f"   ✓ {engine} blocker cache hit rate at FL5: {stats['blocker_hit_rate']:.2f} "
+              f"({stats['blocker_hits']}/{stats['blocker_tests']})")
+        assert stats["blocker_hits"] > 0, f"{engine} blocker cache never hit at FL5"
+        assert np.array_equal(stats_map, reference_map), \
+            f"{engine} map with the blocker cache differs from the minimum-altitude map"
+    print("   ✓ Maps with the blocker cache identical to the minimum-altitude maps")
+
+
+def test_adaptive():
+    """Adaptive refinement fills uniform blocks: nearly the same map, fewer LOS."""
+    case = _small_grid_case()
+    print("\nTesting adaptive refinement...")
+    stats = {}
+    adaptive_map = _coverage(case, 100, n_samples=40, adaptive_block=8, stats=stats)
+    agreement = np.mean(adaptive_map == case.coverage_map) * 100
+    print(f"   ✓ Adaptive map: LOS at {stats['evaluated']}/{case.coverage_map.size} points, "
+          f"agreement with per-cell LOS: {agreement:.1f}%")
+    assert agreement >= 99.0 and stats["evaluated"] < case.coverage_map.size, \
+        "adaptive refinement disagrees with per-cell LOS or saved no LOS"
+
+
+def test_target_grid():
+    """A coarser target grid keeps the terrain: same cells as the full map."""
+    case = _small_grid_case()
+    print("\nTesting a coarser target grid...")
+    target_map = _coverage(case, 100, n_samples=40,
+                           target_lats=case.lats[::4], target_lons=case.lons[::4])
+    assert np.array_equal(target_map, case.coverage_map[::4, ::4]), \
+        "target grid map differs from the full map at the same cells"
+    print(f"   ✓ Target grid map {target_map.shape} identical to the full map at the same cells")
+
+
+def test_range_limits():
+    """Range / sector limits skip cells: the full map restricted to the limits."""
+    case = _small_grid_case()
+    print("\nTesting range and azimuth-sector limits...")
+    limits = _range_limits(case)
+    range_map = _coverage(case, 100, n_samples=40, **limits)
+    range_mask = mask_range_sector(case.lats, case.lons, center_lat=case.radar_lat,
+                                   center_lon=case.radar_lon, **limits)
+    assert np.array_equal(range_map, case.coverage_map & range_mask), \
+        "range-limited map differs from the full map inside the limits"
+    print(f"   ✓ Range-limited map ({limits['max_range_km']:.1f} km, north sector): "
+          f"{np.sum(range_mask)}/{range_mask.size} cells evaluated, identical inside the limits")
+
+    # Adaptive blocks straddling a narrow sector keep the visible cells inside it
+    for sector in [(10, 12), (100, 101.5), (200, 203)]:
+        sector_maps = [_coverage(case, 100, n_samples=40, adaptive_block=block,
+                                 azimuth_sectors=[sector])
+                       for block in (0, 16)]
+        assert np.array_equal(sector_maps[1], sector_maps[0]), \
+            (f"adaptive map in sector {sector} differs from the per-cell map: "
+             f"{np.sum(sector_maps[1])} vs {np.sum(sector_maps[0])} visible cells")
+    print("   ✓ Adaptive refinement in narrow sectors identical to the per-cell map")
+
+
+def test_sparse_roi():
+    """A region of interest is computed alone and returned in sparse form."""
+    case = _small_grid_case()
+    print("\nTesting a sparse region of interest...")
+    roi_mask = np.zeros(case.coverage_map.shape, dtype=bool)
+    roi_mask[10:30, 5:60] = True
+    roi_mask[50:, :20] = True
+    sparse_map = _coverage(case, 100, n_samples=40, roi_mask=roi_mask, sparse=True)
+    assert (sparse_map.index.size == np.sum(roi_mask) and
+            np.array_equal(sparse_map.to_dense(), case.coverage_map & roi_mask)), \
+        "sparse ROI map differs from the full map inside the region"
+    print(f"   ✓ Sparse ROI map: {sparse_map.index.size}/{roi_mask.size} cells computed, "
+          f"identical inside the region")
+
+
+def test_earth_curvature():
+    """Earth curvature only lowers the LOS: no cell becomes visible."""
+    case = _small_grid_case()
+    print("\nTesting earth curvature...")
+    curved_maps = {backend: _coverage(case, 100, n_samples=40, backend=backend,
+                                      k_factor=STANDARD_K_FACTOR)
+                   for backend in ["numpy", "jit"]}
+    assert not np.any(curved_maps["numpy"] & ~case.coverage_map), \
+        "k_factor map has visible cells that are blocked on flat terrain"
+    assert np.array_equal(curved_maps["jit"], curved_maps["numpy"]), \
+        "backend='jit' k_factor map differs from the NumPy backend"
+    print(f"   ✓ Earth curvature (k = 4/3): {np.sum(curved_maps['numpy'])}/"
+          f"{np.sum(case.coverage_map)} visible cells kept, JIT identical")
+
+
+def test_horizon_cache():
+    """The horizon profile is computed once, then every map is read from it."""
+    case = _small_grid_case()
+    print("\nTesting the horizon cache...")
+    limits = _range_limits(case)
+    range_map = _coverage(case, 100, n_samples=40, **limits)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for run in ("computed", "cached"):
+            cached_map = _coverage(case, 100, n_samples=40, horizon_cache=cache_dir)
+            assert np.array_equal(cached_map, case.coverage_map), \
+                f"{run} horizon profile map differs from the direct map"
+        n_files = len(os.listdir(cache_dir))
+        start = time.perf_counter()
+        cached_range_map = _coverage(case, 100, n_samples=40, horizon_cache=cache_dir, **limits)
+        elapsed = time.perf_counter() - start
+    assert n_files == 2 and np.array_equal(cached_range_map, range_map), \
+        "horizon cache did not reuse its profile for the range-limited map"
+    print(f"   ✓ Horizon cache: maps identical to direct LOS, range-limited map "
+          f"read from the profile in {elapsed * 1000:.1f} ms")
+
+
+def test_result_cache():
+    """Stored maps come back memory-mapped, only new flight levels are computed."""
+    case = _small_grid_case()
+    print("\nTesting the result cache...")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        computed_levels = []
+        for flight_levels in ([100], [100, 200]):
+            result_maps = compute_all_coverage_maps(
+                case.radar_lat, case.radar_lon, case.radar_height_agl_m,
+                flight_levels, case.lats, case.lons, case.Z,
+                n_samples=40, result_cache=cache_dir,
+                progress_callback=lambda fl, current, total: computed_levels.append(fl)
+            )
+        identical = (isinstance(result_maps[100], np.memmap)
+                     and np.array_equal(result_maps[100], case.coverage_map))
+        del result_maps  # Release the files before the directory is removed
+    assert computed_levels == [100, 200] and identical, \
+        "result cache did not return the stored map memory-mapped"
+    print("   ✓ Result cache: stored FL100 map reloaded memory-mapped, only FL200 computed")
+
+
+def test_checkpoint():
+    """An interrupted checkpointed run resumes with the tiles it completed."""
+    case = _small_grid_case()
+    print("\nTesting checkpoint and resume...")
+    progress = []
+
+    def interrupt(current, total, percentage):
+        progress.append(current)
+        if len(progress) == 3:
+            raise KeyboardInterrupt
+
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        try:
+            _coverage(case, 100, n_samples=40, checkpoint=checkpoint_dir,
+                      point_progress_callback=interrupt)
+        except KeyboardInterrupt:
+            pass
+        interrupted_at = progress[-2]
+        progress.clear()
+        resumed_map = _coverage(
+            case, 100, n_samples=40, checkpoint=checkpoint_dir,
+            point_progress_callback=lambda current, total, percentage: progress.append(current)
+        )
+        leftover = os.listdir(checkpoint_dir)
+    assert (np.array_equal(resumed_map, case.coverage_map) and progress[0] > interrupted_at
+            and not leftover), "checkpointed run did not resume from its completed tiles"
+    print(f"   ✓ Checkpoint: resumed after {interrupted_at}/{case.coverage_map.size} cells, "
+          f"map identical to the uninterrupted run")
+
+
+def test_streaming():
+    """Streamed tiles assemble into the full maps."""
+    case = _small_grid_case()
+    print("\nTesting streamed coverage tiles...")
+    streamed_maps = {flight_level: np.zeros(case.coverage_map.shape, dtype=bool)
+                     for flight_level in (100, 200)}
+    n_tiles = 0
+    for tile in iter_coverage_tiles(
+        case.radar_lat, case.radar_lon, case.radar_height_agl_m,
+        [100, 200], case.lats, case.lons, case.Z,
+        n_samples=40, workers=2
+    ):
+        streamed_maps[tile.flight_level][tile.bounds] = tile.coverage
+        n_tiles += 1
+    assert (np.array_equal(streamed_maps[100], case.coverage_map)
+            and np.array_equal(streamed_maps[200], case.coverage_maps[200])), \
+        "streamed coverage tiles differ from the full maps"
+    print(f"   ✓ Streaming: {n_tiles} tiles assembled into maps identical to the full maps")
+
+
+def test_out_of_core():
+    """Out-of-core maps are written to memory-mapped files within the budget."""
+    case = _small_grid_case()
+    print("\nTesting out-of-core maps...")
+    with tempfile.TemporaryDirectory() as out_dir:
+        disk_maps = compute_all_coverage_maps(
+            case.radar_lat, case.radar_lon, case.radar_height_agl_m,
+            [100, 200], case.lats, case.lons, case.Z,
+            n_samples=40, workers=2, out_dir=out_dir, memory_budget=8 * 2**20,
+            progress_callback=lambda fl, current, total: None
+        )
+        identical = (isinstance(disk_maps[100], np.memmap)
+                     and np.array_equal(disk_maps[100], case.coverage_map)
+                     and np.array_equal(disk_maps[200], case.coverage_maps[200]))
+        del disk_maps  # Release the files before the directory is removed
+    assert identical, "out-of-core maps differ from the in-memory maps"
+    print("   ✓ Out of core: memory-mapped maps identical to the in-memory maps")
+
+
+# Feature tests run after test_small_grid when the script is run directly
+FEATURE_TESTS = [
+    test_engines, test_workers, test_jit_backend, test_blocker_cache, test_adaptive,
+    test_target_grid, test_range_limits, test_sparse_roi, test_earth_curvature,
+    test_horizon_cache, test_result_cache, test_checkpoint, test_streaming, test_out_of_core,
+]
+
+
 if __name__ == "__main__":
     success = test_small_grid()
+    for test in FEATURE_TESTS:
+        try:
+            test()
+        except Exception as e:
+            print(f"   ✗ {test.__name__} failed: {e}")
+            import traceback
+            traceback.print_exc()
+            success = False
     exit(0 if success else 1)
@@ -0,0 +1,160 @@
+"""
+Test script for the DTED Level 1 reader.
+
+This script tests the dted.py module by:
+1. Writing small synthetic .dt1 tiles (2 x 2 mosaic with one missing tile)
+2. Reading a single tile and checking the decoded elevations
+3. Sampling the lazy mosaic and comparing with the stitched in-memory grid
+4. Computing coverage maps on the mosaic
+5. Checking the LRU tile cache bound
+6. Rejecting a tile with a corrupt data record
+"""
+
+import numpy as np
+import os
+import tempfile
+
+from terrain import TerrainGrid
+from dted import DTEDMosaic, read_dt1, DTED_DATA_OFFSET, DTED_NODATA
+from coverage_analysis import compute_coverage_map
+from los_jit import resolve_backend
+
+
+def _angle_field(value: float, hemispheres: str) -> str:
+    """DTED 'DDDMMSSH' field for whole-degree tile origins."""
+    hemisphere = hemispheres[0] if value >= 0 else hemispheres[1]
+    return f"{int(abs(value)):03d}0000{hemisphere}"
+
+
+def write_dt1(path: str, lat0: int, lon0: int, Z: np.ndarray, interval_tenths: int):
+    """Write a minimal DTED Level 1 tile (UHL header, blank DSI/ACC, data records)."""
+    n_lat, n_lon = Z.shape
+    uhl = ("UHL1" + _angle_field(lon0, "EW") + _angle_field(lat0, "NS") +
+           f"{interval_tenths:04d}{interval_tenths:04d}" + "NA  " + "U  " + " " * 12 +
+           f"{n_lon:04d}{n_lat:04d}" + "0" + " " * 24).encode("ascii")
+    assert len(uhl) == 80
+
+    record = np.dtype([
+        ("sentinel", "u1"), ("block_count", "u1", (3,)),
+        ("lon_count", ">u2"), ("lat_count", ">u2"),
+        ("data", ">u2", (n_lat,)), ("checksum", ">u4"),
+    ])
+    records = np.zeros(n_lon, dtype=record)
+    records["sentinel"] = 0xAA
+    records["lon_count"] = np.arange(n_lon)
+    # Signed magnitude encoding, one record per longitude line (south to north)
+    Zi = Z.astype(np.int32)
+    records["data"] = np.where(Zi < 0, 0x8000 | -Zi, Zi).T
+    # Checksum: unsigned sum of the record bytes before it
+    record_bytes = records.view(np.uint8).reshape(n_lon, record.itemsize)
+    records["checksum"] = record_bytes[:, :-4].sum(axis=1)
+
+    with open(path, "wb") as f:
+        f.write(uhl)
+        f.write(b"DSI".ljust(DTED_DATA_OFFSET - 80 - 2700, b" "))
+        f.write(b"ACC".ljust(2700, b" "))
+        f.write(records.tobytes())
+
+
+def test_dted():
+    """Test the DTED reader and mosaic."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The grids and mosaics of the tiles are released when the checks
+        # return, before the directory is removed
+        _check_dted(tmp_dir)
+
+
+def _check_dted(tmp_dir: str):
+    """Run the DTED checks on synthetic tiles written to tmp_dir."""
+
+    print("="*60)
+    print("Testing DTED Level 1 Reader")
+    print("="*60)
+
+    # 31 x 31 points per 1-degree tile (120 arc-second spacing)
+    n = 31
+    interval_tenths = 1200
+    rng = np.random.default_rng(0)
+
+    # Reference elevations of the full 2 x 2 mosaic (edge nodes shared)
+    size = 2 * (n - 1) + 1
+    reference = rng.integers(0, 1500, size=(size, size)).astype(np.int16)
+    reference[5, 7] = DTED_NODATA
+    # Tile (1, 1) is missing (e.g. open sea): no-data in the mosaic
+    reference[n:, n:] = DTED_NODATA
+
+    print("\n1. Writing synthetic .dt1 tiles...")
+    for ti, lat0 in enumerate((43, 44)):
+        for tj, lon0 in enumerate((7, 8)):
+            if (ti, tj) == (1, 1):
+                continue
+            tile = reference[ti * (n - 1):ti * (n - 1) + n, tj * (n - 1):tj * (n - 1) + n]
+            tile_dir = os.path.join(tmp_dir, f"e{lon0:03d}")
+            os.makedirs(tile_dir, exist_ok=True)
+            write_dt1(os.path.join(tile_dir, f"n{lat0:02d}.dt1"), lat0, lon0, tile, interval_tenths)
+    print(f"   ✓ 3 tiles written to {tmp_dir}")
+
+    print("\n2. Reading a single tile...")
+    grid = read_dt1(os.path.join(tmp_dir, "e007", "n43.dt1"))
+    assert np.array_equal(grid.Z, reference[:n, :n]), "decoded elevations differ from the written tile"
+    assert np.isclose(grid.lats[0], 43.0) and np.isclose(grid.lons[-1], 8.0), f"wrong tile extent: {grid}"
+    print(f"   ✓ {grid}")
+
+    print("\n3. Sampling the lazy mosaic...")
+    mosaic = DTEDMosaic.from_directory(tmp_dir, max_tiles=2)
+    ref_grid = TerrainGrid(mosaic.lats, mosaic.lons, reference)
+    print(f"   ✓ {mosaic}")
+
+    lat = rng.uniform(43.0, 45.0, 2000)
+    lon = rng.uniform(7.0, 9.0, 2000)
+    z_mosaic, nodata_mosaic = mosaic.sample(lat, lon)
+    z_ref, nodata_ref = ref_grid.sample(lat, lon)
+    assert (np.array_equal(nodata_mosaic, nodata_ref) and
+            np.allclose(z_mosaic[~nodata_ref], z_ref[~nodata_ref])), \
+        "mosaic samples differ from the stitched grid"
+    assert np.array_equal(np.asarray(mosaic.Z), reference), "assembled mosaic differs from the stitched grid"
+    print("   ✓ 2000 samples identical to the stitched grid")
+
+    print("\n4. Computing coverage maps on the mosaic...")
+    for engine in ["los", "dda"]:
+        mosaic_map = compute_coverage_map(43.6, 7.6, 30.0, 50, mosaic, engine=engine)
+        ref_map = compute_coverage_map(43.6, 7.6, 30.0, 50, ref_grid, engine=engine)
+        assert np.array_equal(mosaic_map, ref_map), \
+            f"{engine} coverage on the mosaic differs from the stitched grid"
+        print(f"   ✓ {engine} map identical ({np.sum(mosaic_map):,} visible cells)")
+
+    # The compiled kernels would assemble the whole mosaic: NumPy is used instead
+    assert resolve_backend("jit", mosaic) == "numpy", "backend='jit' accepted on a lazily decoded mosaic"
+    print("   ✓ backend='jit' falls back to the NumPy backend on the mosaic")
+
+    print("\n5. Checking the LRU tile cache...")
+    mosaic = DTEDMosaic.from_directory(tmp_dir, max_tiles=1)
+    for lat, lon in [(43.5, 7.5), (44.5, 7.5), (43.5, 8.5), (43.5, 7.5)]:
+        mosaic.sample(np.array([lat]), np.array([lon]))
+    decoded = len(mosaic.Z._tiles)
+    assert decoded <= 1, f"{decoded} tiles kept with max_tiles=1"
+    print(f"   ✓ At most 1 decoded tile kept ({mosaic.Z.misses} decodes, {mosaic.Z.hits} hits)")
+
+    print("\n6. Rejecting a corrupt tile...")
+    path = os.path.join(tmp_dir, "e008", "n43.dt1")
+    with open(path, "r+b") as f:
+        f.seek(DTED_DATA_OFFSET + 8)  # First elevation of the first record
+        f.write(b"\x01\x02")
+    try:
+        read_dt1(path)
+    except ValueError as e:
+        print(f"   ✓ {e}")
+    else:
+        raise AssertionError("tile with a wrong record checksum was decoded")
+
+    print("\n" + "="*60)
+    print("All DTED tests passed! ✓")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    try:
+        test_dted()
+    except AssertionError as e:
+        print(f"   ✗ {e}")
+        exit(1)
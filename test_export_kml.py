@@ -11,9 +11,10 @@ This script tests the export_kml.py module by:
 import numpy as np
 import os
 import zipfile
+import xml.etree.ElementTree as ET
 from pathlib import Path
 
-from visualize_terrain import load_terrain_npz
+from terrain import TerrainGrid, load_terrain_npz
 from coverage_analysis import compute_coverage_map, compute_all_coverage_maps
 from export_kml import export_coverage_to_kml, export_all_coverage_to_kmz, create_visibility_map_kml
 
@@ -91,8 +92,8 @@ def test_export_kml():
     print("\n5. Testing create_visibility_map_kml()...")
     try:
         kml_element = create_visibility_map_kml(
-            coverage_map, lats_small, lons_small, 100,
-            radar_lat, radar_lon
+            coverage_map, lats_small, lons_small, flight_level=100,
+            radar_lat=radar_lat, radar_lon=radar_lon
         )
         
         # Verify it returns an Element
@@ -103,6 +104,16 @@ def test_export_kml():
         else:
             print("   ✗ create_visibility_map_kml() did not return XML Element")
             return False
+        
+        # A TerrainGrid is passed on its own, the other arguments by keyword
+        grid_element = create_visibility_map_kml(
+            coverage_map, TerrainGrid(lats_small, lons_small, Z_small), flight_level=100,
+            radar_lat=radar_lat, radar_lon=radar_lon
+        )
+        if ET.tostring(grid_element) != ET.tostring(kml_element):
+            print("   ✗ KML from a TerrainGrid differs from the KML from its axes")
+            return False
+        print("   ✓ TerrainGrid passed without lons gives the same KML")
             
     except Exception as e:
         print(f"   ✗ create_visibility_map_kml() test failed: {e}")
@@ -119,9 +130,9 @@ def test_export_kml():
             os.remove(test_kml_file)
         
         export_coverage_to_kml(
-            coverage_map, lats_small, lons_small, 100,
-            test_kml_file,
-            radar_lat, radar_lon
+            coverage_map, lats_small, lons_small, flight_level=100,
+            output_path=test_kml_file,
+            radar_lat=radar_lat, radar_lon=radar_lon
         )
         
         # Verify file was created
@@ -0,0 +1,306 @@
+"""
+Viewshed Module
+
+This module implements a radial-sweep viewshed engine. Instead of testing the
+line of sight to every grid cell independently, rays are cast from the radar
+to every cell on the border of the terrain grid. Along each ray the running
+maximum terrain elevation angle (the "horizon") is carried forward, so the
+visibility of every cell crossed by the ray falls out of a single pass.
+
+The result is comparable to the per-cell LOS of LOS.los_visible: a target is
+blocked when the terrain (plus margin) reaches the straight radar->target line
+anywhere before the target, measured in the same flat lat/lon space.
+It is not identical, and it errs toward "visible": each cell takes the
+horizon of the nearest ray sample, so a peak that lies between two samples or
+beside the ray is missed, while the exact LOS (LOS mode "dda") crosses it.
+On the 80 x 80 synthetic grid of test_coverage.py the sweep agrees with
+"dda" on 98.9-100 % of the cells from FL5 to FL200; over those levels 86
+cells are wrongly visible and 24 wrongly blocked. Use a per-cell engine where a false "visible" matters.
+
+With an effective earth radius factor (k_factor), terrain and targets are
+lowered by the earth drop x^2 / (2 k R) at their ground distance x from the
+radar. Along a ray the drop only depends on the ray step, so each ray gets
+one drop coefficient and the drop of step k is that coefficient times k^2.
+"""
+
+import numpy as np
+from typing import Optional, Tuple, Union
+from terrain import TerrainGrid, as_terrain_grid, to_caller_order
+from LOS import earth_bulge
+
+
+def _fractional_index(axis: np.ndarray, value: float) -> float:
+    """Fractional index of value along a 1D increasing axis."""
+    return float(np.interp(value, axis, np.arange(len(axis), dtype=float)))
+
+
+def _sample_index_space(Z: np.ndarray, fi: np.ndarray, fj: np.ndarray) -> np.ndarray:
+    """
+    Bilinear interpolation of Z at fractional indices (fi, fj).
+    Returns +inf where any of the four surrounding nodes is no-data (< 0).
+    """
+    i0 = np.clip(np.floor(fi).astype(np.intp), 0, Z.shape[0] - 2)
+    j0 = np.clip(np.floor(fj).astype(np.intp), 0, Z.shape[1] - 2)
+    t = fi - i0
+    u = fj - j0
+
+    z00 = Z[i0, j0]
+    z01 = Z[i0, j0 + 1]
+    z10 = Z[i0 + 1, j0]
+    z11 = Z[i0 + 1, j0 + 1]
+
+    z0 = (1 - u) * z00 + u * z01
+    z1 = (1 - u) * z10 + u * z11
+    z = (1 - t) * z0 + t * z1
+
+    nodata = np.minimum(np.minimum(z00, z01), np.minimum(z10, z11)) < 0
+    return np.where(nodata, np.inf, z)
+
+
+def sweep_horizon(
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    Z: Optional[np.ndarray] = None,
+    margin_m: float = 0.0,
+    step_cells: float = 0.5,
+    point_progress_callback: Optional[callable] = None,
+    k_factor: Optional[float] = None
+) -> Tuple[Optional[float], np.ndarray, np.ndarray]:
+    """
+    Compute the terrain horizon of every grid cell with a radial sweep.
+
+    Parameters:
+    -----------
+    radar_lat, radar_lon : float
+        Radar position (degrees)
+    radar_height_agl_m : float
+        Radar height above ground level (meters)
+    lats, lons : np.ndarray
+        1D latitude / longitude axes (increasing or decreasing);
+        lats may be a TerrainGrid, in which case lons and Z are omitted
+    Z : np.ndarray
+        2D terrain elevation array with shape (len(lats), len(lons))
+    margin_m : float, optional
+        Safety margin in meters added to the terrain (default: 0.0)
+    step_cells : float, optional
+        Ray marching step, in grid cells (default: 0.5)
+    point_progress_callback : callable, optional
+        Callback function for progress updates: callback(current, total, percentage)
+    k_factor : float, optional
+        Effective earth radius factor, e.g. LOS.STANDARD_K_FACTOR (default:
+        None = flat terrain)
+
+    Returns:
+    --------
+    z_radar : float or None
+        Radar antenna altitude (m MSL), None if the radar is off-grid or on no-data
+    horizon : np.ndarray
+        2D array of the maximum terrain elevation slope (m per degree) seen
+        from the radar up to and including each cell; +inf where blocked by no-data.
+        With k_factor, terrain heights are reduced by the earth drop and the
+        drop of the cell itself is added (drop / dist), so a target is still
+        visible iff (altitude - z_radar) / dist > horizon
+    dist : np.ndarray
+        2D array of the lat/lon distance (degrees) from the radar to each cell
+    """
+    grid = as_terrain_grid(lats, lons, Z)
+    caller_lats = lats
+    lats, lons, Z = grid
+    n_lat, n_lon = Z.shape
+
+    dist = np.hypot(lats[:, None] - radar_lat, lons[None, :] - radar_lon)
+    horizon = np.full(Z.shape, np.inf)
+    # Earth drop of every cell, computed once per radar (zeros without k_factor)
+    drop = earth_bulge(radar_lat, radar_lon, lats[:, None], lons[None, :], k_factor)
+
+    if not grid.contains(radar_lat, radar_lon):
+        return None, to_caller_order(horizon, grid, caller_lats), to_caller_order(dist, grid, caller_lats)
+
+    ri = _fractional_index(lats, radar_lat)
+    rj = _fractional_index(lons, radar_lon)
+    z_ground_r = _sample_index_space(Z, np.array([ri]), np.array([rj]))[0]
+    if not np.isfinite(z_ground_r):
+        return None, to_caller_order(horizon, grid, caller_lats), to_caller_order(dist, grid, caller_lats)
+    z_radar = float(z_ground_r) + radar_height_agl_m
+
+    # One ray per border cell: adjacent rays are at most one cell apart at the
+    # border, so every cell of the grid is crossed by at least one ray.
+    border_i = np.concatenate([
+        np.zeros(n_lon), np.full(n_lon, n_lat - 1),
+        np.arange(1, n_lat - 1), np.arange(1, n_lat - 1)
+    ])
+    border_j = np.concatenate([
+        np.arange(n_lon), np.arange(n_lon),
+        np.zeros(n_lat - 2), np.full(n_lat - 2, n_lon - 1)
+    ])
+    di = border_i - ri
+    dj = border_j - rj
+    length = np.hypot(di, dj)
+    keep = length > 0
+    di, dj, length = di[keep] / length[keep], dj[keep] / length[keep], length[keep]
+    n_steps = np.floor(length / step_cells).astype(np.intp) + 1
+    # Drop of step k along a ray: ray_drop * k^2 (drop at the border cell, scaled)
+    ray_drop = drop[border_i[keep].astype(np.intp), border_j[keep].astype(np.intp)]
+    ray_drop = ray_drop * (step_cells / length) ** 2
+
+    # Ray state: running max slope and, per cell, the offset of the sample
+    # that last wrote it (the closest sample to the cell centre wins).
+    running = np.full(len(di), -np.inf)
+    best_off = np.full(Z.shape, np.inf)
+    active = np.arange(len(di))
+
+    lat_idx = np.arange(n_lat, dtype=float)
+    lon_idx = np.arange(n_lon, dtype=float)
+    total_steps = int(n_steps.max())
+    total_points = Z.size
+    progress_interval = max(1, total_steps // 50)
+
+    for k in range(1, total_steps + 1):
+        active = active[n_steps[active] >= k]
+        if active.size == 0:
+            break
+
+        fi = ri + k * step_cells * di[active]
+        fj = rj + k * step_cells * dj[active]
+        fi = np.clip(fi, 0.0, n_lat - 1)
+        fj = np.clip(fj, 0.0, n_lon - 1)
+
+        z = _sample_index_space(Z, fi, fj) - ray_drop[active] * k * k
+        s_lat = np.interp(fi, lat_idx, lats)
+        s_lon = np.interp(fj, lon_idx, lons)
+        t = np.hypot(s_lat - radar_lat, s_lon - radar_lon)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slope = (z + margin_m - z_radar) / t
+        slope[np.isnan(slope)] = np.inf
+        before = running[active]
+        running[active] = np.maximum(before, slope)
+
+        # Record the horizon *before* this sample for the nearest cell
+        ci = np.rint(fi).astype(np.intp)
+        cj = np.rint(fj).astype(np.intp)
+        off = (fi - ci) ** 2 + (fj - cj) ** 2
+        flat = ci * n_lon + cj
+        order = np.lexsort((off, flat))
+        flat, off, before = flat[order], off[order], before[order]
+        first = np.ones(flat.size, dtype=bool)
+        first[1:] = flat[1:] != flat[:-1]
+        flat, off, before = flat[first], off[first], before[first]
+        better = off < best_off.flat[flat]
+        best_off.flat[flat[better]] = off[better]
+        horizon.flat[flat[better]] = before[better]
+
+        if point_progress_callback and (k % progress_interval == 0):
+            current = int(total_points * k / total_steps)
+            point_progress_callback(current, total_points, current / total_points * 100)
+
+    # The cell holding the radar is never crossed by a ray sample
+    horizon[int(round(ri)), int(round(rj))] = -np.inf
+
+    # The target cell's own terrain blocks it as well (the per-cell LOS
+    # samples up to just before the target)
+    Zf = np.asarray(Z, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        own = np.where(Zf < 0, np.inf, (Zf - drop + margin_m - z_radar) / dist)
+    own[np.isnan(own)] = -np.inf
+    horizon = np.maximum(horizon, own)
+    if k_factor is not None:
+        # The target is lowered by its own drop as well
+        horizon += np.divide(drop, dist, out=np.zeros_like(drop), where=dist > 0)
+
+    if point_progress_callback:
+        point_progress_callback(total_points, total_points, 100.0)
+
+    return z_radar, to_caller_order(horizon, grid, caller_lats), to_caller_order(dist, grid, caller_lats)
+
+
+def compute_viewshed_sweep(
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    target_alt_m_msl: float,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    Z: Optional[np.ndarray] = None,
+    margin_m: float = 0.0,
+    point_progress_callback: Optional[callable] = None,
+    k_factor: Optional[float] = None
+) -> np.ndarray:
+    """
+    Compute a coverage map at a fixed MSL altitude with the radial sweep engine.
+
+    Parameters:
+    -----------
+    radar_lat, radar_lon : float
+        Radar position (degrees)
+    radar_height_agl_m : float
+        Radar height above ground level (meters)
+    target_alt_m_msl : float
+        Target altitude (meters MSL), e.g. fl_to_m(100)
+    lats, lons : np.ndarray
+        1D latitude / longitude axes (lats may be a TerrainGrid, lons and Z omitted)
+    Z : np.ndarray
+        2D terrain elevation array with shape (len(lats), len(lons))
+    margin_m : float, optional
+        Safety margin in meters (default: 0.0)
+    point_progress_callback : callable, optional
+        Callback function for progress updates: callback(current, total, percentage)
+    k_factor : float, optional
+        Effective earth radius factor, e.g. LOS.STANDARD_K_FACTOR (default:
+        None = flat terrain)
+
+    Returns:
+    --------
+    np.ndarray
+        2D boolean array with shape (len(lats), len(lons))
+        True = visible, False = blocked
+    """
+    z_radar, horizon, dist = sweep_horizon(
+        radar_lat, radar_lon, radar_height_agl_m, lats, lons, Z,
+        margin_m=margin_m, point_progress_callback=point_progress_callback,
+        k_factor=k_factor
+    )
+    if z_radar is None:
+        return np.zeros(horizon.shape, dtype=bool)
+
+    # Blocked when terrain slope >= slope of the radar->target line
+    with np.errstate(invalid='ignore'):
+        target_slope = (target_alt_m_msl - z_radar) / dist
+    return target_slope > horizon
+
+
+def sweep_min_visible_altitude(
+    radar_lat: float,
+    radar_lon: float,
+    radar_height_agl_m: float,
+    lats: Union[np.ndarray, TerrainGrid],
+    lons: Optional[np.ndarray] = None,
+    Z: Optional[np.ndarray] = None,
+    margin_m: float = 0.0,
+    point_progress_callback: Optional[callable] = None,
+    k_factor: Optional[float] = None
+) -> np.ndarray:
+    """
+    Compute the minimum visible altitude raster with the radial sweep engine
+    (k_factor: see compute_viewshed_sweep).
+
+    Returns:
+    --------
+    np.ndarray
+        2D float array with shape (len(lats), len(lons)): a target in a cell is
+        visible at any altitude (m MSL) strictly above the value; inf = never visible
+    """
+    z_radar, horizon, dist = sweep_horizon(
+        radar_lat, radar_lon, radar_height_agl_m, lats, lons, Z,
+        margin_m=margin_m, point_progress_callback=point_progress_callback,
+        k_factor=k_factor
+    )
+    if z_radar is None:
+        return np.full(horizon.shape, np.inf)
+
+    with np.errstate(invalid='ignore'):
+        min_alt = z_radar + horizon * dist
+    min_alt[np.isnan(min_alt)] = -np.inf  # radar cell (zero distance)
+    return min_alt
@@ -2,12 +2,12 @@
 Coverage Visualization Module
 
 This module provides functions to visualize radar coverage maps using matplotlib.
+matplotlib is imported by the plotting functions themselves, so importing this
+module (e.g. from main_coverage.py) stays cheap in headless runs.
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 from typing import Dict, Optional
-from matplotlib.colors import ListedColormap
 
 
 def plot_coverage_map(
@@ -39,6 +39,9 @@ def plot_coverage_map(
     save_path : str, optional
         If provided, save figure to this path
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import ListedColormap
+
     # Create figure
     fig, ax = plt.subplots(figsize=(12, 10))
     
@@ -117,6 +120,9 @@ def plot_all_coverage_maps(
     radar_lon : float, optional
         Radar longitude to mark on maps
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import ListedColormap
+
     flight_levels = sorted(coverage_maps.keys())
     n_maps = len(flight_levels)
     
@@ -8,10 +8,7 @@ Masks are overlaid on terrain maps with:
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 from typing import Dict, Optional
-from matplotlib.colors import ListedColormap
-from matplotlib import cm
 
 
 def plot_masks_overlay(
@@ -54,6 +51,8 @@ def plot_masks_overlay(
     excluded_color : str, optional
         Color for excluded areas (default: 'grey')
     """
+    import matplotlib.pyplot as plt
+
     n_masks = len(masks_dict)
     if n_masks == 0:
         raise ValueError("At least one mask must be provided")